@@ -26,13 +26,13 @@ from collections.abc import Callable, Mapping
 from typing import Any, Final, Literal
 
 import aiofiles.os
-import aiohttp
 import asfquart
 import asfquart.base as base
 import asfquart.session
 import htpy
 import pydantic
 import quart
+import sqlalchemy
 import sqlalchemy.orm as orm
 
 import atr.blueprints.admin as admin
@@ -40,6 +40,7 @@ import atr.config as config
 import atr.datasources.apache as apache
 import atr.db as db
 import atr.db.interaction as interaction
+import atr.fetch as fetch
 import atr.form as form
 import atr.get as get
 import atr.htm as htm
@@ -47,6 +48,7 @@ import atr.ldap as ldap
 import atr.log as log
 import atr.mapping as mapping
 import atr.models.sql as sql
+import atr.people as people
 import atr.principal as principal
 import atr.storage as storage
 import atr.storage.outcome as outcome
@@ -452,6 +454,22 @@ async def env(session: web.Committer) -> web.QuartResponse:
     return web.TextResponse("\n".join(env_vars))
 
 
+@admin.get("/http-statistics")
+async def http_statistics(session: web.Committer) -> web.QuartResponse:
+    """Display the outbound HTTP request latencies and response cache statistics of this process."""
+    lines: list[str] = []
+    for host, latency in sorted(fetch.latencies.items()):
+        mean_ms = (latency.total_ns / latency.requests / 1000000) if latency.requests else 0
+        lines.append(f"{host}.requests={latency.requests}")
+        lines.append(f"{host}.errors={latency.errors}")
+        lines.append(f"{host}.retries={latency.retries}")
+        lines.append(f"{host}.mean_ms={mean_ms:.1f}")
+        lines.append(f"{host}.max_ms={latency.max_ns / 1000000:.1f}")
+    for name, count in sorted(fetch.cache.items()):
+        lines.append(f"cache.{name.replace(' ', '_')}={count}")
+    return web.TextResponse("\n".join(lines))
+
+
 @admin.get("/keys/check")
 async def keys_check_get(session: web.Committer) -> web.QuartResponse:
     """Check public signing key details."""
@@ -601,6 +619,28 @@ async def ldap_post(session: web.Committer, lookup_form: LdapLookupForm) -> str:
     )
 
 
+@admin.get("/ldap-statistics")
+async def ldap_statistics(session: web.Committer) -> web.QuartResponse:
+    """Display the LDAP searches, snapshot, and authorisation cache statistics of this process."""
+    lines: list[str] = []
+    for scope, count in sorted(ldap.searches.items()):
+        lines.append(f"ldap.searches.{scope}={count}")
+
+    index = await asyncio.to_thread(people.load)
+    if index is not None:
+        lines.append(f"snapshot.age_seconds={int(time.time()) - index.created}")
+        lines.append(f"snapshot.people={len(index.people)}")
+        lines.append(f"snapshot.groups={index.has_groups}")
+
+    statistics = principal.cache.statistics
+    lookups = statistics["hits"] + statistics["misses"]
+    for name, count in sorted(statistics.items()):
+        lines.append(f"cache.{name.replace(' ', '_')}={count}")
+    lines.append(f"cache.hit_rate={(statistics['hits'] / lookups) if lookups else 0:.3f}")
+    lines.append(f"cache.entries={len(principal.cache.last_refreshed)}")
+    return web.TextResponse("\n".join(lines))
+
+
 @admin.get("/ongoing-tasks/<project_name>/<version_name>/<revision>")
 async def ongoing_tasks_get(
     session: web.Committer, project_name: str, version_name: str, revision: str
@@ -736,6 +776,44 @@ async def projects_update_post(session: web.Committer) -> str | web.WerkzeugResp
         }, 200
 
 
+@admin.get("/queue")
+async def queue(session: web.Committer) -> str:
+    """Display the depth of the task queue by project and task type."""
+    via = sql.validate_instrumented_attribute
+    statement = (
+        sqlalchemy.select(
+            via(sql.Task.project_name),
+            via(sql.Task.task_type),
+            via(sql.Task.status),
+            sqlalchemy.func.count(),
+            sqlalchemy.func.min(via(sql.Task.added)),
+        )
+        .where(via(sql.Task.status).in_([sql.TaskStatus.QUEUED, sql.TaskStatus.ACTIVE]))
+        .group_by(via(sql.Task.project_name), via(sql.Task.task_type), via(sql.Task.status))
+    )
+    async with db.session() as data:
+        rows = (await data.execute(statement)).all()
+
+    depths: dict[tuple[str, sql.TaskType], dict[str, Any]] = {}
+    for project_name, task_type, status, count, oldest in rows:
+        depth = depths.setdefault((project_name or "", task_type), {"queued": 0, "active": 0, "oldest_queued": None})
+        if status == sql.TaskStatus.ACTIVE:
+            depth["active"] = count
+            continue
+        depth["queued"] = count
+        depth["oldest_queued"] = oldest
+    queue_depths = [
+        {
+            "project_name": project_name,
+            "task_type": task_type,
+            "priority": sql.TASK_TYPE_PRIORITIES.get(task_type, 0),
+            **depth,
+        }
+        for (project_name, task_type), depth in sorted(depths.items(), key=lambda item: -item[1]["queued"])
+    ]
+    return await template.render("queue.html", queue_depths=queue_depths)
+
+
 @admin.get("/tasks")
 async def tasks_(session: web.Committer) -> str:
     return await template.render("tasks.html")
@@ -764,10 +842,8 @@ async def test(session: web.Committer) -> web.QuartResponse:
     """Test the storage layer."""
     import atr.storage as storage
 
-    async with aiohttp.ClientSession() as aiohttp_client_session:
-        url = "https://downloads.apache.org/zeppelin/KEYS"
-        async with aiohttp_client_session.get(url) as response:
-            keys_file_text = await response.text()
+    url = "https://downloads.apache.org/zeppelin/KEYS"
+    keys_file_text = (await fetch.get(url)).text()
 
     async with storage.write(session) as write:
         wacm = write.as_committee_member("tooling")
@@ -837,7 +913,7 @@ async def validate_(session: web.Committer) -> str:
 
 
 async def _check_keys(fix: bool = False) -> str:
-    email_to_uid = await util.email_to_uid_map()
+    email_to_uid = await people.email_to_uid_map()
     bad_keys = []
     async with db.session() as data:
         keys = await data.public_signing_key().all()
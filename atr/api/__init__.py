@@ -16,8 +16,6 @@
 # under the License.
 
 
-import hashlib
-import pathlib
 from typing import Any, Final, Literal
 
 import aiofiles.os
@@ -33,14 +31,18 @@ import atr.blueprints.api as api
 import atr.config as config
 import atr.db as db
 import atr.db.interaction as interaction
+import atr.digests as digests
 import atr.jwtoken as jwtoken
 import atr.models as models
 import atr.models.sql as sql
+import atr.models.uploads as uploads_models
 import atr.principal as principal
+import atr.provenance as provenance
 import atr.storage as storage
 import atr.storage.outcome as outcome
 import atr.storage.types as types
 import atr.tabulate as tabulate
+import atr.uploads as uploads
 import atr.user as user
 import atr.util as util
 
@@ -894,6 +896,274 @@ async def release_upload(data: models.api.ReleaseUploadArgs) -> DictResponse:
     ).model_dump(), 201
 
 
+@api.route("/release/upload/chunk/<upload_id>", methods=["PUT"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadChunkResults, 200)
+async def release_upload_chunk(upload_id: str) -> DictResponse:
+    """
+    Append the raw request body to an upload.
+
+    The Upload-Offset header must be the current offset of the upload. If a
+    chunk is interrupted, whatever was received is kept, and the upload can be
+    resumed from the offset reported by the status endpoint.
+    """
+    asf_uid = _jwt_asf_uid()
+    upload = await _upload_read(upload_id, asf_uid)
+    offset_header = quart.request.headers.get("Upload-Offset", "")
+    if not offset_header.isdigit():
+        raise exceptions.BadRequest("Missing or invalid Upload-Offset header")
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(upload.project_name)
+        try:
+            offset = await wacp.release.upload_append(upload, int(offset_header), quart.request.body)
+        except uploads.OffsetError as e:
+            raise exceptions.Conflict(f"Upload-Offset must be {e.offset}")
+        except uploads.UploadError as e:
+            raise exceptions.Conflict(str(e))
+    return models.api.ReleaseUploadChunkResults(
+        endpoint="/release/upload/chunk",
+        upload_id=upload.upload_id,
+        offset=offset,
+    ).model_dump(), 200
+
+
+@api.route("/release/upload/finish/<upload_id>", methods=["POST"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_request(models.api.ReleaseUploadFinishArgs)
+@quart_schema.validate_response(models.api.ReleaseUploadFinishResults, 201)
+async def release_upload_finish(upload_id: str, data: models.api.ReleaseUploadFinishArgs) -> DictResponse:
+    """
+    Add a complete upload to a release as a new revision.
+
+    If a SHA-256 digest is given, the upload is only added if it matches.
+    """
+    asf_uid = _jwt_asf_uid()
+    upload = await _upload_read(upload_id, asf_uid)
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(upload.project_name)
+        try:
+            revision = await wacp.release.upload_finish(upload, data.sha256)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+    return models.api.ReleaseUploadFinishResults(
+        endpoint="/release/upload/finish",
+        revision=revision,
+    ).model_dump(), 201
+
+
+@api.route("/release/upload/session/commit/<session_id>", methods=["POST"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_request(models.api.ReleaseUploadSessionCommitArgs)
+@quart_schema.validate_response(models.api.ReleaseUploadSessionCommitResults, 201)
+async def release_upload_session_commit(
+    session_id: str, data: models.api.ReleaseUploadSessionCommitArgs
+) -> DictResponse:
+    """
+    Add every upload of a session to a release as a single new revision.
+
+    The checks of the release are run once for the new revision. If SHA-256
+    digests are given by path, the session is only committed if they match.
+    """
+    asf_uid = _jwt_asf_uid()
+    session = await _upload_session_read(session_id, asf_uid)
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(session.project_name)
+        try:
+            revision = await wacp.release.upload_session_commit(session, data.sha256s)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+    return models.api.ReleaseUploadSessionCommitResults(
+        endpoint="/release/upload/session/commit",
+        revision=revision,
+    ).model_dump(), 201
+
+
+@api.route("/release/upload/session/discard/<session_id>", methods=["POST"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadSessionDiscardResults, 200)
+async def release_upload_session_discard(session_id: str) -> DictResponse:
+    """
+    Discard a session and all of its uploads.
+    """
+    asf_uid = _jwt_asf_uid()
+    session = await _upload_session_read(session_id, asf_uid)
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(session.project_name)
+        await wacp.release.upload_session_discard(session)
+    return models.api.ReleaseUploadSessionDiscardResults(
+        endpoint="/release/upload/session/discard",
+        discarded=True,
+    ).model_dump(), 200
+
+
+@api.route("/release/upload/session/start", methods=["POST"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_request(models.api.ReleaseUploadSessionStartArgs)
+@quart_schema.validate_response(models.api.ReleaseUploadSessionStartResults, 201)
+async def release_upload_session_start(data: models.api.ReleaseUploadSessionStartArgs) -> DictResponse:
+    """
+    Start a session of uploads to a release.
+
+    Files uploaded in the session are staged until the session is committed,
+    when they are all added to the release as a single revision. Sessions
+    which are not used for a day are removed.
+    """
+    asf_uid = _jwt_asf_uid()
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(data.project)
+        session = await wacp.release.upload_session_start(data.project, data.version)
+    return models.api.ReleaseUploadSessionStartResults(
+        endpoint="/release/upload/session/start",
+        session_id=session.session_id,
+    ).model_dump(), 201
+
+
+@api.route("/release/upload/session/status/<session_id>")
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadSessionStatusResults, 200)
+async def release_upload_session_status(session_id: str) -> DictResponse:
+    """
+    Get the current offset of each upload of a session, by path.
+    """
+    asf_uid = _jwt_asf_uid()
+    session = await _upload_session_read(session_id, asf_uid)
+    try:
+        session_uploads = await uploads.session_uploads(session)
+    except uploads.UploadError as e:
+        raise exceptions.NotFound(str(e))
+    return models.api.ReleaseUploadSessionStatusResults(
+        endpoint="/release/upload/session/status",
+        session_id=session.session_id,
+        offsets={upload.rel_path: await uploads.offset(upload) for upload in session_uploads},
+    ).model_dump(), 200
+
+
+@api.route("/release/upload/session/stream/<session_id>/<path:relpath>", methods=["PUT"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadSessionStreamResults, 201)
+async def release_upload_session_stream(session_id: str, relpath: str) -> DictResponse:
+    """
+    Upload the raw request body as a file to a session.
+
+    The file is added to the release when the session is committed. If the
+    request is interrupted, the file is discarded and must be sent again.
+    """
+    asf_uid = _jwt_asf_uid()
+    session = await _upload_session_read(session_id, asf_uid)
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(session.project_name)
+        try:
+            upload = await wacp.release.upload_start(session.project_name, session.version_name, relpath, session)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+        try:
+            offset = await wacp.release.upload_append(upload, 0, quart.request.body)
+        except BaseException:
+            await wacp.release.upload_discard(upload)
+            raise
+    return models.api.ReleaseUploadSessionStreamResults(
+        endpoint="/release/upload/session/stream",
+        upload_id=upload.upload_id,
+        relpath=upload.rel_path,
+        offset=offset,
+    ).model_dump(), 201
+
+
+@api.route("/release/upload/start", methods=["POST"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_request(models.api.ReleaseUploadStartArgs)
+@quart_schema.validate_response(models.api.ReleaseUploadStartResults, 201)
+async def release_upload_start(data: models.api.ReleaseUploadStartArgs) -> DictResponse:
+    """
+    Start a resumable upload of a file to a release.
+
+    The content of the file is sent in one or more chunks, and the upload is
+    then finished to add it to the release. If a session is given, the upload
+    is instead added to the release when the session is committed. Uploads
+    which are not written to for a day are removed.
+    """
+    asf_uid = _jwt_asf_uid()
+    session = None if (data.session is None) else await _upload_session_read(data.session, asf_uid)
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(data.project)
+        try:
+            upload = await wacp.release.upload_start(data.project, data.version, data.relpath, session)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+    return models.api.ReleaseUploadStartResults(
+        endpoint="/release/upload/start",
+        upload_id=upload.upload_id,
+        offset=0,
+    ).model_dump(), 201
+
+
+@api.route("/release/upload/status/<upload_id>")
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadStatusResults, 200)
+async def release_upload_status(upload_id: str) -> DictResponse:
+    """
+    Get the current offset of an upload, from which it can be resumed.
+    """
+    asf_uid = _jwt_asf_uid()
+    upload = await _upload_read(upload_id, asf_uid)
+    return models.api.ReleaseUploadStatusResults(
+        endpoint="/release/upload/status",
+        upload_id=upload.upload_id,
+        relpath=upload.rel_path,
+        offset=await uploads.offset(upload),
+    ).model_dump(), 200
+
+
+@api.route("/release/upload/stream/<project>/<version>/<path:relpath>", methods=["PUT"])
+@jwtoken.require
+@quart_schema.security_scheme([{"BearerAuth": []}])
+@quart_schema.validate_response(models.api.ReleaseUploadStreamResults, 201)
+async def release_upload_stream(project: str, version: str, relpath: str) -> DictResponse:
+    """
+    Upload the raw request body as a file to a release.
+
+    The body is written to disk as it is received, so the file is never held
+    in memory. Use the resumable upload endpoints for files which may not
+    arrive in a single request.
+    """
+    _simple_check(project, version)
+    asf_uid = _jwt_asf_uid()
+
+    async with storage.write(asf_uid) as write:
+        wacp = await write.as_project_committee_participant(project)
+        try:
+            upload = await wacp.release.upload_start(project, version, relpath)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+        try:
+            await wacp.release.upload_append(upload, 0, quart.request.body)
+            revision = await wacp.release.upload_finish(upload)
+        except uploads.UploadError as e:
+            raise exceptions.BadRequest(str(e))
+        finally:
+            await wacp.release.upload_discard(upload)
+    return models.api.ReleaseUploadStreamResults(
+        endpoint="/release/upload/stream",
+        revision=revision,
+    ).model_dump(), 201
+
+
 @api.route("/releases/list")
 @quart_schema.validate_querystring(models.api.ReleasesListQuery)
 @quart_schema.validate_response(models.api.ReleasesListResults, 200)
@@ -971,15 +1241,18 @@ async def signature_provenance(data: models.api.SignatureProvenanceArgs) -> Dict
                 f"Key with fingerprint {signer_fingerprint} not found",
             )
         )
+        # The index is updated whenever files enter a release, so this is a single lookup
+        matched_committee_names = await provenance.committees(
+            db_data,
+            data.signature_file_name,
+            data.signature_sha3_256,
+            (committee.name for committee in key.committees),
+        )
 
     downloads_dir = util.get_downloads_dir()
-    matched_committee_names = await _match_committee_names(key.committees, util.get_finished_dir(), data)
-
     for matched_committee_name in matched_committee_names:
         keys_file_path = downloads_dir / matched_committee_name / "KEYS"
-        async with aiofiles.open(keys_file_path, "rb") as f:
-            keys_file_data = await f.read()
-        keys_file_sha3_256 = hashlib.sha3_256(keys_file_data).hexdigest()
+        keys_file_sha3_256 = (await digests.read(keys_file_path)).sha3_256
         signing_keys.append(
             models.api.SignatureProvenanceKey(
                 committee=matched_committee_name,
@@ -1292,54 +1565,6 @@ def _jwt_asf_uid() -> str:
     return asf_uid
 
 
-async def _match_committee_names(
-    key_committees: list[sql.Committee], finished_dir: pathlib.Path, data: models.api.SignatureProvenanceArgs
-) -> set[str]:
-    key_committee_names = set(committee.name for committee in key_committees)
-    finished_dir = util.get_finished_dir()
-    matched_committee_names = set()
-
-    # Check for finished files
-    for key_committee_name in key_committee_names:
-        key_committee_finished_dir = finished_dir / key_committee_name
-        async for rel_path in util.paths_recursive(key_committee_finished_dir):
-            if rel_path.name == data.signature_file_name:
-                abs_path = finished_dir / rel_path
-                async with aiofiles.open(abs_path, "rb") as f:
-                    rel_path_data = await f.read()
-                rel_path_sha3_256 = hashlib.sha3_256(rel_path_data).hexdigest()
-                if rel_path_sha3_256 == data.signature_sha3_256:
-                    # We got a match
-                    matched_committee_names.add(key_committee_name)
-                    break
-
-    # Check for unfinished files
-    async with db.session() as db_data:
-        for key_committee_name in key_committee_names:
-            release_directories = []
-            projects = await db_data.project(committee_name=key_committee_name).all()
-            for project in projects:
-                releases = await db_data.release(project_name=project.name).all()
-                release_directories.extend(util.release_directory(release) for release in releases)
-            for release_directory in release_directories:
-                if await _match_unfinished(release_directory, data):
-                    matched_committee_names.add(key_committee_name)
-                    break
-    return matched_committee_names
-
-
-async def _match_unfinished(release_directory: pathlib.Path, data: models.api.SignatureProvenanceArgs) -> bool:
-    async for rel_path in util.paths_recursive(release_directory):
-        if rel_path.name == data.signature_file_name:
-            abs_path = release_directory / rel_path
-            async with aiofiles.open(abs_path, "rb") as f:
-                rel_path_data = await f.read()
-                rel_path_sha3_256 = hashlib.sha3_256(rel_path_data).hexdigest()
-                if rel_path_sha3_256 == data.signature_sha3_256:
-                    return True
-    return False
-
-
 def _pagination_args_validate(query_args: Any) -> None:
     # Users could request any amount using limit=N with arbitrarily high N
     # We therefore limit the maximum limit to 1000
@@ -1352,3 +1577,17 @@ def _simple_check(*args: str | None) -> None:
     for arg in args:
         if arg == "None":
             raise exceptions.BadRequest("Argument cannot be the string 'None'")
+
+
+async def _upload_read(upload_id: str, asf_uid: str) -> uploads_models.Upload:
+    try:
+        return await uploads.read(upload_id, asf_uid)
+    except uploads.UploadError as e:
+        raise exceptions.NotFound(str(e))
+
+
+async def _upload_session_read(session_id: str, asf_uid: str) -> uploads_models.Session:
+    try:
+        return await uploads.session_read(session_id, asf_uid)
+    except uploads.UploadError as e:
+        raise exceptions.NotFound(str(e))
@@ -15,19 +15,56 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from __future__ import annotations
+
+import fcntl
 import os
 import os.path
+import pathlib
+import shutil
 import tarfile
+import tempfile
+import time
 import zipfile
+from typing import IO, Final
 
+import atr.config as config
+import atr.digests as digests
 import atr.log as log
 import atr.tarzip as tarzip
+import atr.util as util
+
+# Entries used more recently than this are never evicted
+_CACHE_RECENT_SECONDS: Final = 60
+# Unfinished extractions older than this are assumed to have been abandoned
+_CACHE_STALE_SECONDS: Final = 3600
 
 
 class ExtractionError(Exception):
     pass
 
 
+class Extracted:
+    """A shared, read only extraction of an archive, which is protected from eviction until released."""
+
+    def __init__(self, path: str, size: int, lock_file: IO[bytes]) -> None:
+        self.path = path
+        self.size = size
+        self.__lock_file = lock_file
+
+    def __enter__(self) -> Extracted:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.release()
+
+    def release(self) -> None:
+        if self.__lock_file.closed:
+            return
+        fcntl.flock(self.__lock_file, fcntl.LOCK_UN)
+        self.__lock_file.close()
+
+
 def extract(
     archive_path: str,
     extract_dir: str,
@@ -70,6 +107,35 @@ def extract(
     return total_extracted, extracted_paths
 
 
+def extract_cached(archive_path: str, max_size: int, chunk_size: int) -> Extracted:
+    """Return the cached extraction of an archive, extracting and publishing it if necessary."""
+    # Entries are keyed by the digest of the archive, so copies in other revisions share an entry
+    digest = digests.compute(archive_path).sha256
+    cache_dir = util.get_cache_dir() / "extracted"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry_dir = cache_dir / digest
+
+    # Holding a shared lock on the lock file of an entry is a reference to that entry
+    # Eviction requires an exclusive lock, so it skips entries which are in use
+    lock_file = _cache_lock(cache_dir / f"{digest}.lock")
+    try:
+        if not entry_dir.is_dir():
+            # Consumers of other archives are not blocked, and consumers of this archive wait for one extraction
+            with open(cache_dir / f"{digest}.build", "ab") as build_file:
+                fcntl.flock(build_file, fcntl.LOCK_EX)
+                if not entry_dir.is_dir():
+                    _cache_publish(archive_path, cache_dir, entry_dir, max_size, chunk_size)
+        # The modification time of an entry records when it was last used
+        os.utime(entry_dir)
+        size = int((entry_dir / "size").read_text())
+    except BaseException:
+        lock_file.close()
+        raise
+
+    _cache_evict(cache_dir, digest)
+    return Extracted(str(entry_dir / "tree"), size, lock_file)
+
+
 def total_size(tgz_path: str, chunk_size: int = 4096) -> int:
     with tarzip.open_archive(tgz_path) as archive:
         match archive.specific():
@@ -232,6 +298,105 @@ def _archive_extract_safe_process_symlink(member: tarfile.TarInfo, extract_dir:
         log.warning(f"Failed to create symlink {target_path} -> {link_target}: {e}")
 
 
+def _cache_evict(cache_dir: pathlib.Path, keep: str) -> None:
+    """Evict the least recently used extractions until the cache fits within its size limit."""
+    entries = []
+    total = 0
+    for entry in cache_dir.iterdir():
+        if not entry.is_dir():
+            continue
+        if entry.name.startswith("tmp-"):
+            if (time.time() - entry.stat().st_mtime) > _CACHE_STALE_SECONDS:
+                shutil.rmtree(entry, ignore_errors=True)
+            continue
+        try:
+            size = int((entry / "size").read_text())
+        except (OSError, ValueError):
+            continue
+        entries.append((entry.stat().st_mtime, entry, size))
+        total += size
+
+    limit = config.get().EXTRACTION_CACHE_SIZE
+    for mtime, entry, size in sorted(entries):
+        if total <= limit:
+            break
+        if (entry.name == keep) or ((time.time() - mtime) < _CACHE_RECENT_SECONDS):
+            continue
+        if _cache_evict_entry(cache_dir, entry):
+            total -= size
+
+
+def _cache_evict_entry(cache_dir: pathlib.Path, entry: pathlib.Path) -> bool:
+    lock_path = cache_dir / f"{entry.name}.lock"
+    with open(lock_path, "ab") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # The entry is in use
+            return False
+        if not _cache_lock_current(lock_file, lock_path):
+            # Another process evicted the entry first
+            return False
+        if not entry.is_dir():
+            # Another process evicted the entry first, and this process recreated its lock file
+            lock_path.unlink()
+            return False
+        # Move the entry aside first, so that it disappears from the cache atomically
+        trash_dir = tempfile.mkdtemp(prefix="tmp-", dir=cache_dir)
+        os.rename(entry, os.path.join(trash_dir, entry.name))
+        # Nobody holds the entry lock, and the build lock is only taken while holding the entry lock
+        # Consumers which opened the entry lock file before its removal notice it, and open a new one
+        lock_path.unlink()
+        (cache_dir / f"{entry.name}.build").unlink(missing_ok=True)
+    shutil.rmtree(trash_dir, ignore_errors=True)
+    log.info(f"Evicted extraction {entry.name} from the cache")
+    return True
+
+
+def _cache_lock(lock_path: pathlib.Path) -> IO[bytes]:
+    """Take a shared lock on the lock file of an entry, which prevents eviction of the entry until released."""
+    while True:
+        lock_file = open(lock_path, "ab")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            if _cache_lock_current(lock_file, lock_path):
+                return lock_file
+        except BaseException:
+            lock_file.close()
+            raise
+        # The entry was evicted while we waited, and its lock file was removed
+        lock_file.close()
+
+
+def _cache_lock_current(lock_file: IO[bytes], lock_path: pathlib.Path) -> bool:
+    try:
+        return os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _cache_publish(
+    archive_path: str, cache_dir: pathlib.Path, entry_dir: pathlib.Path, max_size: int, chunk_size: int
+) -> None:
+    build_dir = pathlib.Path(tempfile.mkdtemp(prefix="tmp-", dir=cache_dir))
+    try:
+        tree_dir = build_dir / "tree"
+        tree_dir.mkdir()
+        extracted_size, _extracted_paths = extract(archive_path, str(tree_dir), max_size, chunk_size)
+        (build_dir / "size").write_text(str(extracted_size))
+        # Consumers share the tree, so they must not modify it
+        for root, _dirs, files in os.walk(tree_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if not os.path.islink(path):
+                    os.chmod(path, 0o444)
+        # Publish atomically, so that no consumer ever sees a partial tree
+        os.rename(build_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+
 def _safe_path(base_dir: str, *paths: str) -> str | None:
     """Return an absolute path within the base_dir built from the given paths, or None if it escapes."""
     target = os.path.abspath(os.path.join(base_dir, *paths))
@@ -0,0 +1,182 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Clones of directory trees which share file contents with their source, as used to create revisions."""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import fcntl
+import os
+import shutil
+from typing import TYPE_CHECKING, Final
+
+import aiofiles.os
+
+import atr.log as log
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Callable
+
+    import atr.models.manifest as models
+
+# The Linux ioctl which shares the extents of one file with another on filesystems such as Btrfs and XFS
+_FICLONE: Final = 0x40049409
+# Errors which mean that a method of cloning is not available for a file, rather than that the clone failed
+_UNSUPPORTED: Final = frozenset({errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EPERM, errno.EXDEV})
+
+
+class _Cloner:
+    """Clone files using the cheapest available method, falling back to the next method when one is unsupported."""
+
+    def __init__(self) -> None:
+        self.__methods: list[tuple[str, Callable[[str, str], None]]] = [
+            ("hard link", os.link),
+            ("reflink", _reflink),
+            ("copy", _copy),
+        ]
+
+    def clone(self, source_path: str, dest_path: str) -> None:
+        while True:
+            name, method = self.__methods[0]
+            try:
+                method(source_path, dest_path)
+                return
+            except OSError as e:
+                if (e.errno not in _UNSUPPORTED) or (len(self.__methods) == 1):
+                    raise
+            log.warning(f"Cannot {name} {source_path}, falling back to {self.__methods[1][0]}")
+            self.__methods.pop(0)
+
+
+async def tree(
+    source_dir: pathlib.Path,
+    dest_dir: pathlib.Path,
+    do_not_create_dest_dir: bool = False,
+    exist_ok: bool = False,
+    dry_run: bool = False,
+    source_manifest: models.Manifest | None = None,
+) -> None:
+    """Recursively clone source_dir to dest_dir, using hard links for files where possible.
+
+    If the manifest of source_dir is given, it is used instead of listing the source directory.
+    """
+    await _tree_checks(source_dir, dest_dir, do_not_create_dest_dir, exist_ok, dry_run)
+    # Every file is cloned in a single worker thread, rather than awaiting each one
+    await asyncio.to_thread(_tree, str(source_dir), str(dest_dir), exist_ok, dry_run, source_manifest)
+
+
+def _clone_file(cloner: _Cloner, source_path: str, dest_path: str, exist_ok: bool) -> None:
+    try:
+        cloner.clone(source_path, dest_path)
+    except FileExistsError:
+        if not exist_ok:
+            raise
+        os.remove(dest_path)
+        cloner.clone(source_path, dest_path)
+
+
+def _copy(source_path: str, dest_path: str) -> None:
+    if os.path.exists(dest_path):
+        raise FileExistsError(errno.EEXIST, "File exists", dest_path)
+    shutil.copy2(source_path, dest_path)
+
+
+def _listing(source_dir: str, rel_dir: str, directories: list[str], files: list[str]) -> None:
+    with os.scandir(os.path.join(source_dir, rel_dir)) as entries:
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir():
+                directories.append(rel_path)
+                _listing(source_dir, rel_path, directories, files)
+            elif entry.is_file():
+                files.append(rel_path)
+            # Ignore other types like symlinks for now
+
+
+def _reflink(source_path: str, dest_path: str) -> None:
+    with open(source_path, "rb") as source:
+        # Create the destination exclusively, like a hard link would, but remove it if the reflink fails
+        with open(dest_path, "xb") as dest:
+            try:
+                fcntl.ioctl(dest.fileno(), _FICLONE, source.fileno())
+            except OSError:
+                os.remove(dest_path)
+                raise
+    shutil.copystat(source_path, dest_path)
+
+
+def _tree(
+    source_dir: str, dest_dir: str, exist_ok: bool, dry_run: bool, source_manifest: models.Manifest | None
+) -> None:
+    directories: list[str] = []
+    files: list[str] = []
+    if source_manifest is not None:
+        directories = source_manifest.directories
+        files = [entry.path for entry in source_manifest.files]
+    else:
+        _listing(source_dir, "", directories, files)
+
+    if dry_run:
+        for rel_path in files:
+            if os.path.exists(os.path.join(dest_dir, rel_path)):
+                raise ValueError(f"Destination path exists: {os.path.join(dest_dir, rel_path)}")
+        return
+
+    for rel_path in directories:
+        os.makedirs(os.path.join(dest_dir, rel_path), exist_ok=True)
+    cloner = _Cloner()
+    for rel_path in files:
+        source_path = os.path.join(source_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        try:
+            _clone_file(cloner, source_path, dest_path, exist_ok)
+        except OSError as e:
+            log.error(f"Error cloning {source_path} to {dest_path}: {e}")
+            raise
+    log.info(f"Cloned {len(files)} files from {source_dir} to {dest_dir}")
+
+
+async def _tree_checks(
+    source_dir: pathlib.Path,
+    dest_dir: pathlib.Path,
+    do_not_create_dest_dir: bool = False,
+    exist_ok: bool = False,
+    dry_run: bool = False,
+) -> None:
+    if dry_run and ((not do_not_create_dest_dir) or (not exist_ok)):
+        raise ValueError("Cannot dry run and create destination directory or exist ok")
+
+    # Ensure source exists and is a directory
+    if (not dry_run) and (not await aiofiles.os.path.isdir(source_dir)):
+        raise ValueError(f"Source path is not a directory or does not exist: {source_dir}")
+
+    # Create destination directory
+    if do_not_create_dest_dir is False:
+        try:
+            await aiofiles.os.makedirs(dest_dir, exist_ok=exist_ok)
+        except FileExistsError:
+            log.error(
+                f"Arguments to clone._tree_checks: "
+                f"source_dir={source_dir}, "
+                f"dest_dir={dest_dir}, "
+                f"do_not_create_dest_dir={do_not_create_dest_dir}, "
+                f"exist_ok={exist_ok}"
+            )
+            raise
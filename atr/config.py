@@ -76,12 +76,18 @@ class AppConfig:
 
     # Apache RAT configuration
     APACHE_RAT_JAR_PATH = decouple.config("APACHE_RAT_JAR_PATH", default=f"/opt/tools/apache-rat-{_RAT_VERSION}.jar")
+    # Compiled classes of the persistent RAT server, which is not used if this directory is missing
+    APACHE_RAT_SERVER_PATH = decouple.config("APACHE_RAT_SERVER_PATH", default="/opt/tools/rat-server")
     # Maximum content length for requests
     MAX_CONTENT_LENGTH: int = decouple.config("MAX_CONTENT_LENGTH", default=512 * _MB, cast=int)
     # Maximum size limit for archive extraction
     MAX_EXTRACT_SIZE: int = decouple.config("MAX_EXTRACT_SIZE", default=2 * _GB, cast=int)
     # Chunk size for reading files during extraction
     EXTRACT_CHUNK_SIZE: int = decouple.config("EXTRACT_CHUNK_SIZE", default=4 * _MB, cast=int)
+    # Maximum total size of the extracted archives kept in the extraction cache
+    EXTRACTION_CACHE_SIZE: int = decouple.config("EXTRACTION_CACHE_SIZE", default=16 * _GB, cast=int)
+    # Maximum number of tasks that each worker process runs concurrently
+    WORKER_CONCURRENCY: int = decouple.config("WORKER_CONCURRENCY", default=4, cast=int)
 
     # FIXME: retrieve the list of admin users from LDAP or oath session / isRoot
     ADMIN_USERS_ADDITIONAL = decouple.config("ADMIN_USERS_ADDITIONAL", default="", cast=str)
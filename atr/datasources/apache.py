@@ -25,10 +25,10 @@ from typing import TYPE_CHECKING, Annotated, Any, Final
 if TYPE_CHECKING:
     from collections.abc import Mapping
 
-import aiohttp
 import sqlmodel
 
 import atr.db as db
+import atr.fetch as fetch
 import atr.log as log
 import atr.models.helpers as helpers
 import atr.models.schema as schema
@@ -225,10 +225,7 @@ class ProjectsData(helpers.DictRoot[ProjectStatus]):
 async def get_active_committee_data() -> CommitteeData:
     """Returns the list of currently active committees."""
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_WHIMSY_COMMITTEE_INFO_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_WHIMSY_COMMITTEE_INFO_URL)
 
     return CommitteeData.model_validate(data)
 
@@ -236,28 +233,19 @@ async def get_active_committee_data() -> CommitteeData:
 async def get_current_podlings_data() -> PodlingsData:
     """Returns the list of current podlings."""
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_PROJECTS_PODLINGS_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_PROJECTS_PODLINGS_URL)
     return PodlingsData.model_validate(data)
 
 
 async def get_groups_data() -> GroupsData:
     """Returns LDAP Groups with their members."""
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_PROJECTS_GROUPS_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_PROJECTS_GROUPS_URL)
     return GroupsData.model_validate(data)
 
 
 async def get_ldap_projects_data() -> LDAPProjectsData:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_WHIMSY_PROJECTS_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_WHIMSY_PROJECTS_URL)
 
     return LDAPProjectsData.model_validate(data)
 
@@ -265,20 +253,14 @@ async def get_ldap_projects_data() -> LDAPProjectsData:
 async def get_projects_data() -> ProjectsData:
     """Returns the list of projects."""
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_PROJECTS_PROJECTS_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_PROJECTS_PROJECTS_URL)
     return ProjectsData.model_validate(data)
 
 
 async def get_retired_committee_data() -> RetiredCommitteeData:
     """Returns the list of retired committees."""
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(_WHIMSY_COMMITTEE_RETIRED_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
+    data = await _get_json(_WHIMSY_COMMITTEE_RETIRED_URL)
 
     return RetiredCommitteeData.model_validate(data)
 
@@ -322,6 +304,13 @@ async def update_metadata() -> tuple[int, int]:
     return added_count, updated_count
 
 
+async def _get_json(url: str) -> Any:
+    # These documents are large and change rarely, so they are revalidated rather than fetched again
+    response = await fetch.get(url, cache_on_disk=True)
+    response.raise_for_status()
+    return response.json()
+
+
 def _project_status(pmc: sql.Committee, project_name: str, project_status: ProjectStatus) -> sql.ProjectStatus:
     if pmc.name == "attic":
         # This must come first, because attic is also a standing committee
@@ -0,0 +1,202 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Digests of files computed in a single pass, and stored by file identity so that each file is read only once."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import hashlib
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Final
+
+import pydantic
+
+import atr.config as config
+import atr.log as log
+import atr.models.digests as models
+
+if TYPE_CHECKING:
+    import io
+
+_BUFFER_SIZE: Final = 1024 * 1024
+_MEMORY_SIZE: Final = 4096
+# Stored digests are checked for files which no longer exist at most this often
+_PRUNE_INTERVAL_SECONDS: Final = 60 * 60
+
+type _Key = tuple[int, int, int, int, int]
+
+# Recently used digests, keyed by device, inode, size, modification time, and status change time
+_global_memory: collections.OrderedDict[_Key, models.Digests] = collections.OrderedDict()
+_global_memory_lock: Final = threading.Lock()
+
+
+class Hasher:
+    """Compute all of the digests of some content incrementally, e.g. while it is being written."""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.__sha256 = hashlib.sha256()
+        self.__sha512 = hashlib.sha512()
+        self.__sha3_256 = hashlib.sha3_256()
+
+    def digests(self, st: os.stat_result) -> models.Digests:
+        return models.Digests(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            ctime_ns=st.st_ctime_ns,
+            sha256=self.__sha256.hexdigest(),
+            sha512=self.__sha512.hexdigest(),
+            sha3_256=self.__sha3_256.hexdigest(),
+        )
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        self.size += len(chunk)
+        self.__sha256.update(chunk)
+        self.__sha512.update(chunk)
+        self.__sha3_256.update(chunk)
+
+
+def compute(abs_path: str | os.PathLike[str]) -> models.Digests:
+    """Return the digests of a file, reading it only if they are not already stored."""
+    with open(abs_path, "rb") as f:
+        before = os.fstat(f.fileno())
+        key = _key(before)
+        with _global_memory_lock:
+            if (cached := _global_memory.get(key)) is not None:
+                _global_memory.move_to_end(key)
+                return cached
+        store_path = _store_path(before)
+        if (stored := _store_read(store_path, before)) is None:
+            stored = _digests(f, before)
+            after = os.fstat(f.fileno())
+            # A file which changed while it was read has no single set of digests to store
+            if _key(after) != key:
+                return stored
+            _store_write(store_path, abs_path, stored)
+    _memory_add(key, stored)
+    return stored
+
+
+def prune() -> None:
+    """Remove the stored digests of files which no longer exist, or whose inodes have been reused."""
+    store_dir = _store_dir()
+    marker_path = store_dir / ".pruned"
+    try:
+        if (time.time() - marker_path.stat().st_mtime) < _PRUNE_INTERVAL_SECONDS:
+            return
+    except FileNotFoundError:
+        pass
+    if not store_dir.is_dir():
+        return
+    marker_path.touch()
+    removed = 0
+    for entry in store_dir.iterdir():
+        if (entry.suffix == ".json") and (not _store_current(entry)):
+            entry.unlink(missing_ok=True)
+            removed += 1
+    if removed:
+        log.info(f"Removed {removed} stored digests of files which no longer exist")
+
+
+async def read(path: pathlib.Path | str) -> models.Digests:
+    """Return the digests of a file, computing them in a worker thread if necessary."""
+    return await asyncio.to_thread(compute, path)
+
+
+def record(abs_path: str | os.PathLike[str], hasher: Hasher) -> models.Digests:
+    """Store the digests of a file which were computed as it was written, so that it need not be read."""
+    st = os.stat(abs_path)
+    if st.st_size != hasher.size:
+        raise ValueError(f"Digests of {hasher.size} bytes do not match {abs_path} of {st.st_size} bytes")
+    recorded = hasher.digests(st)
+    _store_write(_store_path(st), abs_path, recorded)
+    _memory_add(_key(st), recorded)
+    return recorded
+
+
+def _digests(f: io.BufferedReader, st: os.stat_result) -> models.Digests:
+    hasher = Hasher()
+    buffer = bytearray(_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while size := f.readinto(buffer):
+        hasher.update(view[:size])
+    log.info(f"Computed digests of {f.name} ({st.st_size} bytes)")
+    return hasher.digests(st)
+
+
+def _key(st: os.stat_result) -> _Key:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+def _memory_add(key: _Key, value: models.Digests) -> None:
+    with _global_memory_lock:
+        _global_memory[key] = value
+        while len(_global_memory) > _MEMORY_SIZE:
+            _global_memory.popitem(last=False)
+
+
+def _store_current(store_path: pathlib.Path) -> bool:
+    try:
+        stored = models.Stored.model_validate_json(store_path.read_bytes())
+        st = os.stat(stored.path)
+    except (OSError, pydantic.ValidationError):
+        return False
+    # The file may have been removed from this path while a hard link to it remains elsewhere, but then it is
+    # read again on its next use, which is cheaper than finding every link to it
+    return store_path.name == _store_path(st).name
+
+
+def _store_dir() -> pathlib.Path:
+    return pathlib.Path(config.get().STATE_DIR) / "cache" / "digests"
+
+
+def _store_path(st: os.stat_result) -> pathlib.Path:
+    # Each inode has at most one entry, which is replaced if the inode is reused
+    return _store_dir() / f"{st.st_dev:x}-{st.st_ino:x}.json"
+
+
+def _store_read(store_path: pathlib.Path, st: os.stat_result) -> models.Digests | None:
+    try:
+        stored = models.Stored.model_validate_json(store_path.read_bytes()).digests
+    except FileNotFoundError:
+        return None
+    except (OSError, pydantic.ValidationError) as e:
+        log.warning(f"Ignoring unreadable digests {store_path}: {e}")
+        return None
+    # A reused inode may hold other contents of the same size and modification time, but not the same status change time
+    if (stored.size, stored.mtime_ns, stored.ctime_ns) != (st.st_size, st.st_mtime_ns, st.st_ctime_ns):
+        return None
+    return stored
+
+
+def _store_write(store_path: pathlib.Path, abs_path: str | os.PathLike[str], stored: models.Digests) -> None:
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file and rename, so that readers never see partial digests
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=store_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(models.Stored(path=os.path.abspath(abs_path), digests=stored).model_dump_json())
+        os.rename(tmp_path, store_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
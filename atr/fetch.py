@@ -0,0 +1,256 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""A shared HTTP client for the outbound requests of a process, with pooled connections and retries."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import dataclasses
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+import urllib.parse
+from typing import TYPE_CHECKING, Any, Final
+
+import aiohttp
+
+import atr.config as config
+import atr.log as log
+
+if TYPE_CHECKING:
+    import types
+    from collections.abc import Mapping
+
+_ATTEMPTS: Final = 3
+_BACKOFF_SECONDS: Final = 0.5
+_CACHE_HEADERS: Final = ("content-type", "etag", "last-modified")
+_DNS_CACHE_SECONDS: Final = 300
+_LIMIT: Final = 100
+_LIMIT_PER_HOST: Final = 16
+_RETRY_STATUSES: Final = frozenset({429, 500, 502, 503, 504})
+_TIMEOUT: Final = aiohttp.ClientTimeout(total=60, sock_connect=10)
+
+# Revalidations of responses stored on disk in this process
+cache: Final[collections.Counter[str]] = collections.Counter()
+
+# Sessions by event loop, because a session cannot be used from any other event loop
+_global_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+@dataclasses.dataclass
+class Latency:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+
+# Requests and their latencies in this process, by host
+latencies: Final[collections.defaultdict[str, Latency]] = collections.defaultdict(Latency)
+
+
+class StatusError(aiohttp.ClientError):
+    """A response had an error status."""
+
+    def __init__(self, url: str, status: int, message: str):
+        super().__init__(f"{status} {message} for {url}")
+        self.url = url
+        self.status = status
+        self.message = message
+
+
+@dataclasses.dataclass
+class Response:
+    url: str
+    status: int
+    reason: str
+    # Header names are in lower case
+    headers: dict[str, str]
+    content: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise StatusError(self.url, self.status, self.reason)
+
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+async def close() -> None:
+    """Close the shared session of the running event loop, if there is one."""
+    if (shared := _global_sessions.pop(asyncio.get_running_loop(), None)) is not None:
+        await shared.close()
+
+
+async def get(
+    url: str,
+    *,
+    allow_redirects: bool = True,
+    cache_on_disk: bool = False,
+    headers: Mapping[str, str] | None = None,
+    client_timeout: aiohttp.ClientTimeout | None = None,
+) -> Response:
+    """GET a URL, retrying connection errors, timeouts, and transient error statuses.
+
+    With cache_on_disk, the response is stored and later revalidated using its ETag or Last-Modified header.
+    """
+    request_headers = dict(headers or {})
+    stored = (await asyncio.to_thread(_cache_read, url)) if cache_on_disk else None
+    if stored is not None:
+        if etag := stored.headers.get("etag"):
+            request_headers["If-None-Match"] = etag
+        if last_modified := stored.headers.get("last-modified"):
+            request_headers["If-Modified-Since"] = last_modified
+
+    for attempt in range(_ATTEMPTS - 1):
+        try:
+            response = await _get(url, allow_redirects, request_headers, client_timeout)
+        except (aiohttp.ClientConnectionError, TimeoutError) as e:
+            log.warning(f"Retrying GET {url} after error: {e}")
+        else:
+            if response.status not in _RETRY_STATUSES:
+                return await _revalidated(url, response, stored, cache_on_disk)
+            log.warning(f"Retrying GET {url} after status {response.status}")
+        latencies[_host(url)].retries += 1
+        await asyncio.sleep(_BACKOFF_SECONDS * (2**attempt))
+    response = await _get(url, allow_redirects, request_headers, client_timeout)
+    return await _revalidated(url, response, stored, cache_on_disk)
+
+
+def session() -> aiohttp.ClientSession:
+    """Return the shared session of the running event loop, creating it if necessary.
+
+    Callers must not close the session, which is closed by close() on shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    shared = _global_sessions.get(loop)
+    if (shared is not None) and (not shared.closed):
+        return shared
+
+    # Forget the sessions of any event loops which have since been closed
+    for closed_loop in [other for other in _global_sessions if other.is_closed()]:
+        del _global_sessions[closed_loop]
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_trace_start)
+    trace_config.on_request_end.append(_trace_end)
+    trace_config.on_request_exception.append(_trace_exception)
+    connector = aiohttp.TCPConnector(limit=_LIMIT, limit_per_host=_LIMIT_PER_HOST, ttl_dns_cache=_DNS_CACHE_SECONDS)
+    shared = aiohttp.ClientSession(connector=connector, timeout=_TIMEOUT, trace_configs=[trace_config])
+    _global_sessions[loop] = shared
+    return shared
+
+
+def _cache_path(url: str) -> pathlib.Path:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return pathlib.Path(config.get().STATE_DIR) / "cache" / "http" / digest[:2] / digest
+
+
+def _cache_read(url: str) -> Response | None:
+    try:
+        with open(_cache_path(url), "rb") as f:
+            metadata = json.loads(f.readline())
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring unreadable stored response for {url}: {e}")
+        return None
+    return Response(url=metadata["url"], status=200, reason="OK", headers=metadata["headers"], content=content)
+
+
+def _cache_write(url: str, response: Response) -> None:
+    cache_path = _cache_path(url)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    headers = {name: response.headers[name] for name in _CACHE_HEADERS if name in response.headers}
+    # The metadata and content are written to a single file and renamed, so that they always match
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=cache_path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps({"url": response.url, "headers": headers}).encode("utf-8") + b"\n")
+            f.write(response.content)
+        os.rename(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+async def _get(
+    url: str, allow_redirects: bool, headers: dict[str, str], client_timeout: aiohttp.ClientTimeout | None
+) -> Response:
+    shared = session()
+    async with shared.get(
+        url, allow_redirects=allow_redirects, headers=headers, timeout=client_timeout or shared.timeout
+    ) as response:
+        content = await response.read()
+        return Response(
+            url=str(response.url),
+            status=response.status,
+            reason=response.reason or "",
+            headers={name.lower(): value for name, value in response.headers.items()},
+            content=content,
+        )
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlsplit(url).hostname or ""
+
+
+async def _revalidated(url: str, response: Response, stored: Response | None, cache_on_disk: bool) -> Response:
+    if (stored is not None) and (response.status == 304):
+        cache["not modified"] += 1
+        return stored
+    if (
+        cache_on_disk
+        and (response.status == 200)
+        and (("etag" in response.headers) or ("last-modified" in response.headers))
+    ):
+        cache["stored"] += 1
+        await asyncio.to_thread(_cache_write, url, response)
+    return response
+
+
+async def _trace_end(
+    _session: aiohttp.ClientSession, context: types.SimpleNamespace, params: aiohttp.TraceRequestEndParams
+) -> None:
+    # This is the time until the response headers arrive, and excludes reading the body
+    elapsed_ns = time.perf_counter_ns() - context.start_ns
+    latency = latencies[params.url.host or ""]
+    latency.requests += 1
+    latency.total_ns += elapsed_ns
+    latency.max_ns = max(latency.max_ns, elapsed_ns)
+
+
+async def _trace_exception(
+    _session: aiohttp.ClientSession, _context: types.SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+) -> None:
+    latencies[params.url.host or ""].errors += 1
+
+
+async def _trace_start(
+    _session: aiohttp.ClientSession, context: types.SimpleNamespace, _params: aiohttp.TraceRequestStartParams
+) -> None:
+    context.start_ns = time.perf_counter_ns()
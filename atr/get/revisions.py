@@ -31,6 +31,7 @@ import atr.get.compose as compose
 import atr.get.finish as finish
 import atr.get.root as root
 import atr.htm as htm
+import atr.manifest as manifest
 import atr.models.schema as schema
 import atr.models.sql as sql
 import atr.post as post
@@ -77,17 +78,14 @@ async def selected(session: web.Committer, project_name: str, version_name: str)
         revisions_list: list[sql.Revision] = list(revisions_result.scalars().all())
 
     revision_history = []
-    loop_prev_revision_files: set[pathlib.Path] | None = None
     loop_prev_revision_number: str | None = None
     for current_db_revision in revisions_list:
-        current_files_for_diff, files_diff_for_current = await _revision_files_diff(
+        files_diff_for_current = await _revision_diff(
             revision_number=current_db_revision.number,
             release_dir=release_dir,
-            prev_revision_files=loop_prev_revision_files,
             prev_revision_number=loop_prev_revision_number,
         )
         revision_history.append((current_db_revision, files_diff_for_current))
-        loop_prev_revision_files = current_files_for_diff
         loop_prev_revision_number = current_db_revision.number
 
     content = await _render_page(
@@ -291,27 +289,48 @@ def _render_tag_form(body: htm.Block, revision: sql.Revision, project_name: str,
     ]
 
 
+async def _revision_diff(
+    revision_number: str, release_dir: pathlib.Path, prev_revision_number: str | None
+) -> FilesDiff:
+    """Return the diff of a revision from the previous revision, using the stored diff where possible."""
+    revision_dir = release_dir / revision_number
+    stored = await manifest.diff_read(revision_dir)
+    if (stored is None) or (stored.parent != prev_revision_number):
+        # The stored diff is missing, or is relative to a different revision
+        current_manifest = await manifest.read(revision_dir)
+        prev_manifest = None
+        if prev_revision_number is not None:
+            prev_manifest = await manifest.read(release_dir / prev_revision_number)
+        if (current_manifest is None) or ((prev_revision_number is not None) and (prev_manifest is None)):
+            return await _revision_files_diff(revision_dir, release_dir, prev_revision_number)
+        stored = manifest.diff(prev_revision_number, prev_manifest, current_manifest)
+    return FilesDiff(
+        added=[pathlib.Path(p) for p in stored.added],
+        removed=[pathlib.Path(p) for p in stored.removed],
+        modified=[pathlib.Path(p) for p in stored.modified],
+    )
+
+
 async def _revision_files_diff(
-    revision_number: str,
+    latest_revision_dir: pathlib.Path,
     release_dir: pathlib.Path,
-    prev_revision_files: set[pathlib.Path] | None,
     prev_revision_number: str | None,
-) -> tuple[set[pathlib.Path], FilesDiff]:
-    """Process a single revision and calculate its diff from the previous."""
-    latest_revision_dir = release_dir / revision_number
+) -> FilesDiff:
+    """Calculate the diff of a revision from the previous by walking both, for revisions without manifests."""
     latest_revision_files = {path async for path in util.paths_recursive(latest_revision_dir)}
 
     added_files: set[pathlib.Path] = set()
     removed_files: set[pathlib.Path] = set()
     modified_files: set[pathlib.Path] = set()
 
-    if (prev_revision_files is not None) and (prev_revision_number is not None):
+    if prev_revision_number is not None:
+        parent_revision_dir = release_dir / prev_revision_number
+        prev_revision_files = {path async for path in util.paths_recursive(parent_revision_dir)}
         added_files = latest_revision_files - prev_revision_files
         removed_files = prev_revision_files - latest_revision_files
         common_files = latest_revision_files & prev_revision_files
 
         # Check modification times for common files
-        parent_revision_dir = release_dir / prev_revision_number
         mtime_tasks = []
         for common_file in common_files:
 
@@ -337,4 +356,4 @@ async def _revision_files_diff(
         removed=sorted(list(removed_files)),
         modified=sorted(list(modified_files)),
     )
-    return latest_revision_files, files_diff
+    return files_diff
@@ -17,9 +17,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import datetime as datetime
 import functools
 import secrets as secrets
+import time
 from typing import TYPE_CHECKING, Any, Final
 
 import aiohttp
@@ -28,6 +31,8 @@ import jwt
 import quart
 
 import atr.config as config
+import atr.fetch as fetch
+import atr.log as log
 
 _ALGORITHM: Final[str] = "HS256"
 _GITHUB_OIDC_AUDIENCE: Final[str] = "atr-test-v1"
@@ -38,10 +43,29 @@ _GITHUB_OIDC_EXPECTED: Final[dict[str, str]] = {
     "runner_environment": "github-hosted",
 }
 _GITHUB_OIDC_ISSUER: Final[str] = "https://token.actions.githubusercontent.com"
+_GITHUB_OIDC_TIMEOUT: Final = aiohttp.ClientTimeout(total=5)
+# Bounds on how long the discovery document and keys are kept, whatever their Cache-Control headers say
+# The lower bound also limits how often tokens with unknown key identifiers can cause the keys to be fetched
+_OIDC_MAX_AGE_DEFAULT: Final[int] = 300
+_OIDC_MAX_AGE_MAXIMUM: Final[int] = 86400
+_OIDC_MAX_AGE_MINIMUM: Final[int] = 60
 _JWT_SECRET_KEY: Final[str] = config.get().JWT_SECRET_KEY
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable, Coroutine
+    from collections.abc import Awaitable, Callable, Coroutine, Mapping
+
+
+@dataclasses.dataclass
+class _OIDCKeys:
+    keys: dict[str, jwt.PyJWK]
+    fetched: float
+    expires: float
+
+
+# The GitHub OIDC signing keys, and the JWKS URI with the time at which it expires
+_global_github_keys: _OIDCKeys | None = None
+_global_github_keys_lock: Final = asyncio.Lock()
+_global_github_jwks_uri: tuple[str, float] | None = None
 
 
 def issue(uid: str, *, ttl: int = 90 * 60) -> str:
@@ -90,19 +114,9 @@ def verify(token: str) -> dict[str, Any]:
 
 
 async def verify_github_oidc(token: str) -> dict[str, Any]:
-    try:
-        async with aiohttp.ClientSession() as session:
-            r = await session.get(
-                f"{_GITHUB_OIDC_ISSUER}/.well-known/openid-configuration",
-                timeout=aiohttp.ClientTimeout(total=5),
-            )
-            r.raise_for_status()
-            jwks_uri = (await r.json())["jwks_uri"]
-    except Exception:
-        jwks_uri = f"{_GITHUB_OIDC_ISSUER}/.well-known/jwks"
-
-    jwks_client = jwt.PyJWKClient(jwks_uri)
-    signing_key = jwks_client.get_signing_key_from_jwt(token)
+    """Verify a GitHub OIDC token, using cached signing keys unless the token has an unknown key identifier."""
+    key_id = jwt.get_unverified_header(token).get("kid")
+    signing_key = await _github_signing_key(key_id)
     payload = jwt.decode(
         token,
         key=signing_key.key,
@@ -132,3 +146,68 @@ def _extract_bearer_token(request: quart.Request) -> str:
             "Authentication required. Please provide a valid Bearer token in the Authorization header", errorcode=401
         )
     return token
+
+
+async def _github_jwks_uri() -> str:
+    global _global_github_jwks_uri
+    if (_global_github_jwks_uri is not None) and (time.monotonic() < _global_github_jwks_uri[1]):
+        return _global_github_jwks_uri[0]
+    try:
+        r = await fetch.get(
+            f"{_GITHUB_OIDC_ISSUER}/.well-known/openid-configuration", client_timeout=_GITHUB_OIDC_TIMEOUT
+        )
+        r.raise_for_status()
+        jwks_uri = r.json()["jwks_uri"]
+    except Exception:
+        return f"{_GITHUB_OIDC_ISSUER}/.well-known/jwks"
+    _global_github_jwks_uri = (jwks_uri, time.monotonic() + _max_age(r.headers))
+    return jwks_uri
+
+
+async def _github_keys_fetch() -> _OIDCKeys:
+    r = await fetch.get(await _github_jwks_uri(), client_timeout=_GITHUB_OIDC_TIMEOUT)
+    r.raise_for_status()
+    key_set = jwt.PyJWKSet.from_dict(r.json())
+    now = time.monotonic()
+    keys = {key.key_id: key for key in key_set.keys if key.key_id}
+    return _OIDCKeys(keys=keys, fetched=now, expires=now + _max_age(r.headers))
+
+
+def _github_keys_stale(github_keys: _OIDCKeys | None, key_id: str | None) -> bool:
+    if github_keys is None:
+        return True
+    now = time.monotonic()
+    if now >= github_keys.expires:
+        return True
+    # GitHub may have rotated its keys, but the keys are not fetched again too soon after the last fetch
+    return (key_id not in github_keys.keys) and (now >= github_keys.fetched + _OIDC_MAX_AGE_MINIMUM)
+
+
+async def _github_signing_key(key_id: str | None) -> jwt.PyJWK:
+    global _global_github_keys
+    if _github_keys_stale(_global_github_keys, key_id):
+        async with _global_github_keys_lock:
+            # Another request may have fetched the keys while this one was waiting for the lock
+            if _github_keys_stale(_global_github_keys, key_id):
+                try:
+                    _global_github_keys = await _github_keys_fetch()
+                except Exception as e:
+                    if _global_github_keys is None:
+                        raise jwt.PyJWKClientConnectionError(f"Failed to fetch the GitHub OIDC keys: {e}") from e
+                    log.warning(f"Using previously fetched GitHub OIDC keys after failing to fetch them: {e}")
+                    # Otherwise every request during an outage would wait for its own failed fetch
+                    now = time.monotonic()
+                    _global_github_keys.fetched = now
+                    _global_github_keys.expires = max(_global_github_keys.expires, now + _OIDC_MAX_AGE_MINIMUM)
+    if (_global_github_keys is None) or (key_id not in _global_github_keys.keys):
+        raise jwt.PyJWKClientError(f"Unable to find a signing key that matches: {key_id}")
+    return _global_github_keys.keys[key_id]
+
+
+def _max_age(headers: Mapping[str, str]) -> int:
+    max_age = _OIDC_MAX_AGE_DEFAULT
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if (name.lower() == "max-age") and value.isdigit():
+            max_age = int(value)
+    return min(max(max_age, _OIDC_MAX_AGE_MINIMUM), _OIDC_MAX_AGE_MAXIMUM)
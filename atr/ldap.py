@@ -26,8 +26,16 @@ import ldap3
 import ldap3.utils.conv as conv
 import ldap3.utils.dn as dn
 
+LDAP_CHAIRS_BASE: Final[str] = "cn=pmc-chairs,ou=groups,ou=services,dc=apache,dc=org"
+LDAP_MEMBER_BASE: Final[str] = "cn=member,ou=groups,dc=apache,dc=org"
+LDAP_PMCS_BASE: Final[str] = "ou=project,ou=groups,dc=apache,dc=org"
+LDAP_ROOT_BASE: Final[str] = "cn=infrastructure-root,ou=groups,ou=services,dc=apache,dc=org"
 LDAP_SEARCH_BASE: Final[str] = "ou=people,dc=apache,dc=org"
 LDAP_SERVER_HOST: Final[str] = "ldap-eu.apache.org"
+LDAP_TOOLING_BASE: Final[str] = "cn=tooling,ou=groups,ou=services,dc=apache,dc=org"
+
+# The number of searches made by this process, by the scope of the search, for monitoring
+searches: Final[collections.Counter[str]] = collections.Counter()
 
 
 class Search:
@@ -62,6 +70,7 @@ class Search:
             raise RuntimeError("LDAP connection not available")
 
         attributes = ldap_attrs if ldap_attrs else ldap3.ALL_ATTRIBUTES
+        searches[ldap_scope.lower()] += 1
         self._conn.search(
             search_base=ldap_base,
             search_filter=ldap_query,
@@ -94,6 +103,7 @@ class SearchParameters:
     detail_err: str | None = None
     connection: ldap3.Connection | None = None
     email_only: bool = False
+    attributes: list[str] | None = None
 
 
 async def github_to_apache(github_numeric_uid: int) -> str:
@@ -188,6 +198,9 @@ def _search_core_2(params: SearchParameters, filters: list[str]) -> None:
 
     email_attributes = ["uid", "mail", "asf-altEmail", "asf-committer-email"]
     attributes = email_attributes if params.email_only else ldap3.ALL_ATTRIBUTES
+    if params.attributes is not None:
+        attributes = params.attributes
+    searches["people"] += 1
     params.connection.search(
         search_base=LDAP_SEARCH_BASE,
         search_filter=search_filter,
@@ -20,19 +20,30 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import datetime
 import io
 import os
 import signal
 import sys
+from typing import Any, Final
 
+import aiofiles.os
 import sqlalchemy.engine as engine
+import sqlalchemy.event as event
+import sqlalchemy.orm as orm
 import sqlmodel
 
+import atr.config as config
 import atr.db as db
 import atr.log as log
 import atr.models.sql as sql
 
+# Messages sent to the worker notification socket
+NOTIFY_QUEUED: Final = b"queued\n"
+NOTIFY_SUBSCRIBE: Final = b"subscribe\n"
+NOTIFY_WAKE: Final = b"\n"
+
 # Global debug flag to control worker process output capturing
 global_worker_debug: bool = False
 
@@ -40,6 +51,9 @@ global_worker_debug: bool = False
 # Can't use "StringClass" | None, must use Optional["StringClass"] for forward references
 global_worker_manager: WorkerManager | None = None
 
+# Notifications in flight from processes other than the manager
+_global_notify_tasks: set[asyncio.Task] = set()
+
 
 class WorkerManager:
     """Manager for a pool of worker processes."""
@@ -58,6 +72,8 @@ class WorkerManager:
         self.workers: dict[int, WorkerProcess] = {}
         self.running = False
         self.check_task: asyncio.Task | None = None
+        self.notify_server: asyncio.Server | None = None
+        self.subscribers: set[asyncio.StreamWriter] = set()
 
     async def start(self) -> None:
         """Start the worker manager."""
@@ -67,6 +83,12 @@ class WorkerManager:
         self.running = True
         log.info(f"Starting worker manager in {os.getcwd()}")
 
+        # Workers wait on this socket to be woken when tasks are queued
+        path = notify_socket_path()
+        with contextlib.suppress(FileNotFoundError):
+            await aiofiles.os.remove(path)
+        self.notify_server = await asyncio.start_unix_server(self.notify_connection, path=path)
+
         # Start initial workers
         for _ in range(self.min_workers):
             await self.spawn_worker()
@@ -93,6 +115,13 @@ class WorkerManager:
         # Stop all workers
         await self.stop_all_workers()
 
+        if self.notify_server is not None:
+            self.notify_server.close()
+            self.notify_server = None
+        for writer in self.subscribers:
+            writer.close()
+        self.subscribers.clear()
+
     async def stop_all_workers(self) -> None:
         """Stop all worker processes."""
         for worker in list(self.workers.values()):
@@ -121,6 +150,30 @@ class WorkerManager:
 
         self.workers.clear()
 
+    async def notify_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle a connection to the worker notification socket."""
+        try:
+            message = await reader.readline()
+            if message == NOTIFY_SUBSCRIBE:
+                # Idle workers stay subscribed until they exit
+                self.subscribers.add(writer)
+                await reader.read()
+            elif message == NOTIFY_QUEUED:
+                self.notify_workers()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            ...
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    def notify_workers(self) -> None:
+        """Wake all subscribed workers so that they claim newly queued tasks."""
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+                continue
+            writer.write(NOTIFY_WAKE)
+
     async def spawn_worker(self) -> None:
         """Spawn a new worker process."""
         if len(self.workers) >= self.max_workers:
@@ -236,7 +289,9 @@ class WorkerManager:
         # Reset any tasks that were being processed by now inactive workers
         await self.reset_broken_tasks()
 
-    async def terminate_long_running_task(self, task: sql.Task, worker: WorkerProcess, task_id: int, pid: int) -> None:
+    async def terminate_long_running_task(
+        self, data: db.Session, task: sql.Task, worker: WorkerProcess, task_id: int, pid: int
+    ) -> None:
         """
         Terminate a task that has been running for too long.
         Updates the task status and terminates the worker process.
@@ -246,6 +301,8 @@ class WorkerManager:
             task.status = sql.TaskStatus.FAILED
             task.completed = datetime.datetime.now(datetime.UTC)
             task.error = f"Task terminated after exceeding time limit of {self.max_task_seconds} seconds"
+            # Dependents are only claimed once their parent completes, so they would otherwise stay queued
+            await task_dependents_cancel(data, task_id)
 
             if worker.pid:
                 os.kill(worker.pid, signal.SIGTERM)
@@ -262,14 +319,15 @@ class WorkerManager:
         """
         try:
             async with data.begin():
-                task = await data.task(pid=pid, status=sql.TaskStatus.ACTIVE).get()
-                if not task or not task.started:
-                    return False
+                # A worker may run several tasks concurrently
+                for task in await data.task(pid=pid, status=sql.TaskStatus.ACTIVE).all():
+                    if not task.started:
+                        continue
 
-                task_duration = (datetime.datetime.now(datetime.UTC) - task.started).total_seconds()
-                if task_duration > self.max_task_seconds:
-                    await self.terminate_long_running_task(task, worker, task.id, pid)
-                    return True
+                    task_duration = (datetime.datetime.now(datetime.UTC) - task.started).total_seconds()
+                    if task_duration > self.max_task_seconds:
+                        await self.terminate_long_running_task(data, task, worker, task.id, pid)
+                        return True
 
                 return False
         except Exception as e:
@@ -341,6 +399,7 @@ class WorkerManager:
                         return
                     if result.rowcount > 0:
                         log.info(f"Reset {result.rowcount} tasks to state 'QUEUED' due to worker issues")
+                        self.notify_workers()
 
         except Exception as e:
             log.error(f"Error resetting broken tasks: {e}")
@@ -388,3 +447,73 @@ def get_worker_manager() -> WorkerManager:
     if global_worker_manager is None:
         global_worker_manager = WorkerManager()
     return global_worker_manager
+
+
+def notify_socket_path() -> str:
+    return os.path.join(config.get().STATE_DIR, "worker-notify.sock")
+
+
+async def task_dependents_cancel(data: db.Session, task_id: int) -> None:
+    """Cancel the queued tasks which depend on a task that failed."""
+    via = sql.validate_instrumented_attribute
+    update_stmt = (
+        sqlmodel.update(sql.Task)
+        .where(via(sql.Task.depends_on_id) == task_id, via(sql.Task.status) == sql.TaskStatus.QUEUED)
+        .values(
+            status=sql.TaskStatus.FAILED,
+            completed=datetime.datetime.now(datetime.UTC),
+            error=f"Cancelled because task {task_id} failed",
+        )
+    )
+    result = await data.execute(update_stmt)
+    # Avoid a type error with result.rowcount
+    rowcount: int = getattr(result, "rowcount", 0)
+    if rowcount:
+        log.info(f"Cancelled {rowcount} tasks which depend on task {task_id}")
+
+
+def tasks_queued_notify() -> None:
+    """Wake idle workers because tasks have been queued."""
+    if (global_worker_manager is not None) and global_worker_manager.running:
+        global_worker_manager.notify_workers()
+        return
+
+    # Other processes, such as workers which queue follow up tasks, notify through the socket
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    notify_task = loop.create_task(_notify_send())
+    _global_notify_tasks.add(notify_task)
+    notify_task.add_done_callback(_global_notify_tasks.discard)
+
+
+async def _notify_send() -> None:
+    try:
+        _reader, writer = await asyncio.open_unix_connection(notify_socket_path())
+        writer.write(NOTIFY_QUEUED)
+        await writer.drain()
+        writer.close()
+    except OSError:
+        # Workers still poll occasionally, so a lost notification only adds latency
+        ...
+
+
+@event.listens_for(orm.Session, "after_commit")
+def _session_after_commit(session: orm.Session) -> None:
+    if session.info.pop("tasks_queued", False):
+        tasks_queued_notify()
+
+
+@event.listens_for(orm.Session, "after_flush")
+def _session_after_flush(session: orm.Session, flush_context: Any) -> None:
+    # Records whether this transaction queued any tasks, to notify workers once it commits
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, sql.Task) and (obj.status == sql.TaskStatus.QUEUED):
+            session.info["tasks_queued"] = True
+            return
+
+
+@event.listens_for(orm.Session, "after_rollback")
+def _session_after_rollback(session: orm.Session) -> None:
+    session.info.pop("tasks_queued", None)
@@ -0,0 +1,178 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Immutable manifests of the files in each revision, and diffs between them, to avoid walking revision trees."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import os
+import stat
+import tempfile
+from typing import TYPE_CHECKING, Final
+
+import aiofiles
+import aiofiles.os
+import pydantic
+
+import atr.digests as digests
+import atr.log as log
+import atr.models.manifest as models
+
+if TYPE_CHECKING:
+    import pathlib
+
+_CACHE_SIZE: Final = 256
+_DIFF_SUFFIX: Final = ".diff.json"
+_SUFFIX: Final = ".manifest.json"
+
+# Manifests and diffs are immutable, so they are cached by path and file identity
+_global_cache: collections.OrderedDict[tuple[str, int, int], models.Diff | models.Manifest] = collections.OrderedDict()
+
+
+def build(revision_dir: pathlib.Path, parent: models.Manifest | None = None) -> models.Manifest:
+    """Build the manifest of a revision directory, reusing digests of files hard linked from the parent."""
+    known: dict[tuple[int, int, int], str] = {}
+    if parent is not None:
+        known = {(entry.inode, entry.size, entry.mtime_ns): entry.sha256 for entry in parent.files}
+
+    directories: list[str] = []
+    files: list[models.Entry] = []
+    hashed = 0
+    for root, dirs, names in os.walk(revision_dir):
+        dirs.sort()
+        for name in dirs:
+            directories.append(os.path.relpath(os.path.join(root, name), revision_dir))
+        for name in sorted(names):
+            abs_path = os.path.join(root, name)
+            st = os.stat(abs_path)
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            sha256 = known.get((st.st_ino, st.st_size, st.st_mtime_ns))
+            if sha256 is None:
+                sha256 = digests.compute(abs_path).sha256
+                hashed += 1
+            files.append(
+                models.Entry(
+                    path=os.path.relpath(abs_path, revision_dir),
+                    size=st.st_size,
+                    mode=st.st_mode,
+                    mtime_ns=st.st_mtime_ns,
+                    inode=st.st_ino,
+                    sha256=sha256,
+                )
+            )
+    log.info(f"Built manifest of {len(files)} files for {revision_dir}, hashing {hashed} of them")
+    return models.Manifest(directories=directories, files=files)
+
+
+def diff(parent_number: str | None, parent: models.Manifest | None, child: models.Manifest) -> models.Diff:
+    """Compare the files of a revision to those of its parent, by inode for hard links and by digest otherwise."""
+    if parent is None:
+        return models.Diff(parent=parent_number, added=[entry.path for entry in child.files])
+    parent_entries = {entry.path: entry for entry in parent.files}
+    child_entries = {entry.path: entry for entry in child.files}
+    modified = []
+    for rel_path in sorted(parent_entries.keys() & child_entries.keys()):
+        before = parent_entries[rel_path]
+        after = child_entries[rel_path]
+        if (before.inode != after.inode) and (before.sha256 != after.sha256):
+            modified.append(rel_path)
+    return models.Diff(
+        parent=parent_number,
+        added=sorted(child_entries.keys() - parent_entries.keys()),
+        removed=sorted(parent_entries.keys() - child_entries.keys()),
+        modified=modified,
+    )
+
+
+async def diff_read(revision_dir: pathlib.Path) -> models.Diff | None:
+    """Return the stored diff of a revision directory from its parent, or None if there is none."""
+    return await _cached_read(_sidecar(revision_dir, _DIFF_SUFFIX), models.Diff)
+
+
+async def diff_write(revision_dir: pathlib.Path, revision_diff: models.Diff) -> None:
+    """Store the diff of a revision directory from its parent."""
+    await asyncio.to_thread(_write, _sidecar(revision_dir, _DIFF_SUFFIX), revision_diff.model_dump_json())
+
+
+def path(revision_dir: pathlib.Path) -> pathlib.Path:
+    """Return the path of the manifest of a revision directory, which is stored alongside it."""
+    return _sidecar(revision_dir, _SUFFIX)
+
+
+async def read(revision_dir: pathlib.Path) -> models.Manifest | None:
+    """Return the manifest of a revision directory, or None if it is missing or out of date."""
+    try:
+        root_stat = await aiofiles.os.stat(revision_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if (manifest := await _cached_read(path(revision_dir), models.Manifest)) is None:
+        return None
+    # Revisions are never modified in place, so this only catches manual changes
+    if manifest.root_mtime_ns != root_stat.st_mtime_ns:
+        log.warning(f"Ignoring manifest of {revision_dir} because the directory has been modified")
+        return None
+    return manifest
+
+
+async def write(revision_dir: pathlib.Path, manifest: models.Manifest) -> None:
+    """Write the manifest of a revision directory once the directory is in its final location."""
+    root_stat = await aiofiles.os.stat(revision_dir)
+    manifest = manifest.model_copy(update={"root_mtime_ns": root_stat.st_mtime_ns})
+    await asyncio.to_thread(_write, path(revision_dir), manifest.model_dump_json())
+
+
+async def _cached_read[M: (models.Diff, models.Manifest)](sidecar_path: pathlib.Path, model: type[M]) -> M | None:
+    try:
+        sidecar_stat = await aiofiles.os.stat(sidecar_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    key = (str(sidecar_path), sidecar_stat.st_ino, sidecar_stat.st_mtime_ns)
+    cached = _global_cache.get(key)
+    if isinstance(cached, model):
+        _global_cache.move_to_end(key)
+        return cached
+
+    try:
+        async with aiofiles.open(sidecar_path, "rb") as f:
+            value = model.model_validate_json(await f.read())
+    except (OSError, pydantic.ValidationError) as e:
+        log.warning(f"Ignoring unreadable file {sidecar_path}: {e}")
+        return None
+    _global_cache[key] = value
+    while len(_global_cache) > _CACHE_SIZE:
+        _global_cache.popitem(last=False)
+    return value
+
+
+def _sidecar(revision_dir: pathlib.Path, suffix: str) -> pathlib.Path:
+    return revision_dir.parent / f"{revision_dir.name}{suffix}"
+
+
+def _write(sidecar_path: pathlib.Path, content: str) -> None:
+    # Write to a temporary file and rename, so that readers never see a partial manifest
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=sidecar_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o444)
+        os.rename(tmp_path, sidecar_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
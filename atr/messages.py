@@ -0,0 +1,88 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""A store of mailing list archive messages, which never change once they have been archived."""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from typing import Any, Final
+
+import atr.config as config
+import atr.log as log
+
+_MEMORY_SIZE: Final = 1024
+
+# Recently used messages, keyed by their archive identifier
+_global_memory: collections.OrderedDict[str, dict[str, Any]] = collections.OrderedDict()
+_global_memory_lock: Final = threading.Lock()
+
+
+def load(message_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Return the stored messages with the given archive identifiers, omitting those which are not stored."""
+    found = {}
+    for message_id in message_ids:
+        with _global_memory_lock:
+            if (cached := _global_memory.get(message_id)) is not None:
+                _global_memory.move_to_end(message_id)
+                found[message_id] = cached
+                continue
+        try:
+            message = json.loads(_path(message_id).read_bytes())
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable stored message {message_id}: {e}")
+            continue
+        _memory_add(message_id, message)
+        found[message_id] = message
+    return found
+
+
+def store(message_id: str, message: dict[str, Any]) -> None:
+    """Store an archived message, so that it is never fetched again."""
+    message_path = _path(message_id)
+    message_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file and rename, so that readers never see a partial message
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=message_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(message, f)
+        os.rename(tmp_path, message_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _memory_add(message_id, message)
+
+
+def _memory_add(message_id: str, message: dict[str, Any]) -> None:
+    with _global_memory_lock:
+        _global_memory[message_id] = message
+        while len(_global_memory) > _MEMORY_SIZE:
+            _global_memory.popitem(last=False)
+
+
+def _path(message_id: str) -> pathlib.Path:
+    # Archive identifiers are not guaranteed to be safe file names, so their digests are used instead
+    digest = hashlib.sha256(message_id.encode("utf-8")).hexdigest()
+    return pathlib.Path(config.get().STATE_DIR) / "cache" / "messages" / digest[:2] / f"{digest}.json"
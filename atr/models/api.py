@@ -369,11 +369,92 @@ class ReleaseUploadArgs(schema.Strict):
     content: str = schema.example("This is the content of the file.")
 
 
+class ReleaseUploadChunkResults(schema.Strict):
+    endpoint: Literal["/release/upload/chunk"] = schema.alias("endpoint")
+    upload_id: str = schema.example("0123456789abcdef0123456789abcdef")
+    offset: int = schema.example(1048576)
+
+
+class ReleaseUploadFinishArgs(schema.Strict):
+    sha256: str | None = schema.default_example(
+        None, "0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"
+    )
+
+
+class ReleaseUploadFinishResults(schema.Strict):
+    endpoint: Literal["/release/upload/finish"] = schema.alias("endpoint")
+    revision: sql.Revision
+
+
 class ReleaseUploadResults(schema.Strict):
     endpoint: Literal["/release/upload"] = schema.alias("endpoint")
     revision: sql.Revision
 
 
+class ReleaseUploadSessionCommitArgs(schema.Strict):
+    sha256s: dict[str, str] | None = schema.default_example(
+        None, {"example-0.0.1-bin.tar.gz": "0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"}
+    )
+
+
+class ReleaseUploadSessionCommitResults(schema.Strict):
+    endpoint: Literal["/release/upload/session/commit"] = schema.alias("endpoint")
+    revision: sql.Revision
+
+
+class ReleaseUploadSessionDiscardResults(schema.Strict):
+    endpoint: Literal["/release/upload/session/discard"] = schema.alias("endpoint")
+    discarded: bool = schema.example(True)
+
+
+class ReleaseUploadSessionStartArgs(schema.Strict):
+    project: str = schema.example("example")
+    version: str = schema.example("0.0.1")
+
+
+class ReleaseUploadSessionStartResults(schema.Strict):
+    endpoint: Literal["/release/upload/session/start"] = schema.alias("endpoint")
+    session_id: str = schema.example("0123456789abcdef0123456789abcdef")
+
+
+class ReleaseUploadSessionStatusResults(schema.Strict):
+    endpoint: Literal["/release/upload/session/status"] = schema.alias("endpoint")
+    session_id: str = schema.example("0123456789abcdef0123456789abcdef")
+    offsets: dict[str, int] = schema.example({"example-0.0.1-bin.tar.gz": 1048576})
+
+
+class ReleaseUploadSessionStreamResults(schema.Strict):
+    endpoint: Literal["/release/upload/session/stream"] = schema.alias("endpoint")
+    upload_id: str = schema.example("0123456789abcdef0123456789abcdef")
+    relpath: str = schema.example("example-0.0.1-bin.tar.gz")
+    offset: int = schema.example(1048576)
+
+
+class ReleaseUploadStartArgs(schema.Strict):
+    project: str = schema.example("example")
+    version: str = schema.example("0.0.1")
+    relpath: str = schema.example("example-0.0.1-bin.tar.gz")
+    session: str | None = schema.default_example(None, "0123456789abcdef0123456789abcdef")
+
+
+class ReleaseUploadStartResults(schema.Strict):
+    endpoint: Literal["/release/upload/start"] = schema.alias("endpoint")
+    upload_id: str = schema.example("0123456789abcdef0123456789abcdef")
+    offset: int = schema.example(0)
+
+
+class ReleaseUploadStatusResults(schema.Strict):
+    endpoint: Literal["/release/upload/status"] = schema.alias("endpoint")
+    upload_id: str = schema.example("0123456789abcdef0123456789abcdef")
+    relpath: str = schema.example("example-0.0.1-bin.tar.gz")
+    offset: int = schema.example(1048576)
+
+
+class ReleaseUploadStreamResults(schema.Strict):
+    endpoint: Literal["/release/upload/stream"] = schema.alias("endpoint")
+    revision: sql.Revision
+
+
 @dataclasses.dataclass
 class ReleasesListQuery:
     offset: int = 0
@@ -533,7 +614,17 @@ type Results = Annotated[
     | ReleaseGetResults
     | ReleasePathsResults
     | ReleaseRevisionsResults
+    | ReleaseUploadChunkResults
+    | ReleaseUploadFinishResults
     | ReleaseUploadResults
+    | ReleaseUploadSessionCommitResults
+    | ReleaseUploadSessionDiscardResults
+    | ReleaseUploadSessionStartResults
+    | ReleaseUploadSessionStatusResults
+    | ReleaseUploadSessionStreamResults
+    | ReleaseUploadStartResults
+    | ReleaseUploadStatusResults
+    | ReleaseUploadStreamResults
     | ReleasesListResults
     | SignatureProvenanceResults
     | SshKeyAddResults
@@ -592,6 +683,16 @@ validate_release_get = validator(ReleaseGetResults)
 validate_release_paths = validator(ReleasePathsResults)
 validate_release_revisions = validator(ReleaseRevisionsResults)
 validate_release_upload = validator(ReleaseUploadResults)
+validate_release_upload_chunk = validator(ReleaseUploadChunkResults)
+validate_release_upload_finish = validator(ReleaseUploadFinishResults)
+validate_release_upload_session_commit = validator(ReleaseUploadSessionCommitResults)
+validate_release_upload_session_discard = validator(ReleaseUploadSessionDiscardResults)
+validate_release_upload_session_start = validator(ReleaseUploadSessionStartResults)
+validate_release_upload_session_status = validator(ReleaseUploadSessionStatusResults)
+validate_release_upload_session_stream = validator(ReleaseUploadSessionStreamResults)
+validate_release_upload_start = validator(ReleaseUploadStartResults)
+validate_release_upload_status = validator(ReleaseUploadStatusResults)
+validate_release_upload_stream = validator(ReleaseUploadStreamResults)
 validate_releases_list = validator(ReleasesListResults)
 validate_signature_provenance = validator(SignatureProvenanceResults)
 validate_ssh_key_add = validator(SshKeyAddResults)
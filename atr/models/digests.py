@@ -0,0 +1,36 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from . import schema
+
+
+class Digests(schema.Strict):
+    """The digests of the contents of a file, computed together in a single pass."""
+
+    size: int = schema.description("The size of the file in bytes when it was read")
+    mtime_ns: int = schema.description("The modification time of the file in nanoseconds when it was read")
+    ctime_ns: int = schema.description("The status change time of the file in nanoseconds when it was read")
+    sha256: str = schema.description("The hex SHA-256 digest of the file contents")
+    sha512: str = schema.description("The hex SHA-512 digest of the file contents")
+    sha3_256: str = schema.description("The hex SHA3-256 digest of the file contents")
+
+
+class Stored(schema.Strict):
+    """The digests of a file as stored by its identity, with a path by which to check that it still exists."""
+
+    path: str = schema.description("The absolute path of the file when its digests were stored")
+    digests: Digests = schema.description("The digests of the file")
@@ -0,0 +1,47 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from . import schema
+
+
+class Diff(schema.Strict):
+    """The changes to the files in a revision relative to its parent revision."""
+
+    parent: str | None = schema.description("The number of the parent revision, or None if there is no parent")
+    added: list[str] = schema.default([])
+    removed: list[str] = schema.default([])
+    modified: list[str] = schema.default([])
+
+
+class Entry(schema.Strict):
+    """A file in a revision, as recorded when the revision was created."""
+
+    path: str = schema.description("The path of the file, relative to the revision directory")
+    size: int = schema.description("The size of the file in bytes")
+    mode: int = schema.description("The mode of the file")
+    mtime_ns: int = schema.description("The modification time of the file in nanoseconds")
+    inode: int = schema.description("The inode of the file, which is shared by hard links")
+    sha256: str = schema.description("The hex SHA-256 digest of the file contents")
+
+
+class Manifest(schema.Strict):
+    """The immutable list of directories and files in a revision."""
+
+    version: int = schema.default(1)
+    root_mtime_ns: int = schema.default(0)
+    directories: list[str] = schema.default([])
+    files: list[Entry] = schema.default([])
@@ -0,0 +1,47 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from . import schema
+
+
+class Groups(schema.Strict):
+    """The ASF UIDs in each foundation wide group, and in each committee and project group."""
+
+    members: list[str] = schema.description("The ASF UIDs of the members of the foundation")
+    chairs: list[str] = schema.description("The ASF UIDs of the committee chairs")
+    root: list[str] = schema.description("The ASF UIDs of the infrastructure root group")
+    tooling: list[str] = schema.description("The ASF UIDs of the tooling group")
+    committees: dict[str, list[str]] = schema.description("The ASF UIDs of the owners of each project group")
+    projects: dict[str, list[str]] = schema.description("The ASF UIDs of the members of each project group")
+
+
+class Person(schema.Strict):
+    """The details of an ASF UID in LDAP."""
+
+    fullname: str = schema.default("")
+    emails: list[str] = schema.default([])
+    altemails: list[str] = schema.default([])
+    committer_emails: list[str] = schema.default([])
+    banned: bool = schema.default(False)
+
+
+class Snapshot(schema.Strict):
+    """The people and groups in LDAP, as they were when the snapshot was taken."""
+
+    created: int = schema.description("The time at which the snapshot was taken, in seconds since the epoch")
+    people: dict[str, Person] = schema.description("The details of each lower case ASF UID")
+    groups: Groups | None = schema.default(None)
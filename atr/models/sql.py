@@ -173,6 +173,7 @@ class TaskStatus(str, enum.Enum):
 
 
 class TaskType(str, enum.Enum):
+    ARCHIVE_SCAN = "archive_scan"
     HASHING_CHECK = "hashing_check"
     KEYS_IMPORT_FILE = "keys_import_file"
     LICENSE_FILES = "license_files"
@@ -195,6 +196,16 @@ class TaskType(str, enum.Enum):
     ZIPFORMAT_STRUCTURE = "zipformat_structure"
 
 
+# Tasks with a higher priority are claimed first, and task types not listed here have priority 0
+TASK_TYPE_PRIORITIES: Final[dict[TaskType, int]] = {
+    TaskType.MESSAGE_SEND: 20,
+    TaskType.VOTE_INITIATE: 20,
+    TaskType.KEYS_IMPORT_FILE: 10,
+    TaskType.METADATA_UPDATE: 10,
+    TaskType.SVN_IMPORT_FILES: 10,
+}
+
+
 class UserRole(str, enum.Enum):
     COMMITTEE_MEMBER = "committee_member"
     RELEASE_MANAGER = "release_manager"
@@ -321,6 +332,15 @@ class SSHKey(sqlmodel.SQLModel, table=True):
     asf_uid: str
 
 
+# TaskClaim:
+class TaskClaim(sqlmodel.SQLModel, table=True):
+    """When a task of each project was last claimed, so that workers can take turns between projects."""
+
+    # Tasks without a project, such as message sends, share the empty project name
+    project_name: str = sqlmodel.Field(primary_key=True)
+    claimed: datetime.datetime = sqlmodel.Field(sa_column=sqlalchemy.Column(UTCDateTime, nullable=False))
+
+
 # Task:
 class Task(sqlmodel.SQLModel, table=True):
     """A task in the task queue."""
@@ -352,6 +372,13 @@ class Task(sqlmodel.SQLModel, table=True):
     version_name: str | None = sqlmodel.Field(default=None, index=True)
     revision_number: str | None = sqlmodel.Field(default=None, index=True)
     primary_rel_path: str | None = sqlmodel.Field(default=None, index=True)
+    # Hash of everything that the results of a check task depend on
+    # Used to copy results forward instead of running the same check again
+    inputs_hash: str | None = sqlmodel.Field(default=None, index=True)
+    # Populated from TASK_TYPE_PRIORITIES when the task is inserted
+    priority: int = sqlmodel.Field(default=0)
+    # The task which must complete before this task may be claimed
+    depends_on_id: int | None = sqlmodel.Field(default=None, foreign_key="task.id", index=True)
 
     def model_post_init(self, _context):
         if isinstance(self.task_type, str):
@@ -372,6 +399,8 @@ class Task(sqlmodel.SQLModel, table=True):
     # Create an index on status and added for efficient task claiming
     __table_args__ = (
         sqlalchemy.Index("ix_task_status_added", "status", "added"),
+        # Index for claiming by priority
+        sqlalchemy.Index("ix_task_status_priority_added", "status", "priority", "added"),
         # Ensure valid status transitions:
         # - QUEUED can transition to ACTIVE
         # - ACTIVE can transition to COMPLETED or FAILED
@@ -687,7 +716,7 @@ Thanks,
         return policy.preserve_download_files
 
 
-# Release: Project ReleasePolicy Revision CheckResult
+# Release: Project ReleasePolicy Revision CheckResult ReleaseFile
 class Release(sqlmodel.SQLModel, table=True):
     # model_config = compat.SQLModelConfig(extra="forbid", from_attributes=True)
 
@@ -765,6 +794,12 @@ class Release(sqlmodel.SQLModel, table=True):
         back_populates="release", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
     )
 
+    # 1-M: Release -C-> [ReleaseFile]
+    # M-1: ReleaseFile -> Release
+    release_files: list["ReleaseFile"] = sqlmodel.Relationship(
+        back_populates="release", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
+
     # The combination of project_name and version must be unique
     __table_args__ = (sqlmodel.UniqueConstraint("project_name", "version", name="unique_project_version"),)
 
@@ -851,6 +886,7 @@ class CheckResult(sqlmodel.SQLModel, table=True):
     data: Any = sqlmodel.Field(
         sa_column=sqlalchemy.Column(sqlalchemy.JSON), **example({"expected": "...", "found": "..."})
     )
+    inputs_hash: str | None = sqlmodel.Field(default=None, index=True, **example("0123456789abcdef"))
 
 
 class CheckResultIgnore(sqlmodel.SQLModel, table=True):
@@ -973,6 +1009,27 @@ class PublicSigningKey(sqlmodel.SQLModel, table=True):
             self.expires = datetime.datetime.fromisoformat(self.expires.rstrip("Z"))
 
 
+# ReleaseFile: Release
+class ReleaseFile(sqlmodel.SQLModel, table=True):
+    # The current files of each release, by name and digest, to find the provenance of signatures
+    id: int = sqlmodel.Field(default=None, primary_key=True, **example(123))
+
+    # M-1: ReleaseFile -> Release
+    # 1-M: Release -C-> [ReleaseFile]
+    release_name: str = sqlmodel.Field(foreign_key="release.name", ondelete="CASCADE", **example("example-0.0.1"))
+    release: Release = sqlmodel.Relationship(back_populates="release_files")
+
+    rel_path: str = sqlmodel.Field(**example("apache-example-0.0.1-source.tar.gz.asc"))
+    name: str = sqlmodel.Field(**example("apache-example-0.0.1-source.tar.gz.asc"))
+    sha3_256: str = sqlmodel.Field(**example("0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef"))
+
+    # The unique constraint also indexes the files of each release
+    __table_args__ = (
+        sqlalchemy.Index("ix_releasefile_name_sha3_256", "name", "sha3_256"),
+        sqlmodel.UniqueConstraint("release_name", "rel_path", name="unique_release_file_rel_path"),
+    )
+
+
 # ReleasePolicy: Project
 class ReleasePolicy(sqlmodel.SQLModel, table=True):
     id: int = sqlmodel.Field(default=None, primary_key=True)
@@ -1124,6 +1181,11 @@ def check_release_name(_mapper: orm.Mapper, _connection: sqlalchemy.Connection,
         release.name = release_name(project_name, version)
 
 
+@event.listens_for(Task, "before_insert")
+def populate_task_priority(_mapper: orm.Mapper, _connection: sqlalchemy.Connection, task: Task) -> None:
+    task.priority = TASK_TYPE_PRIORITIES.get(task.task_type, 0)
+
+
 def latest_revision_number_query(release_name: str | None = None) -> expression.ScalarSelect[str]:
     if release_name is None:
         query_release_name = Release.name
@@ -0,0 +1,40 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from . import schema
+
+
+class Upload(schema.Strict):
+    """A resumable upload of a release file, which is staged on disk until it is added to a revision."""
+
+    upload_id: str = schema.description("The random identifier of the upload")
+    asf_uid: str = schema.description("The ASF UID of the user who started the upload")
+    project_name: str = schema.description("The name of the project of the release")
+    version_name: str = schema.description("The version of the release")
+    rel_path: str = schema.description("The path of the file, relative to the revision directory")
+    created: int = schema.description("The time at which the upload was started, in seconds since the epoch")
+    session_id: str | None = schema.default(None)
+
+
+class Session(schema.Strict):
+    """A group of uploads to a release, which are all added to a single revision when the session is committed."""
+
+    session_id: str = schema.description("The random identifier of the session")
+    asf_uid: str = schema.description("The ASF UID of the user who started the session")
+    project_name: str = schema.description("The name of the project of the release")
+    version_name: str = schema.description("The version of the release")
+    created: int = schema.description("The time at which the session was started, in seconds since the epoch")
@@ -0,0 +1,275 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""A snapshot of the people and groups in LDAP, shared on disk by all processes."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import fcntl
+import os
+import pathlib
+import tempfile
+import time
+from typing import Any, Final
+
+import pydantic
+
+import atr.config as config
+import atr.ldap as ldap
+import atr.log as log
+import atr.models.people as models
+
+# Snapshots older than this are refreshed in the background, while still being used
+REFRESH_SECONDS: Final = 60 * 60
+# The groups whose DNs or UIDs are listed in a single attribute, with the minimum plausible number of entries
+_GROUPS: Final = {
+    "members": (ldap.LDAP_MEMBER_BASE, "memberUid", 100),
+    "chairs": (ldap.LDAP_CHAIRS_BASE, "member", 100),
+    "root": (ldap.LDAP_ROOT_BASE, "member", 3),
+    "tooling": (ldap.LDAP_TOOLING_BASE, "member", 1),
+}
+_PERSON_ATTRIBUTES: Final = ["uid", "cn", "mail", "asf-altEmail", "asf-committer-email", "asf-banned"]
+# A failed refresh is not retried in the background until this much later
+_RETRY_SECONDS: Final = 5 * 60
+
+_global_loaded: tuple[tuple[int, int], Index] | None = None
+_global_refresh: asyncio.Task[bool] | None = None
+_global_refresh_started: float | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Memberships:
+    """The groups of an ASF UID, in the form returned by an LDAP verification of a committer."""
+
+    is_member: bool
+    is_chair: bool
+    is_root: bool
+    is_tooling: bool
+    committees: list[str]
+    projects: list[str]
+
+
+class Index:
+    """A loaded snapshot, indexed for lookups by email address and by ASF UID."""
+
+    def __init__(self, snapshot: models.Snapshot) -> None:
+        self.created = snapshot.created
+        self.people = snapshot.people
+        self.email_to_uid: dict[str, str] = {}
+        for uid, person in snapshot.people.items():
+            for email in [*person.emails, *person.altemails, *person.committer_emails]:
+                self.email_to_uid[email.lower()] = uid
+        self.has_groups = snapshot.groups is not None
+        self.__sets: dict[str, frozenset[str]] = {}
+        self.__committees: dict[str, list[str]] = {}
+        self.__projects: dict[str, list[str]] = {}
+        if snapshot.groups is not None:
+            self.__sets = {name: frozenset(getattr(snapshot.groups, name)) for name in _GROUPS}
+            self.__committees = _invert(snapshot.groups.committees)
+            self.__projects = _invert(snapshot.groups.projects)
+
+    def memberships(self, uid: str) -> Memberships | None:
+        """Return the groups of an ASF UID, or None if the snapshot has no groups."""
+        if not self.has_groups:
+            return None
+        return Memberships(
+            is_member=uid in self.__sets["members"],
+            is_chair=uid in self.__sets["chairs"],
+            is_root=uid in self.__sets["root"],
+            is_tooling=uid in self.__sets["tooling"],
+            committees=list(self.__committees.get(uid, [])),
+            projects=list(self.__projects.get(uid, [])),
+        )
+
+
+async def email_to_uid_map() -> dict[str, str]:
+    """Return a map of lower case email addresses to lower case ASF UIDs, from the latest snapshot."""
+    index = await asyncio.to_thread(load)
+    if index is None:
+        # There is no snapshot to serve until the first one has been taken
+        await asyncio.to_thread(_refresh, True)
+        index = await asyncio.to_thread(load)
+        if index is None:
+            return {}
+    if (time.time() - index.created) > REFRESH_SECONDS:
+        _refresh_background()
+    return index.email_to_uid
+
+
+def load() -> Index | None:
+    """Return the latest snapshot, which is only read from disk again when it has been replaced."""
+    global _global_loaded
+    snapshot_path = _path()
+    try:
+        st = snapshot_path.stat()
+    except FileNotFoundError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns)
+    if (_global_loaded is not None) and (_global_loaded[0] == key):
+        return _global_loaded[1]
+    try:
+        snapshot = models.Snapshot.model_validate_json(snapshot_path.read_bytes())
+    except (OSError, pydantic.ValidationError) as e:
+        log.warning(f"Ignoring unreadable LDAP snapshot {snapshot_path}: {e}")
+        return None
+    index = Index(snapshot)
+    _global_loaded = (key, index)
+    return index
+
+
+async def refresh() -> bool:
+    """Take a new snapshot, keeping the previous snapshot if LDAP can not be searched."""
+    return await asyncio.to_thread(_refresh, False)
+
+
+def _dn_uids(values: list[str]) -> list[str]:
+    # Group members are people, whose DNs are all of the form uid=...,ou=people,dc=apache,dc=org
+    suffix = f",{ldap.LDAP_SEARCH_BASE}"
+    uids = []
+    for value in values:
+        value = value.lower()
+        if value.startswith("uid=") and value.endswith(suffix):
+            uids.append(value.removeprefix("uid=").removesuffix(suffix))
+    return uids
+
+
+def _group_search(ldap_search: ldap.Search, ldap_base: str, attribute: str, min_members: int) -> list[str]:
+    result = ldap_search.search(ldap_base=ldap_base, ldap_scope="BASE")
+    members = result[0].get(attribute) if (len(result) == 1) else None
+    if (not isinstance(members, list)) or (len(members) < min_members):
+        raise ValueError(f"Implausible members of {ldap_base}")
+    return members
+
+
+def _groups() -> models.Groups | None:
+    conf = config.get()
+    if (not conf.LDAP_BIND_DN) or (not conf.LDAP_BIND_PASSWORD):
+        return None
+    try:
+        with ldap.Search(conf.LDAP_BIND_DN, conf.LDAP_BIND_PASSWORD) as ldap_search:
+            lists = {}
+            for name, (ldap_base, attribute, min_members) in _GROUPS.items():
+                members = _group_search(ldap_search, ldap_base, attribute, min_members)
+                lists[name] = [m.lower() for m in members] if (attribute == "memberUid") else _dn_uids(members)
+            committees: dict[str, list[str]] = {}
+            projects: dict[str, list[str]] = {}
+            for hit in ldap_search.search(
+                ldap_base=ldap.LDAP_PMCS_BASE,
+                ldap_scope="SUBTREE",
+                ldap_query="(cn=*)",
+                ldap_attrs=["cn", "owner", "member"],
+            ):
+                if (cn := _values(hit, "cn")) and (len(cn) == 1):
+                    committees[cn[0]] = _dn_uids(_values(hit, "owner"))
+                    projects[cn[0]] = _dn_uids(_values(hit, "member"))
+    except Exception as e:
+        # The people are still useful, and committers are verified directly against LDAP instead
+        log.warning(f"Taking an LDAP snapshot without groups because the group search failed: {e}")
+        return None
+    return models.Groups(committees=committees, projects=projects, **lists)
+
+
+def _invert(groups: dict[str, list[str]]) -> dict[str, list[str]]:
+    inverted: dict[str, list[str]] = {}
+    for name, uids in sorted(groups.items()):
+        for uid in uids:
+            inverted.setdefault(uid, []).append(name)
+    return inverted
+
+
+def _path() -> pathlib.Path:
+    return pathlib.Path(config.get().STATE_DIR) / "cache" / "ldap" / "people.json"
+
+
+def _people() -> dict[str, models.Person] | None:
+    conf = config.get()
+    ldap_params = ldap.SearchParameters(
+        uid_query="*",
+        bind_dn_from_config=conf.LDAP_BIND_DN,
+        bind_password_from_config=conf.LDAP_BIND_PASSWORD,
+        attributes=_PERSON_ATTRIBUTES,
+    )
+    ldap.search(ldap_params)
+    # An empty result would replace a good snapshot with one which matches nobody
+    if ldap_params.err_msg or (not ldap_params.results_list):
+        log.warning(f"Keeping the previous LDAP snapshot because the search failed: {ldap_params.err_msg}")
+        return None
+
+    people: dict[str, models.Person] = {}
+    for entry in ldap_params.results_list:
+        uid = entry.get("uid", [""])[0].lower()
+        fullname = _values(entry, "cn")
+        people[uid] = models.Person(
+            fullname=fullname[0] if (len(fullname) == 1) else "",
+            emails=_values(entry, "mail"),
+            altemails=_values(entry, "asf-altEmail"),
+            committer_emails=_values(entry, "asf-committer-email"),
+            banned=bool(entry.get("asf-banned")),
+        )
+    return people
+
+
+def _refresh(initial: bool) -> bool:
+    snapshot_path = _path()
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(snapshot_path.with_suffix(".lock"), "wb") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if initial else (fcntl.LOCK_EX | fcntl.LOCK_NB))
+        except BlockingIOError:
+            # Another process is already taking a snapshot
+            return False
+        if initial and (load() is not None):
+            # Another process took the first snapshot while this one waited
+            return True
+        started = time.monotonic()
+        if (people := _people()) is None:
+            return False
+        snapshot = models.Snapshot(created=int(time.time()), people=people, groups=_groups())
+        _write(snapshot_path, snapshot)
+    log.info(f"Took LDAP snapshot of {len(people)} UIDs in {time.monotonic() - started:.1f}s")
+    return True
+
+
+def _refresh_background() -> None:
+    global _global_refresh, _global_refresh_started
+    if (_global_refresh_started is not None) and ((time.monotonic() - _global_refresh_started) < _RETRY_SECONDS):
+        return
+    _global_refresh_started = time.monotonic()
+    _global_refresh = asyncio.create_task(refresh())
+
+
+def _values(entry: dict[str, Any], prop: str) -> list[str]:
+    raw_values = entry.get(prop, [])
+    if isinstance(raw_values, list):
+        return [v for v in raw_values if v]
+    if raw_values:
+        return [raw_values]
+    return []
+
+
+def _write(snapshot_path: pathlib.Path, snapshot: models.Snapshot) -> None:
+    # Write to a temporary file and rename, so that other processes never load a partial snapshot
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=snapshot_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(snapshot.model_dump_json())
+        os.rename(tmp_path, snapshot_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -24,6 +24,7 @@ import quart
 
 import atr.blueprints.post as post
 import atr.db as db
+import atr.fetch as fetch
 import atr.get as get
 import atr.htm as htm
 import atr.log as log
@@ -269,11 +270,10 @@ async def _update_committee_keys(
 async def _fetch_keys_from_url(keys_url: str) -> str:
     """Fetch KEYS file content from a URL."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(keys_url, allow_redirects=True) as response:
-                response.raise_for_status()
-                return await response.text()
-    except aiohttp.ClientResponseError as e:
+        response = await fetch.get(keys_url, allow_redirects=True)
+        response.raise_for_status()
+        return response.text()
+    except fetch.StatusError as e:
         raise base.ASFQuartException(f"Unable to fetch keys from remote server: {e.status} {e.message}", errorcode=502)
     except aiohttp.ClientError as e:
         raise base.ASFQuartException(f"Network error while fetching keys: {e}", errorcode=503)
@@ -19,8 +19,10 @@ import aioshutil
 import asfquart.base as base
 
 import atr.blueprints.post as post
+import atr.clone as clone
 import atr.db as db
 import atr.get as get
+import atr.manifest as manifest
 import atr.models.sql as sql
 import atr.shared as shared
 import atr.storage as storage
@@ -72,7 +74,8 @@ async def _set_revision(
         ) as creating:
             # TODO: Stop create_and_manage from hard linking the parent first
             await aioshutil.rmtree(creating.interim_path)
-            await util.create_hard_link_clone(selected_revision_dir, creating.interim_path)
+            selected_manifest = await manifest.read(selected_revision_dir)
+            await clone.tree(selected_revision_dir, creating.interim_path, source_manifest=selected_manifest)
 
         if creating.new is None:
             raise base.ASFQuartException("Internal error: New revision not found", errorcode=500)
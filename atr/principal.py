@@ -18,6 +18,7 @@
 # Derived from apache/infrastructure-oauth/app/lib/ldap.py
 
 import asyncio
+import collections
 import re
 import time
 from typing import Any, Final
@@ -28,18 +29,22 @@ import asfquart.session
 import atr.config as config
 import atr.ldap as ldap
 import atr.log as log
+import atr.people as people
 import atr.util as util
 import atr.web as web
 
-LDAP_CHAIRS_BASE = "cn=pmc-chairs,ou=groups,ou=services,dc=apache,dc=org"
 LDAP_DN = "uid=%s,ou=people,dc=apache,dc=org"
-LDAP_MEMBER_BASE = "cn=member,ou=groups,dc=apache,dc=org"
 LDAP_MEMBER_FILTER = "(member=uid=%s,ou=people,dc=apache,dc=org)"
 LDAP_OWNER_FILTER = "(owner=uid=%s,ou=people,dc=apache,dc=org)"
 LDAP_PEOPLE_BASE = "ou=people,dc=apache,dc=org"
-LDAP_PMCS_BASE = "ou=project,ou=groups,dc=apache,dc=org"
-LDAP_ROOT_BASE = "cn=infrastructure-root,ou=groups,ou=services,dc=apache,dc=org"
-LDAP_TOOLING_BASE = "cn=tooling,ou=groups,ou=services,dc=apache,dc=org"
+
+_BANNED_MESSAGE: Final = (
+    "This account has been administratively locked. Please contact root@apache.org for further details."
+)
+# LDAP snapshots older than this are not used to verify committers, which are then looked up directly
+# With the cache, a locked account or a removed membership therefore applies within 2 hours 10 minutes
+# Normally the snapshot is refreshed hourly, so it applies within 1 hour 10 minutes
+_SNAPSHOT_MAX_AGE_SECONDS: Final = 2 * people.REFRESH_SECONDS
 
 
 class AuthenticationError(Exception):
@@ -99,6 +104,11 @@ class Committer:
         self.__bind_dn, self.__bind_password = get_ldap_bind_dn_and_password()
 
     def verify(self) -> dict[str, Any]:
+        if self._verify_from_snapshot():
+            cache.statistics["verified from snapshot"] += 1
+            return self.__dict__
+        cache.statistics["verified from LDAP"] += 1
+
         with ldap.Search(self.__bind_dn, self.__bind_password) as ldap_search:
             start = time.perf_counter_ns()
             self._get_committer_details(ldap_search)
@@ -106,25 +116,25 @@ class Committer:
             log.info(f"Took {finish - start:,} ns to get committer details")
 
             start = time.perf_counter_ns()
-            member_list = self._get_group_membership(ldap_search, LDAP_MEMBER_BASE, "memberUid", 100)
+            member_list = self._get_group_membership(ldap_search, ldap.LDAP_MEMBER_BASE, "memberUid", 100)
             self.isMember = self.user in member_list
             finish = time.perf_counter_ns()
             log.info(f"Took {finish - start:,} ns to get member list")
 
             start = time.perf_counter_ns()
-            chair_list = self._get_group_membership(ldap_search, LDAP_CHAIRS_BASE, "member", 100)
+            chair_list = self._get_group_membership(ldap_search, ldap.LDAP_CHAIRS_BASE, "member", 100)
             self.isChair = self.dn in chair_list
             finish = time.perf_counter_ns()
             log.info(f"Took {finish - start:,} ns to get chair list")
 
             start = time.perf_counter_ns()
-            root_list = self._get_group_membership(ldap_search, LDAP_ROOT_BASE, "member", 3)
+            root_list = self._get_group_membership(ldap_search, ldap.LDAP_ROOT_BASE, "member", 3)
             self.isRoot = self.dn in root_list
             finish = time.perf_counter_ns()
             log.info(f"Took {finish - start:,} ns to get root list")
 
             start = time.perf_counter_ns()
-            tooling_list = self._get_group_membership(ldap_search, LDAP_TOOLING_BASE, "member", 1)
+            tooling_list = self._get_group_membership(ldap_search, ldap.LDAP_TOOLING_BASE, "member", 1)
             is_tooling = self.dn in tooling_list
             finish = time.perf_counter_ns()
             log.info(f"Took {finish - start:,} ns to get tooling list")
@@ -157,9 +167,7 @@ class Committer:
 
         data = result[0]
         if data.get("asf-banned"):
-            raise CommitterError(
-                "This account has been administratively locked. Please contact root@apache.org for further details."
-            )
+            raise CommitterError(_BANNED_MESSAGE)
 
         fn = data.get("cn")
         if not (isinstance(fn, list) and (len(fn) == 1)):
@@ -196,7 +204,7 @@ class Committer:
     def _get_project_memberships(self, ldap_search: ldap.Search, ldap_filter: str) -> list[str]:
         try:
             result = ldap_search.search(
-                ldap_base=LDAP_PMCS_BASE,
+                ldap_base=ldap.LDAP_PMCS_BASE,
                 ldap_scope="SUBTREE",
                 ldap_query=ldap_filter % (self.user,),
                 ldap_attrs=["cn"],
@@ -218,6 +226,33 @@ class Committer:
             committees_or_projects.append(committee_or_project_name)
         return committees_or_projects
 
+    def _verify_from_snapshot(self) -> bool:
+        index = people.load()
+        if (index is None) or ((time.time() - index.created) > _SNAPSHOT_MAX_AGE_SECONDS):
+            return False
+        person = index.people.get(self.user)
+        memberships = index.memberships(self.user)
+        if (person is None) or (memberships is None):
+            # Accounts created since the snapshot was taken are only in LDAP
+            return False
+        if person.banned:
+            raise CommitterError(_BANNED_MESSAGE)
+        if not person.fullname:
+            raise CommitterError("Common backend assertions failed, LDAP corruption?")
+
+        self.fullname = person.fullname
+        self.emails = attr_to_list(person.emails)
+        self.altemails = attr_to_list(person.altemails)
+        self.isMember = memberships.is_member
+        self.isChair = memberships.is_chair
+        self.isRoot = memberships.is_root
+        self.pmcs = memberships.committees
+        self.projects = memberships.projects
+        if memberships.is_tooling:
+            self.pmcs.append("tooling")
+            self.projects.append("tooling")
+        return True
+
 
 class Cache:
     def __init__(self, cache_for_at_most_seconds: int = 600):
@@ -225,14 +260,19 @@ class Cache:
         self.last_refreshed: dict[str, int | None] = {}
         self.member_of: dict[str, frozenset[str]] = {}
         self.participant_of: dict[str, frozenset[str]] = {}
+        # Hits, misses, and verifications in this process, for monitoring
+        self.statistics: collections.Counter[str] = collections.Counter()
 
     def outdated(self, asf_uid: str) -> bool:
         last_refreshed = self.last_refreshed.get(asf_uid)
         if last_refreshed is None:
+            self.statistics["misses"] += 1
             return True
         now = int(time.time())
         since_last_refresh = now - last_refreshed
-        return since_last_refresh > self.cache_for_at_most_seconds
+        outdated = since_last_refresh > self.cache_for_at_most_seconds
+        self.statistics["misses" if outdated else "hits"] += 1
+        return outdated
 
 
 cache = Cache()
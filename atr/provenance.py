@@ -0,0 +1,108 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""An index of the current files of each release by name and SHA3-256 digest, to find the provenance of signatures."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+from typing import TYPE_CHECKING, Final
+
+import sqlalchemy
+import sqlmodel
+
+import atr.digests as digests
+import atr.models.sql as sql
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Iterable
+
+    import atr.db as db
+
+# SQLite limits the number of parameters in a statement
+_CHUNK_SIZE: Final = 500
+
+
+@dataclasses.dataclass
+class Update:
+    """Changes to the index of the files of a release, prepared before the caller acquires a write lock."""
+
+    files: dict[str, str]
+    removed: list[str]
+    replace: bool
+
+
+async def apply(data: db.Session, release_name: str, update: Update) -> None:
+    """Apply changes to the index of the files of a release, within the transaction of the caller."""
+    via = sql.validate_instrumented_attribute
+    if update.replace:
+        await data.execute(sqlmodel.delete(sql.ReleaseFile).where(via(sql.ReleaseFile.release_name) == release_name))
+    else:
+        stale = [*update.removed, *update.files.keys()]
+        for i in range(0, len(stale), _CHUNK_SIZE):
+            await data.execute(
+                sqlmodel.delete(sql.ReleaseFile).where(
+                    via(sql.ReleaseFile.release_name) == release_name,
+                    via(sql.ReleaseFile.rel_path).in_(stale[i : i + _CHUNK_SIZE]),
+                )
+            )
+    rows = [
+        {"release_name": release_name, "rel_path": rel_path, "name": os.path.basename(rel_path), "sha3_256": sha3_256}
+        for rel_path, sha3_256 in update.files.items()
+    ]
+    for i in range(0, len(rows), _CHUNK_SIZE):
+        await data.execute(sqlalchemy.insert(sql.ReleaseFile), rows[i : i + _CHUNK_SIZE])
+
+
+async def committees(data: db.Session, name: str, sha3_256: str, committee_names: Iterable[str]) -> set[str]:
+    """Return those of the given committees with a release which contains a file with this name and digest."""
+    via = sql.validate_instrumented_attribute
+    statement = (
+        sqlmodel.select(via(sql.Project.committee_name))
+        .distinct()
+        .join(sql.Release, via(sql.Release.project_name) == via(sql.Project.name))
+        .join(sql.ReleaseFile, via(sql.ReleaseFile.release_name) == via(sql.Release.name))
+        .where(
+            via(sql.ReleaseFile.name) == name,
+            via(sql.ReleaseFile.sha3_256) == sha3_256,
+            via(sql.Project.committee_name).in_(list(committee_names)),
+        )
+    )
+    result = await data.execute(statement)
+    return {committee_name for (committee_name,) in result.all() if committee_name is not None}
+
+
+async def indexed(data: db.Session, release_name: str) -> bool:
+    """Return whether any files of a release are in the index."""
+    via = sql.validate_instrumented_attribute
+    statement = sqlmodel.select(via(sql.ReleaseFile.id)).where(via(sql.ReleaseFile.release_name) == release_name)
+    result = await data.execute(statement.limit(1))
+    return result.first() is not None
+
+
+async def prepare(release_dir: pathlib.Path, rel_paths: Iterable[str], removed: list[str] | None = None) -> Update:
+    """Prepare to index the given files of a release, replacing all of its files if removed is None."""
+    files = await asyncio.to_thread(_sha3_256s, release_dir, list(rel_paths))
+    return Update(files=files, removed=removed or [], replace=removed is None)
+
+
+def _sha3_256s(release_dir: pathlib.Path, rel_paths: list[str]) -> dict[str, str]:
+    # The digests of new files are usually stored when the manifest of their revision is built
+    return {rel_path: digests.compute(release_dir / rel_path).sha3_256 for rel_path in rel_paths}
@@ -28,18 +28,20 @@ _DEBUG: bool = os.environ.get("DEBUG_SBOM_TOOL") == "1"
 _OSV_API_BASE: str = "https://api.osv.dev/v1"
 
 
-async def scan_bundle(bundle: models.bundle.Bundle) -> tuple[list[models.osv.ComponentVulnerabilities], int]:
+async def scan_bundle(
+    bundle: models.bundle.Bundle, session: aiohttp.ClientSession | None = None
+) -> tuple[list[models.osv.ComponentVulnerabilities], int]:
     components = bundle.bom.components or []
     queries, ignored_count = _scan_bundle_build_queries(components)
     if _DEBUG:
         print(f"[DEBUG] Scanning {len(queries)} components for vulnerabilities")
         if ignored_count > 0:
             print(f"[DEBUG] {ignored_count} components ignored (missing purl or version)")
-    async with aiohttp.ClientSession() as session:
-        component_vulns_map = await _scan_bundle_fetch_vulnerabilities(session, queries, 1000)
-        if _DEBUG:
-            print(f"[DEBUG] Total components with vulnerabilities: {len(component_vulns_map)}")
-        await _scan_bundle_populate_vulnerabilities(session, component_vulns_map)
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            component_vulns_map = await _scan_bundle_vulnerabilities(own_session, queries)
+    else:
+        component_vulns_map = await _scan_bundle_vulnerabilities(session, queries)
     result: list[models.osv.ComponentVulnerabilities] = []
     for purl, vulns in component_vulns_map.items():
         result.append(models.osv.ComponentVulnerabilities(purl=purl, vulnerabilities=vulns))
@@ -190,3 +192,13 @@ async def _scan_bundle_populate_vulnerabilities(
             vuln.update(details)
     if _DEBUG:
         print(f"[DEBUG] Fetched details for {len(details_cache)} unique vulnerabilities")
+
+
+async def _scan_bundle_vulnerabilities(
+    session: aiohttp.ClientSession, queries: list[tuple[str, dict[str, Any]]]
+) -> dict[str, list[dict[str, Any]]]:
+    component_vulns_map = await _scan_bundle_fetch_vulnerabilities(session, queries, 1000)
+    if _DEBUG:
+        print(f"[DEBUG] Total components with vulnerabilities: {len(component_vulns_map)}")
+    await _scan_bundle_populate_vulnerabilities(session, component_vulns_map)
+    return component_vulns_map
@@ -28,13 +28,16 @@ import yyjson
 from . import models
 
 
-async def bundle_to_patch(bundle_value: models.bundle.Bundle) -> models.patch.Patch:
+async def bundle_to_patch(
+    bundle_value: models.bundle.Bundle, session: aiohttp.ClientSession | None = None
+) -> models.patch.Patch:
     from .conformance import ntia_2021_issues, ntia_2021_patch
 
     _warnings, errors = ntia_2021_issues(bundle_value.bom)
-    async with aiohttp.ClientSession() as session:
-        patch_ops = await ntia_2021_patch(session, bundle_value.doc, errors)
-    return patch_ops
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            return await ntia_2021_patch(own_session, bundle_value.doc, errors)
+    return await ntia_2021_patch(session, bundle_value.doc, errors)
 
 
 def get_pointer(doc: yyjson.Document, path: str) -> Any | None:
@@ -42,10 +42,12 @@ import atr.blueprints as blueprints
 import atr.config as config
 import atr.db as db
 import atr.db.interaction as interaction
+import atr.fetch as fetch
 import atr.filters as filters
 import atr.log as log
 import atr.manager as manager
 import atr.models.sql as sql
+import atr.people as people
 import atr.preload as preload
 import atr.ssh as ssh
 import atr.svn.pubsub as pubsub
@@ -87,6 +89,7 @@ def app_dirs_setup(app_config: type[config.AppConfig]) -> None:
     print(f"Working directory changed to: {os.getcwd()}")
 
     directories_to_ensure = [
+        util.get_cache_dir(),
         util.get_downloads_dir(),
         util.get_finished_dir(),
         util.get_tmp_dir(),
@@ -168,6 +171,10 @@ def app_setup_lifecycle(app: base.QuartApp) -> None:
         metadata_scheduler_task = asyncio.create_task(_metadata_update_scheduler())
         app.extensions["metadata_scheduler"] = metadata_scheduler_task
 
+        # Start the LDAP snapshot refresh scheduler
+        people_scheduler_task = asyncio.create_task(_people_refresh_scheduler())
+        app.extensions["people_scheduler"] = people_scheduler_task
+
         await initialise_test_environment()
 
         conf = config.get()
@@ -207,14 +214,12 @@ def app_setup_lifecycle(app: base.QuartApp) -> None:
         worker_manager = manager.get_worker_manager()
         await worker_manager.stop()
 
-        # Stop the metadata scheduler
-        metadata_scheduler = app.extensions.get("metadata_scheduler")
-        if metadata_scheduler:
-            metadata_scheduler.cancel()
-            try:
-                await metadata_scheduler
-            except asyncio.CancelledError:
-                ...
+        # Stop the metadata and LDAP snapshot schedulers
+        for scheduler_name in ("metadata_scheduler", "people_scheduler"):
+            if scheduler := app.extensions.get(scheduler_name):
+                scheduler.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await scheduler
 
         ssh_server = app.extensions.get("ssh_server")
         if ssh_server:
@@ -229,6 +234,7 @@ def app_setup_lifecycle(app: base.QuartApp) -> None:
             listener.stop()
 
         await db.shutdown_database()
+        await fetch.close()
 
         app.background_tasks.clear()
 
@@ -330,6 +336,17 @@ def create_app(app_config: type[config.AppConfig]) -> base.QuartApp:
     return app
 
 
+async def _people_refresh_scheduler() -> None:
+    """Periodically refresh the LDAP snapshot used to map email addresses to ASF UIDs."""
+    while True:
+        try:
+            await people.refresh()
+        except Exception as e:
+            log.exception(f"Failed to refresh LDAP snapshot: {e!s}")
+
+        await asyncio.sleep(people.REFRESH_SECONDS)
+
+
 async def _metadata_update_scheduler() -> None:
     """Periodically schedule remote metadata updates."""
     # Wait one minute to allow the server to start
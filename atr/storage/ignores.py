@@ -0,0 +1,229 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Compiled matching of check results against the ignores of a committee."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, Final
+
+import sqlalchemy
+
+import atr.models.sql as sql
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# The CheckResult fields which ignores match using patterns, and the CheckResultIgnore fields which hold them
+_PATTERN_FIELDS: Final = (
+    ("release_name", "release_glob"),
+    ("checker", "checker_glob"),
+    ("primary_rel_path", "primary_rel_path_glob"),
+    ("member_rel_path", "member_rel_path_glob"),
+    ("message", "message_glob"),
+)
+# Bound the memory used to remember the results of patterns for each value
+_MEMO_SIZE: Final = 65536
+# Numbered or named backreferences, and conditionals, which depend on the numbering of groups
+_GROUP_REFERENCE: Final = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# Matchers are cached for each committee until its ignores change
+_global_matchers: dict[str, tuple[tuple[Any, ...], Matcher]] = {}
+
+
+class Matcher:
+    """Match check results against a set of ignores, compiling each pattern only once."""
+
+    def __init__(self, ignores: Sequence[sql.CheckResultIgnore]) -> None:
+        self.__all = (1 << len(ignores)) - 1
+        self.__fields = [
+            _Field("revision_number", [_Exact(cri.revision_number) for cri in ignores]),
+            _Field("status", [_Exact(cri.status) for cri in ignores]),
+        ]
+        for field, attr in _PATTERN_FIELDS:
+            patterns = [getattr(cri, attr) for cri in ignores]
+            self.__fields.append(_Field(field, [_Pattern(p) if (p is not None) else None for p in patterns]))
+        self.sql_clause = _sql_clause(ignores)
+
+    def __call__(self, cr: sql.CheckResult) -> bool:
+        if cr.status == sql.CheckResultStatus.SUCCESS:
+            # Successes are never ignored
+            return False
+        mask = self.__all
+        for field in self.__fields:
+            if not mask:
+                return False
+            mask &= field.mask(getattr(cr, field.name))
+        return mask != 0
+
+
+class _Exact:
+    """A value which must be equal to that of the check result."""
+
+    positive: Final = False
+
+    def __init__(self, expected: Any) -> None:
+        self.expected = expected
+
+    def match(self, value: Any) -> bool:
+        return value == self.expected
+
+
+class _Field:
+    """The conditions of all ignores on a single field, where bit i of a mask is the result for ignore i."""
+
+    def __init__(self, name: str, conditions: Sequence[_Exact | _Pattern | None]) -> None:
+        self.name = name
+        self.__memo: dict[Any, int] = {}
+        self.__unconstrained = 0
+        self.__conditions: list[tuple[int, _Exact | _Pattern]] = []
+        for bit, condition in enumerate(conditions):
+            if (condition is None) or (isinstance(condition, _Exact) and (condition.expected is None)):
+                self.__unconstrained |= 1 << bit
+            else:
+                self.__conditions.append((1 << bit, condition))
+        # A single alternation can rule out all of the positive patterns at once
+        self.__any_positive = _alternation([c for _, c in self.__conditions if isinstance(c, _Pattern) and c.positive])
+
+    def mask(self, value: Any) -> int:
+        if not self.__conditions:
+            return self.__unconstrained
+        mask = self.__memo.get(value)
+        if mask is not None:
+            return mask
+        maybe_positive = (value is not None) and (
+            (self.__any_positive is None) or (self.__any_positive.search(value) is not None)
+        )
+        mask = self.__unconstrained
+        for bit, condition in self.__conditions:
+            if condition.positive and (not maybe_positive):
+                continue
+            if condition.match(value):
+                mask |= bit
+        if len(self.__memo) < _MEMO_SIZE:
+            self.__memo[value] = mask
+        return mask
+
+
+class _Pattern:
+    """A single compiled ignore pattern, which is a glob using "*", or a regex if anchored with "^" or "$"."""
+
+    def __init__(self, pattern: str) -> None:
+        self.glob: str | None = None
+        self.regex: re.Pattern[str] | None = None
+        self.negate = False
+        self.positive = False
+        if pattern == "!":
+            # Special case, "!" matches None
+            return
+        if pattern.startswith("!"):
+            pattern = pattern[1:]
+            self.negate = True
+        if pattern.startswith("^") or pattern.endswith("$"):
+            self.regex = re.compile(pattern)
+        else:
+            self.glob = pattern
+            # Should maybe add .replace(r"\?", ".?")
+            self.regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
+        self.positive = not self.negate
+
+    def match(self, value: str | None) -> bool:
+        if self.regex is None:
+            return value is None
+        if value is None:
+            return False
+        matched = self.regex.search(value) is not None
+        return (not matched) if self.negate else matched
+
+    def sql(self, column: Any) -> sqlalchemy.ColumnElement[bool] | None:
+        """Return SQL which only matches values that this pattern matches, or None if that is not possible."""
+        if self.regex is None:
+            return column.is_(None)
+        if self.glob is None:
+            # Regular expressions cannot be matched by SQLite
+            return None
+        # SQLite GLOB is case sensitive like the regex, but its "*" also matches newlines
+        glob = "*" + re.sub(r"([?\[])", r"[\1]", self.glob) + "*"
+        if self.negate:
+            return sqlalchemy.and_(column.is_not(None), sqlalchemy.not_(column.op("GLOB")(glob)))
+        conditions = [column.op("GLOB")(glob)]
+        if "*" in self.glob:
+            conditions.append(sqlalchemy.func.instr(column, "\n") == 0)
+        return sqlalchemy.and_(*conditions)
+
+
+def matcher(committee_name: str, ignores: Sequence[sql.CheckResultIgnore]) -> Matcher:
+    """Return the compiled matcher for the ignores of a committee, reusing it while they are unchanged."""
+    key = tuple(
+        (
+            cri.id,
+            cri.release_glob,
+            cri.revision_number,
+            cri.checker_glob,
+            cri.primary_rel_path_glob,
+            cri.member_rel_path_glob,
+            cri.status,
+            cri.message_glob,
+        )
+        for cri in ignores
+    )
+    cached = _global_matchers.get(committee_name)
+    if (cached is not None) and (cached[0] == key):
+        return cached[1]
+    compiled = Matcher(ignores)
+    _global_matchers[committee_name] = (key, compiled)
+    return compiled
+
+
+def _alternation(patterns: list[_Pattern]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    # Joining patterns renumbers their groups, so those which refer to groups must be matched one at a time
+    if any((p.regex is not None) and p.regex.groups and _GROUP_REFERENCE.search(p.regex.pattern) for p in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p.regex.pattern})" for p in patterns if p.regex is not None))
+    except re.error:
+        # For example, if a pattern uses global inline flags
+        return None
+
+
+def _sql_clause(ignores: Sequence[sql.CheckResultIgnore]) -> sqlalchemy.ColumnElement[bool] | None:
+    """Return SQL which only matches check results that are ignored, or None if no ignore can be expressed."""
+    via = sql.validate_instrumented_attribute
+    rules = []
+    for cri in ignores:
+        conditions: list[sqlalchemy.ColumnElement[bool]] = [
+            via(sql.CheckResult.status) != sql.CheckResultStatus.SUCCESS
+        ]
+        if cri.revision_number is not None:
+            conditions.append(via(sql.CheckResult.revision_number) == cri.revision_number)
+        if cri.status is not None:
+            conditions.append(via(sql.CheckResult.status) == sql.CheckResultStatus(cri.status.value))
+        for field, attr in _PATTERN_FIELDS:
+            if (pattern := getattr(cri, attr)) is None:
+                continue
+            condition = _Pattern(pattern).sql(via(getattr(sql.CheckResult, field)))
+            if condition is None:
+                break
+            conditions.append(condition)
+        else:
+            rules.append(sqlalchemy.and_(*conditions))
+    if not rules:
+        return None
+    return sqlalchemy.or_(*rules)
@@ -18,17 +18,16 @@
 # Removing this will cause circular imports
 from __future__ import annotations
 
-import re
 from typing import TYPE_CHECKING
 
 import atr.db as db
 import atr.models.sql as sql
 import atr.storage as storage
+import atr.storage.ignores as ignores
 import atr.storage.types as types
 
 if TYPE_CHECKING:
     import pathlib
-    from collections.abc import Callable
 
 
 class GeneralPublic:
@@ -58,17 +57,9 @@ class GeneralPublic:
             sql.validate_instrumented_attribute(sql.CheckResult.checker).asc(),
             sql.validate_instrumented_attribute(sql.CheckResult.created).desc(),
         )
-        all_check_results = await query.all()
-
         # Filter out any results that are ignored
-        unignored_checks = []
-        ignored_checks = []
         match_ignore = await self.ignores_matcher(release.committee.name)
-        for cr in all_check_results:
-            if not match_ignore(cr):
-                unignored_checks.append(cr)
-            else:
-                ignored_checks.append(cr)
+        unignored_checks, ignored_checks = await self.__ignores_partition(query, match_ignore)
 
         # Filter to separate the primary and member results
         primary_results_list = []
@@ -96,67 +87,34 @@ class GeneralPublic:
     async def ignores_matcher(
         self,
         committee_name: str,
-    ) -> Callable[[sql.CheckResult], bool]:
-        ignores = await self.__data.check_result_ignore(
+    ) -> ignores.Matcher:
+        committee_ignores = await self.__data.check_result_ignore(
             committee_name=committee_name,
         ).all()
-
-        def match(cr: sql.CheckResult) -> bool:
-            for ignore in ignores:
-                if self.__check_ignore_match(cr, ignore):
-                    # log.info(f"Ignoring check result {cr} due to ignore {ignore}")
-                    return True
-            return False
-
-        return match
-
-    def __check_ignore_match(self, cr: sql.CheckResult, cri: sql.CheckResultIgnore) -> bool:
-        # Does not check that the committee name matches
-        if cr.status == sql.CheckResultStatus.SUCCESS:
-            # Successes are never ignored
-            return False
-        if cri.release_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.release_glob, cr.release_name):
-                return False
-        if cri.revision_number is not None:
-            if cri.revision_number != cr.revision_number:
-                return False
-        if cri.checker_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.checker_glob, cr.checker):
-                return False
-        return self.__check_ignore_match_2(cr, cri)
-
-    def __check_ignore_match_2(self, cr: sql.CheckResult, cri: sql.CheckResultIgnore) -> bool:
-        if cri.primary_rel_path_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.primary_rel_path_glob, cr.primary_rel_path):
-                return False
-        if cri.member_rel_path_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.member_rel_path_glob, cr.member_rel_path):
-                return False
-        if cri.status is not None:
-            if cr.status != cri.status:
-                return False
-        if cri.message_glob is not None:
-            if not self.__check_ignore_match_pattern(cri.message_glob, cr.message):
-                return False
-        return True
-
-    def __check_ignore_match_pattern(self, pattern: str | None, value: str | None) -> bool:
-        if pattern == "!":
-            # Special case, "!" matches None
-            return True if (value is None) else False
-        if (pattern is None) or (value is None):
-            return False
-        negate = False
-        if pattern.startswith("!"):
-            pattern = pattern[1:]
-            negate = True
-        if pattern.startswith("^") or pattern.endswith("$"):
-            regex = re.compile(pattern)
+        return ignores.matcher(committee_name, committee_ignores)
+
+    async def __ignores_partition(
+        self, query: db.Query[sql.CheckResult], match_ignore: ignores.Matcher
+    ) -> tuple[list[sql.CheckResult], list[sql.CheckResult]]:
+        if match_ignore.sql_clause is None:
+            all_check_results = await query.all()
+            ignored_checks = []
         else:
-            regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
-            # Should maybe add .replace(r"\?", ".?")
-        matched = regex.search(value) is not None
-        if negate:
-            return not matched
-        return matched
+            # The database removes the results of the ignores that it can express
+            # The remaining results must still be checked against all of the ignores
+            clause = match_ignore.sql_clause
+            ignored_result = await self.__data.execute(query.query.where(clause.is_(True)))
+            ignored_checks = list(ignored_result.scalars().all())
+            all_result = await self.__data.execute(query.query.where(clause.is_not(True)))
+            all_check_results = all_result.scalars().all()
+
+        unignored_checks = []
+        for cr in all_check_results:
+            if not match_ignore(cr):
+                unignored_checks.append(cr)
+            else:
+                ignored_checks.append(cr)
+        if match_ignore.sql_clause is not None:
+            # Restore the order of the query
+            ignored_checks.sort(key=lambda cr: (cr.checker, -cr.created.timestamp()))
+        return unignored_checks, ignored_checks
@@ -27,8 +27,10 @@ import aiofiles.os
 import aioshutil
 import sqlmodel
 
+import atr.clone as clone
 import atr.db as db
 import atr.models.sql as sql
+import atr.provenance as provenance
 import atr.storage as storage
 import atr.tasks.message as message
 import atr.util as util
@@ -194,6 +196,10 @@ class CommitteeMember(CommitteeParticipant):
         )
 
         try:
+            # The files keep their digests when moved, so this rarely needs to read them
+            provenance_update = await provenance.prepare(
+                finished_path, [str(rel_path) async for rel_path in util.paths_recursive(finished_path)]
+            )
             task = sql.Task(
                 status=sql.TaskStatus.QUEUED,
                 task_type=sql.TaskType.MESSAGE_SEND,
@@ -211,6 +217,7 @@ class CommitteeMember(CommitteeParticipant):
             self.__data.add(task)
 
             await self.__promote_in_database(release, preview_revision_number, release_date)
+            await provenance.apply(self.__data, release.name, provenance_update)
             await self.__data.commit()
         except storage.AccessError as e:
             raise e
@@ -234,7 +241,7 @@ class CommitteeMember(CommitteeParticipant):
         # The "exist_ok" parameter means to overwrite files if True
         # We only overwrite if we're not preserving, so we supply "not preserve"
         # TODO: Add a test for this
-        await util.create_hard_link_clone(
+        await clone.tree(
             unfinished_path,
             downloads_path,
             do_not_create_dest_dir=dry_run,
@@ -25,6 +25,7 @@ import aiohttp
 import sqlalchemy.exc as exc
 
 import atr.db as db
+import atr.fetch as fetch
 import atr.models.basic as basic
 import atr.models.distribution as distribution
 import atr.models.sql as sql
@@ -277,13 +278,12 @@ class CommitteeMember(CommitteeParticipant):
         self, api_url: str, platform: sql.DistributionPlatform, version: str
     ) -> outcome.Outcome[basic.JSON]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url) as response:
-                    response.raise_for_status()
-                    response_json = await response.json()
-            result = basic.as_json(response_json)
-        except aiohttp.ClientError as e:
+            response = await fetch.get(api_url)
+            response.raise_for_status()
+            response_json = response.json()
+        except (aiohttp.ClientError, ValueError) as e:
             return outcome.Error(e)
+        result = basic.as_json(response_json)
         match platform:
             case sql.DistributionPlatform.NPM | sql.DistributionPlatform.NPM_SCOPED:
                 if version not in distribution.NpmResponse.model_validate(result).time:
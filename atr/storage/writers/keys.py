@@ -38,6 +38,7 @@ import atr.config as config
 import atr.db as db
 import atr.log as log
 import atr.models.sql as sql
+import atr.people as people
 import atr.storage as storage
 import atr.storage.outcome as outcome
 import atr.storage.types as types
@@ -274,7 +275,7 @@ class FoundationCommitter(GeneralPublic):
             return outcome.Error(ValueError("Expected one key block, got none or multiple"))
         key_block = key_blocks[0]
         try:
-            ldap_data = await util.email_to_uid_map()
+            ldap_data = await people.email_to_uid_map()
             key = await asyncio.to_thread(self.__block_model, key_block, ldap_data)
         except Exception as e:
             return outcome.Error(e)
@@ -608,7 +609,7 @@ class CommitteeParticipant(FoundationCommitter):
     async def __ensure(self, keys_file_text: str, associate: bool = True) -> outcome.List[types.Key]:
         outcomes = outcome.List[types.Key]()
         try:
-            ldap_data = await util.email_to_uid_map()
+            ldap_data = await people.email_to_uid_map()
             key_blocks = util.parse_key_blocks(keys_file_text)
         except Exception as e:
             outcomes.append_error(e)
@@ -22,7 +22,6 @@ import asyncio
 import base64
 import contextlib
 import datetime
-import hashlib
 import pathlib
 from typing import TYPE_CHECKING, Final
 
@@ -35,15 +34,18 @@ import sqlmodel
 import atr.analysis as analysis
 import atr.config as config
 import atr.db as db
+import atr.digests as digests
 import atr.log as log
 import atr.models.api as api
 import atr.models.sql as sql
+import atr.models.uploads as uploads_models
 import atr.storage as storage
 import atr.storage.types as types
+import atr.uploads as uploads
 import atr.util as util
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Sequence
+    from collections.abc import AsyncGenerator, AsyncIterable, Sequence
 
     import werkzeug.datastructures as datastructures
 
@@ -212,14 +214,11 @@ class CommitteeParticipant(FoundationCommitter):
             if await aiofiles.os.path.exists(hash_path_in_new_revision):
                 raise storage.AccessError(f"{hash_type} file already exists")
 
-            # Read the source file from the new revision and compute the hash
-            hash_obj = hashlib.sha256() if hash_type == "sha256" else hashlib.sha512()
-            async with aiofiles.open(path_in_new_revision, "rb") as f:
-                while chunk := await f.read(8192):
-                    hash_obj.update(chunk)
+            # The source file is hard linked from the previous revision, so its digests are usually stored
+            source_digests = await digests.read(path_in_new_revision)
 
             # Write the hash file into the new revision
-            hash_value = hash_obj.hexdigest()
+            hash_value = source_digests.sha256 if (hash_type == "sha256") else source_digests.sha512
             async with aiofiles.open(hash_path_in_new_revision, "w") as f:
                 await f.write(f"{hash_value}  {rel_path.name}\n")
 
@@ -426,6 +425,68 @@ class CommitteeParticipant(FoundationCommitter):
                 number=creating.new.number,
             ).demand(storage.AccessError("Revision not found"))
 
+    async def upload_append(self, upload: uploads_models.Upload, offset: int, chunks: AsyncIterable[bytes]) -> int:
+        self.__upload_demand(upload)
+        return await uploads.append(upload, offset, chunks)
+
+    async def upload_discard(self, upload: uploads_models.Upload) -> None:
+        self.__upload_demand(upload)
+        await uploads.discard(upload)
+
+    async def upload_finish(self, upload: uploads_models.Upload, sha256: str | None = None) -> sql.Revision:
+        self.__upload_demand(upload)
+        description = f"Upload via API: {upload.rel_path}"
+        async with self.create_and_manage_revision(upload.project_name, upload.version_name, description) as creating:
+            await uploads.finish(upload, creating.interim_path, sha256)
+        if creating.new is None:
+            raise storage.AccessError("Failed to create revision")
+        async with db.session() as data:
+            release_name = sql.release_name(upload.project_name, upload.version_name)
+            return await data.revision(
+                release_name=release_name,
+                number=creating.new.number,
+            ).demand(storage.AccessError("Revision not found"))
+
+    async def upload_session_commit(
+        self, session: uploads_models.Session, sha256s: dict[str, str] | None = None
+    ) -> sql.Revision:
+        """Add every upload of a session to the release as a single new revision."""
+        self.__upload_demand(session)
+        number_of_files = len(await uploads.session_uploads(session))
+        description = f"Upload of {number_of_files} file{'' if number_of_files == 1 else 's'} via API"
+        async with self.create_and_manage_revision(session.project_name, session.version_name, description) as creating:
+            await uploads.session_commit(session, creating.interim_path, sha256s)
+        if creating.new is None:
+            raise storage.AccessError("Failed to create revision")
+        async with db.session() as data:
+            release_name = sql.release_name(session.project_name, session.version_name)
+            return await data.revision(
+                release_name=release_name,
+                number=creating.new.number,
+            ).demand(storage.AccessError("Revision not found"))
+
+    async def upload_session_discard(self, session: uploads_models.Session) -> None:
+        self.__upload_demand(session)
+        await uploads.session_discard(session)
+
+    async def upload_session_start(self, project_name: str, version_name: str) -> uploads_models.Session:
+        await self.__upload_release(project_name, version_name)
+        return await uploads.session_create(self.__asf_uid, project_name, version_name)
+
+    async def upload_start(
+        self,
+        project_name: str,
+        version_name: str,
+        rel_path: str,
+        session: uploads_models.Session | None = None,
+    ) -> uploads_models.Upload:
+        if session is not None:
+            self.__upload_demand(session)
+            if (session.project_name, session.version_name) != (project_name, version_name):
+                raise storage.AccessError(f"The session is for {session.project_name} {session.version_name}")
+        await self.__upload_release(project_name, version_name)
+        return await uploads.create(self.__asf_uid, project_name, version_name, rel_path, session)
+
     async def upload_files(
         self,
         project_name: str,
@@ -687,6 +748,19 @@ class CommitteeParticipant(FoundationCommitter):
         result = await self.__data.execute(query)
         return result.scalar_one()
 
+    def __upload_demand(self, started: uploads_models.Session | uploads_models.Upload) -> None:
+        # Uploads and sessions are only visible to the user who started them
+        if started.asf_uid != self.__asf_uid:
+            raise storage.AccessError("Upload not found")
+
+    async def __upload_release(self, project_name: str, version_name: str) -> None:
+        release_name = sql.release_name(project_name, version_name)
+        release = await self.__data.release(name=release_name).demand(
+            storage.AccessError(f"Release {release_name} not found")
+        )
+        if release.project.committee_name != self.__committee_name:
+            raise storage.AccessError(f"Release {release_name} not found")
+
 
 class CommitteeMember(CommitteeParticipant):
     def __init__(
@@ -29,9 +29,13 @@ from typing import TYPE_CHECKING
 import aiofiles.os
 import aioshutil
 
+import atr.clone as clone
 import atr.db as db
 import atr.db.interaction as interaction
+import atr.log as log
+import atr.manifest as manifest
 import atr.models.sql as sql
+import atr.provenance as provenance
 import atr.storage as storage
 import atr.storage.types as types
 import atr.tasks as tasks
@@ -40,6 +44,8 @@ import atr.util as util
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
+    import atr.models.manifest as models
+
 
 class SafeSession:
     def __init__(self, temp_dir: str):
@@ -118,6 +124,8 @@ class CommitteeParticipant(FoundationCommitter):
                 RuntimeError("Release does not exist for new revision creation")
             )
             old_revision = await interaction.latest_revision(release)
+            # Releases which were created before the index existed are indexed in full by their next revision
+            release_indexed = await provenance.indexed(data, release_name)
 
         # Create a temporary directory
         # We ensure, below, that it's removed on any exception
@@ -126,12 +134,17 @@ class CommitteeParticipant(FoundationCommitter):
         temp_dir: str = await asyncio.to_thread(tempfile.mkdtemp, prefix=prefix_token + "-", dir=util.get_tmp_dir())
         temp_dir_path = pathlib.Path(temp_dir)
         creating = types.Creating(old=old_revision, interim_path=temp_dir_path, new=None, failed=None)
+        parent_manifest = None
         try:
             # The directory was created by mkdtemp, but it's empty
             if old_revision is not None:
                 # If this is not the first revision, hard link the previous revision
+                # Its manifest, if there is one, saves listing the previous revision directory
                 old_release_dir = util.release_directory(release)
-                await util.create_hard_link_clone(old_release_dir, temp_dir_path, do_not_create_dest_dir=True)
+                parent_manifest = await manifest.read(old_release_dir)
+                await clone.tree(
+                    old_release_dir, temp_dir_path, do_not_create_dest_dir=True, source_manifest=parent_manifest
+                )
             # The directory is either empty or its files are hard linked to the previous revision
             yield creating
         except types.FailedError as e:
@@ -143,8 +156,14 @@ class CommitteeParticipant(FoundationCommitter):
             raise
 
         # Ensure that the permissions of every directory are 755
+        # Then record the files in the new revision, reusing the digests of the previous revision
         try:
             await asyncio.to_thread(util.chmod_directories, temp_dir_path)
+            new_manifest = await asyncio.to_thread(manifest.build, temp_dir_path, parent_manifest)
+            revision_diff = _revision_diff(old_revision, parent_manifest, new_manifest)
+            provenance_update = await _provenance_prepare(
+                temp_dir_path, new_manifest, revision_diff if release_indexed else None
+            )
         except Exception:
             await aioshutil.rmtree(temp_dir)
             raise
@@ -176,6 +195,9 @@ class CommitteeParticipant(FoundationCommitter):
                 # Give the caller details about the new revision
                 creating.new = new_revision
 
+                # Update the index before the rename, so that if it fails then the directory is still removed
+                await provenance.apply(data, release_name, provenance_update)
+
                 # Rename the directory to the new revision number
                 await data.refresh(release)
                 new_revision_dir = util.release_directory(release)
@@ -189,6 +211,9 @@ class CommitteeParticipant(FoundationCommitter):
                 await aioshutil.rmtree(temp_dir)
                 raise
 
+            # Readers walk the revision directory instead if the manifest is missing
+            await _manifest_write(new_revision_dir, new_manifest, revision_diff)
+
             # Commit to end the transaction started by data.begin_immediate
             # We must commit the revision before starting the checks
             # This also releases the write lock
@@ -221,3 +246,35 @@ class CommitteeMember(CommitteeParticipant):
             raise storage.AccessError("No ASF UID")
         self.__asf_uid = asf_uid
         self.__committee_name = committee_name
+
+
+async def _manifest_write(
+    revision_dir: pathlib.Path, revision_manifest: models.Manifest, revision_diff: models.Diff | None
+) -> None:
+    try:
+        await manifest.write(revision_dir, revision_manifest)
+        # Without the diff, it is computed when it is needed instead
+        if revision_diff is not None:
+            await manifest.diff_write(revision_dir, revision_diff)
+    except OSError:
+        log.exception(f"Failed to write the manifest of {revision_dir}")
+
+
+async def _provenance_prepare(
+    revision_dir: pathlib.Path, revision_manifest: models.Manifest, revision_diff: models.Diff | None
+) -> provenance.Update:
+    if revision_diff is None:
+        return await provenance.prepare(revision_dir, (entry.path for entry in revision_manifest.files))
+    return await provenance.prepare(
+        revision_dir, [*revision_diff.added, *revision_diff.modified], removed=revision_diff.removed
+    )
+
+
+def _revision_diff(
+    old_revision: sql.Revision | None, parent_manifest: models.Manifest | None, revision_manifest: models.Manifest
+) -> models.Diff | None:
+    if old_revision is None:
+        return manifest.diff(None, None, revision_manifest)
+    if parent_manifest is None:
+        return None
+    return manifest.diff(old_revision.number, parent_manifest, revision_manifest)
@@ -15,82 +15,55 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import collections
 import time
 from collections.abc import Generator
+from typing import Final
 
 import atr.db as db
 import atr.log as log
 import atr.models as models
 import atr.models.sql as sql
+import atr.people as people
 import atr.util as util
 
+_VOTES_SIZE: Final = 256
+
+# Tabulations by thread, message identifiers, and committee, with the LDAP map that they used
+_global_votes: collections.OrderedDict[
+    tuple[str, frozenset[str], tuple[str, ...] | None, tuple[str, ...] | None],
+    tuple[dict[str, str], int | None, dict[str, models.tabulate.VoteEmail]],
+] = collections.OrderedDict()
+
 
 async def votes(
     committee: sql.Committee | None, thread_id: str
 ) -> tuple[int | None, dict[str, models.tabulate.VoteEmail]]:
-    """Tabulate votes."""
+    """Tabulate votes, reusing the previous tabulation if the thread and the voters are unchanged."""
     start = time.perf_counter_ns()
-    email_to_uid = await util.email_to_uid_map()
+    email_to_uid = await people.email_to_uid_map()
     end = time.perf_counter_ns()
-    log.info(f"LDAP search took {(end - start) / 1000000} ms")
+    log.info(f"LDAP snapshot lookup took {(end - start) / 1000000} ms")
     log.info(f"Email addresses from LDAP: {len(email_to_uid)}")
 
-    start = time.perf_counter_ns()
-    tabulated_votes = {}
-    start_unixtime = None
-    async for _mid, msg in util.thread_messages(thread_id):
-        from_raw = msg.get("from_raw", "")
-        ok, from_email_lower, asf_uid = _vote_identity(from_raw, email_to_uid)
-        if not ok:
-            continue
-
-        if asf_uid is not None:
-            asf_uid_or_email = asf_uid
-            list_raw = msg.get("list_raw", "")
-            status = await _vote_status(asf_uid, list_raw, committee)
-        else:
-            asf_uid_or_email = from_email_lower
-            status = models.tabulate.VoteStatus.UNKNOWN
-
-        if start_unixtime is None:
-            epoch = msg.get("epoch", "")
-            if epoch:
-                start_unixtime = int(epoch)
-
-        subject = msg.get("subject", "")
-        if "[RESULT]" in subject:
-            break
-
-        body = msg.get("body", "")
-        if not body:
-            continue
-
-        castings = _vote_castings(body)
-        if not castings:
-            continue
-
-        if len(castings) == 1:
-            vote_cast = castings[0][0]
-        else:
-            vote_cast = models.tabulate.Vote.UNKNOWN
-        quotation = " // ".join([c[1] for c in castings])
-
-        vote_email = models.tabulate.VoteEmail(
-            asf_uid_or_email=asf_uid_or_email,
-            from_email=from_email_lower,
-            status=status,
-            asf_eid=msg.get("mid", ""),
-            iso_datetime=msg.get("date", ""),
-            vote=vote_cast,
-            quotation=quotation,
-            updated=asf_uid_or_email in tabulated_votes,
-        )
-        tabulated_votes[asf_uid_or_email] = vote_email
-    end = time.perf_counter_ns()
-    log.info(f"Tabulated votes: {len(tabulated_votes)}")
-    log.info(f"Tabulation took {(end - start) / 1000000} ms")
-
-    return start_unixtime, tabulated_votes
+    message_ids = await util.thread_message_ids(thread_id)
+    # In development, the committee of each vote is looked up from its list, so it is not part of the key
+    key = None if util.is_dev_environment() else _votes_key(committee, thread_id, message_ids)
+    if (key is not None) and ((memoised := _global_votes.get(key)) is not None):
+        memoised_email_to_uid, start_unixtime, tabulated_votes = memoised
+        # The memoised map is kept so that a new LDAP snapshot is never mistaken for the old one
+        if memoised_email_to_uid is email_to_uid:
+            _global_votes.move_to_end(key)
+            log.info(f"Reused tabulation of {len(message_ids)} messages in thread {thread_id}")
+            return start_unixtime, dict(tabulated_votes)
+
+    start_unixtime, tabulated_votes, complete = await _votes(committee, thread_id, message_ids, email_to_uid)
+    # A tabulation which is missing messages is not memoised, so that they are fetched again on the next request
+    if (key is not None) and complete:
+        _global_votes[key] = (email_to_uid, start_unixtime, tabulated_votes)
+        while len(_global_votes) > _VOTES_SIZE:
+            _global_votes.popitem(last=False)
+    return start_unixtime, dict(tabulated_votes)
 
 
 async def vote_committee(thread_id: str, release: sql.Release) -> sql.Committee | None:
@@ -401,3 +374,78 @@ async def _vote_status(asf_uid: str, list_raw: str, committee: sql.Committee | N
         else:
             status = models.tabulate.VoteStatus.CONTRIBUTOR
     return status
+
+
+async def _votes(
+    committee: sql.Committee | None, thread_id: str, message_ids: list[str], email_to_uid: dict[str, str]
+) -> tuple[int | None, dict[str, models.tabulate.VoteEmail], bool]:
+    start = time.perf_counter_ns()
+    tabulated_votes = {}
+    start_unixtime = None
+    missed: list[str] = []
+    async for _mid, msg in util.thread_messages(thread_id, message_ids, missed):
+        from_raw = msg.get("from_raw", "")
+        ok, from_email_lower, asf_uid = _vote_identity(from_raw, email_to_uid)
+        if not ok:
+            continue
+
+        if asf_uid is not None:
+            asf_uid_or_email = asf_uid
+            list_raw = msg.get("list_raw", "")
+            status = await _vote_status(asf_uid, list_raw, committee)
+        else:
+            asf_uid_or_email = from_email_lower
+            status = models.tabulate.VoteStatus.UNKNOWN
+
+        if start_unixtime is None:
+            epoch = msg.get("epoch", "")
+            if epoch:
+                start_unixtime = int(epoch)
+
+        subject = msg.get("subject", "")
+        if "[RESULT]" in subject:
+            break
+
+        body = msg.get("body", "")
+        if not body:
+            continue
+
+        castings = _vote_castings(body)
+        if not castings:
+            continue
+
+        if len(castings) == 1:
+            vote_cast = castings[0][0]
+        else:
+            vote_cast = models.tabulate.Vote.UNKNOWN
+        quotation = " // ".join([c[1] for c in castings])
+
+        vote_email = models.tabulate.VoteEmail(
+            asf_uid_or_email=asf_uid_or_email,
+            from_email=from_email_lower,
+            status=status,
+            asf_eid=msg.get("mid", ""),
+            iso_datetime=msg.get("date", ""),
+            vote=vote_cast,
+            quotation=quotation,
+            updated=asf_uid_or_email in tabulated_votes,
+        )
+        tabulated_votes[asf_uid_or_email] = vote_email
+    end = time.perf_counter_ns()
+    log.info(f"Tabulated votes: {len(tabulated_votes)}")
+    log.info(f"Tabulation took {(end - start) / 1000000} ms")
+
+    return start_unixtime, tabulated_votes, not missed
+
+
+def _votes_key(
+    committee: sql.Committee | None, thread_id: str, message_ids: list[str]
+) -> tuple[str, frozenset[str], tuple[str, ...] | None, tuple[str, ...] | None]:
+    if committee is None:
+        return thread_id, frozenset(message_ids), None, None
+    return (
+        thread_id,
+        frozenset(message_ids),
+        tuple(sorted(committee.committee_members)),
+        tuple(sorted(committee.committers)),
+    )
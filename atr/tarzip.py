@@ -18,8 +18,8 @@
 import contextlib
 import tarfile
 import zipfile
-from collections.abc import Generator, Iterator
-from typing import IO, TypeVar
+from collections.abc import Generator, Iterator, Sequence
+from typing import IO, Final, TypeVar
 from typing import Protocol as TypingProtocol
 
 ArchiveT = TypeVar("ArchiveT", tarfile.TarFile, zipfile.ZipFile)
@@ -28,6 +28,8 @@ ArchiveT = TypeVar("ArchiveT", tarfile.TarFile, zipfile.ZipFile)
 # We'll use the covariant version and ignore the mypy error
 MemberT = TypeVar("MemberT", tarfile.TarInfo, zipfile.ZipInfo, covariant=True)
 
+_SCAN_CHUNK_SIZE: Final = 1024 * 1024
+
 
 class AbstractArchiveMember[MemberT: (tarfile.TarInfo, zipfile.ZipInfo)](TypingProtocol):
     name: str
@@ -129,6 +131,20 @@ class ArchiveContext[ArchiveT: (tarfile.TarFile, zipfile.ZipFile)]:
         return self._archive_obj
 
 
+class MemberVisitor(TypingProtocol):
+    """A consumer of archive members that can share a single pass with other visitors."""
+
+    # Whether every file member must be read to the end, e.g. to verify integrity
+    drain: bool
+
+    def fail(self, error: Exception) -> None: ...
+
+    # The number of content bytes wanted for a member, where 0 is none and -1 is all
+    def prefix(self, member: Member) -> int: ...
+
+    def visit(self, member: Member, content: bytes | None) -> None: ...
+
+
 type TarArchive = ArchiveContext[tarfile.TarFile]
 type ZipArchive = ArchiveContext[zipfile.ZipFile]
 type Archive = TarArchive | ZipArchive
@@ -155,3 +171,58 @@ def open_archive(archive_path: str) -> Generator[Archive]:
     finally:
         if archive_file:
             archive_file.close()
+
+
+def scan(archive_path: str, visitors: Sequence[MemberVisitor], chunk_size: int = _SCAN_CHUNK_SIZE) -> None:
+    """Stream every member of an archive exactly once, feeding each member to all visitors."""
+    active = list(visitors)
+    drain = any(visitor.drain for visitor in active)
+    try:
+        with open_archive(archive_path) as archive:
+            for member in archive:
+                active = _scan_member(archive, member, active, drain, chunk_size)
+                if not active:
+                    break
+    except Exception as e:
+        for visitor in active:
+            visitor.fail(e)
+
+
+def _scan_member(
+    archive: Archive, member: Member, visitors: list[MemberVisitor], drain: bool, chunk_size: int
+) -> list[MemberVisitor]:
+    wanted = [(visitor, visitor.prefix(member) if member.isfile() else 0) for visitor in visitors]
+    remaining: list[MemberVisitor] = []
+    content: bytes | None = None
+    limits = [limit for _visitor, limit in wanted]
+    if member.isfile() and (drain or any(limits)):
+        limit = -1 if (-1 in limits) else max(limits, default=0)
+        content = _scan_member_read(archive, member, limit, drain, chunk_size)
+
+    for visitor, limit in wanted:
+        visitor_content = None
+        if (content is not None) and (limit != 0):
+            visitor_content = content if (limit < 0) else content[:limit]
+        try:
+            visitor.visit(member, visitor_content)
+        except Exception as e:
+            visitor.fail(e)
+            continue
+        remaining.append(visitor)
+    return remaining
+
+
+def _scan_member_read(archive: Archive, member: Member, limit: int, drain: bool, chunk_size: int) -> bytes | None:
+    fileobj = archive.extractfile(member)
+    if fileobj is None:
+        return None
+    with fileobj:
+        if limit < 0:
+            return fileobj.read()
+        content = fileobj.read(limit) if (limit > 0) else b""
+        if drain:
+            # Reading each member to the end keeps the pass strictly sequential
+            # It also makes decompression or CRC errors surface here
+            while fileobj.read(chunk_size):
+                pass
+    return content
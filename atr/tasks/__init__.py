@@ -19,12 +19,16 @@ from collections.abc import Awaitable, Callable, Coroutine
 from typing import Any, Final
 
 import atr.db as db
+import atr.log as log
 import atr.models.results as results
 import atr.models.sql as sql
+import atr.tasks.checks as checks
 import atr.tasks.checks.hashing as hashing
 import atr.tasks.checks.license as license
 import atr.tasks.checks.paths as paths
 import atr.tasks.checks.rat as rat
+import atr.tasks.checks.reuse as reuse
+import atr.tasks.checks.scan as scan
 import atr.tasks.checks.signature as signature
 import atr.tasks.checks.targz as targz
 import atr.tasks.checks.zipformat as zipformat
@@ -69,6 +73,8 @@ async def draft_checks(
         release = await data.release(name=sql.release_name(project_name, release_version), _committee=True).demand(
             RuntimeError("Release not found")
         )
+        inputs = reuse.Inputs(data, release, revision_path)
+        reused = 0
         for path in relative_paths:
             path_str = str(path)
             task_function: Callable[[str, sql.Release, str, str], Awaitable[list[sql.Task]]] | None = None
@@ -77,9 +83,8 @@ async def draft_checks(
                     task_function = func
                     break
             if task_function:
-                for task in await task_function(asf_uid, release, revision_number, path_str):
-                    task.revision_number = revision_number
-                    data.add(task)
+                tasks = await task_function(asf_uid, release, revision_number, path_str)
+                reused += await _draft_tasks_add(data, inputs, tasks, revision_number)
             # TODO: Should we check .json files for their content?
             # Ideally we would not have to do that
             if path.name.endswith(".cdx.json"):
@@ -107,7 +112,11 @@ async def draft_checks(
         path_check_task = queued(
             asf_uid, sql.TaskType.PATHS_CHECK, release, revision_number, extra_args={"is_podling": is_podling}
         )
+        # The path check copies forward the results of the previous revision when this hash matches
+        path_check_task.inputs_hash = await inputs.hash(path_check_task)
         data.add(path_check_task)
+        if reused:
+            log.info(f"Reused check results of {reused} tasks for {release.name} revision {revision_number}")
         if caller_data is None:
             await data.commit()
 
@@ -175,6 +184,8 @@ def queued(
 
 def resolve(task_type: sql.TaskType) -> Callable[..., Awaitable[results.Results | None]]:  # noqa: C901
     match task_type:
+        case sql.TaskType.ARCHIVE_SCAN:
+            return scan.archive
         case sql.TaskType.HASHING_CHECK:
             return hashing.check
         case sql.TaskType.KEYS_IMPORT_FILE:
@@ -230,33 +241,78 @@ async def sha_checks(asf_uid: str, release: sql.Release, revision: str, hash_fil
 
 async def tar_gz_checks(asf_uid: str, release: sql.Release, revision: str, path: str) -> list[sql.Task]:
     """Create check tasks for a .tar.gz or .tgz file."""
-    # This release has committee, as guaranteed in draft_checks
-    is_podling = (release.project.committee is not None) and release.project.committee.is_podling
-    tasks = [
-        queued(asf_uid, sql.TaskType.LICENSE_FILES, release, revision, path, extra_args={"is_podling": is_podling}),
-        queued(asf_uid, sql.TaskType.LICENSE_HEADERS, release, revision, path),
-        queued(asf_uid, sql.TaskType.RAT_CHECK, release, revision, path),
-        queued(asf_uid, sql.TaskType.TARGZ_INTEGRITY, release, revision, path),
-        queued(asf_uid, sql.TaskType.TARGZ_STRUCTURE, release, revision, path),
-    ]
-
-    return tasks
+    return _archive_checks(asf_uid, release, revision, path)
 
 
 async def zip_checks(asf_uid: str, release: sql.Release, revision: str, path: str) -> list[sql.Task]:
     """Create check tasks for a .zip file."""
+    return _archive_checks(asf_uid, release, revision, path)
+
+
+def _archive_checks(asf_uid: str, release: sql.Release, revision: str, path: str) -> list[sql.Task]:
     # This release has committee, as guaranteed in draft_checks
     is_podling = (release.project.committee is not None) and release.project.committee.is_podling
+    # A single scan runs the license files, license headers, integrity, and structure checks
+    # That way the archive is only decompressed once for all of them
+    # RAT extracts the archive to disk, so it remains a separate task
     tasks = [
-        queued(asf_uid, sql.TaskType.LICENSE_FILES, release, revision, path, extra_args={"is_podling": is_podling}),
-        queued(asf_uid, sql.TaskType.LICENSE_HEADERS, release, revision, path),
+        queued(asf_uid, sql.TaskType.ARCHIVE_SCAN, release, revision, path, extra_args={"is_podling": is_podling}),
         queued(asf_uid, sql.TaskType.RAT_CHECK, release, revision, path),
-        queued(asf_uid, sql.TaskType.ZIPFORMAT_INTEGRITY, release, revision, path),
-        queued(asf_uid, sql.TaskType.ZIPFORMAT_STRUCTURE, release, revision, path),
     ]
     return tasks
 
 
+async def _draft_tasks_add(data: db.Session, inputs: reuse.Inputs, tasks: list[sql.Task], revision_number: str) -> int:
+    """Queue check tasks, reusing earlier results for those with unchanged inputs."""
+    reused = 0
+    parents: dict[sql.TaskType, sql.Task] = {}
+    for task in tasks:
+        task.revision_number = revision_number
+        # Files hard linked from the previous revision do not need to be checked again
+        task.inputs_hash = await inputs.hash(task)
+        if await reuse.results_copy(data, task):
+            reused += 1
+            continue
+        parent_type = DEPENDENCIES.get(task.task_type)
+        if (parent_type is not None) and (parent_type in parents):
+            task.depends_on_id = parents[parent_type].id
+        data.add(task)
+        if task.task_type in DEPENDENCIES.values():
+            # The tasks which depend on this task need its ID
+            await data.flush()
+            parents[task.task_type] = task
+    return reused
+
+
+# Tasks which are limited by CPU rather than I/O, and so run one at a time within each worker
+CPU_BOUND: Final[frozenset[sql.TaskType]] = frozenset(
+    {
+        sql.TaskType.ARCHIVE_SCAN,
+        sql.TaskType.LICENSE_FILES,
+        sql.TaskType.LICENSE_HEADERS,
+        sql.TaskType.RAT_CHECK,
+        sql.TaskType.SBOM_GENERATE_CYCLONEDX,
+        sql.TaskType.TARGZ_INTEGRITY,
+        sql.TaskType.TARGZ_STRUCTURE,
+        sql.TaskType.ZIPFORMAT_INTEGRITY,
+        sql.TaskType.ZIPFORMAT_STRUCTURE,
+    }
+)
+
+# Check tasks which may only be claimed once the given task for the same file has completed
+# There is no point running RAT on an archive that cannot be read
+DEPENDENCIES: Final[dict[sql.TaskType, sql.TaskType]] = {
+    sql.TaskType.RAT_CHECK: sql.TaskType.ARCHIVE_SCAN,
+}
+
+# When any of these checkers records a failure, the tasks which depend on its task are cancelled
+GATING_CHECKERS: Final[frozenset[str]] = frozenset(
+    {
+        checks.function_key(targz.integrity),
+        checks.function_key(zipformat.integrity),
+    }
+)
+
 TASK_FUNCTIONS: Final[dict[str, Callable[..., Coroutine[Any, Any, list[sql.Task]]]]] = {
     ".asc": asc_checks,
     ".sha256": sha_checks,
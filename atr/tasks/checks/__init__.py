@@ -17,23 +17,34 @@
 
 from __future__ import annotations
 
+import contextlib
+import contextvars
 import dataclasses
 import datetime
 import functools
 import pathlib
-from typing import TYPE_CHECKING, Any
+import time
+from typing import TYPE_CHECKING, Any, Final
 
 import sqlmodel
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import AsyncGenerator, Awaitable, Callable
 
     import atr.models.schema as schema
 
 import atr.db as db
+import atr.log as log
 import atr.models.sql as sql
 import atr.util as util
 
+# Buffered recorders flush when they hold this many results, or when this many seconds have passed
+_FLUSH_ROWS: Final = 500
+_FLUSH_SECONDS: Final = 2.0
+
+# The recorders created within the current buffered context, if any
+_BUFFERED: Final[contextvars.ContextVar[list[Recorder] | None]] = contextvars.ContextVar("buffered", default=None)
+
 
 # Pydantic does not like Callable types, so we use a dataclass instead
 # It says: "you should define `Callable`, then call `FunctionArguments.model_rebuild()`"
@@ -46,6 +57,7 @@ class FunctionArguments:
     revision_number: str
     primary_rel_path: str | None
     extra_args: dict[str, Any]
+    inputs_hash: str | None = None
 
 
 class Recorder:
@@ -57,6 +69,7 @@ class Recorder:
     member_rel_path: str | None
     revision: str
     afresh: bool
+    inputs_hash: str | None
 
     def __init__(
         self,
@@ -67,6 +80,7 @@ class Recorder:
         primary_rel_path: str | None = None,
         member_rel_path: str | None = None,
         afresh: bool = True,
+        inputs_hash: str | None = None,
     ) -> None:
         self.checker = function_key(checker) if callable(checker) else checker
         self.release_name = sql.release_name(project_name, version_name)
@@ -74,8 +88,15 @@ class Recorder:
         self.primary_rel_path = primary_rel_path
         self.member_rel_path = member_rel_path
         self.afresh = afresh
+        self.inputs_hash = inputs_hash
         self.constructed = False
+        self.failed = False
         self.member_problems: dict[sql.CheckResultStatus, int] = {}
+        self.__buffer: list[sql.CheckResult] | None = None
+        self.__buffer_started = time.monotonic()
+        if (buffered_recorders := _BUFFERED.get()) is not None:
+            self.__buffer = []
+            buffered_recorders.append(self)
 
         self.project_name = project_name
         self.version_name = version_name
@@ -90,8 +111,11 @@ class Recorder:
         primary_rel_path: str | None = None,
         member_rel_path: str | None = None,
         afresh: bool = True,
+        inputs_hash: str | None = None,
     ) -> Recorder:
-        recorder = cls(checker, project_name, version_name, revision_number, primary_rel_path, member_rel_path, afresh)
+        recorder = cls(
+            checker, project_name, version_name, revision_number, primary_rel_path, member_rel_path, afresh, inputs_hash
+        )
         if afresh is True:
             # Clear outer path whether it's specified or not
             await recorder.clear(primary_rel_path=primary_rel_path, member_rel_path=member_rel_path)
@@ -115,6 +139,8 @@ class Recorder:
             #     # Clear inner path only if it's specified
             #     await self.clear(primary_rel_path=primary_rel_path, member_rel_path=member_rel_path)
 
+        if status in {sql.CheckResultStatus.EXCEPTION, sql.CheckResultStatus.FAILURE}:
+            self.failed = True
         if member_rel_path is not None:
             if status != sql.CheckResultStatus.SUCCESS:
                 self.member_problems[status] = self.member_problems.get(status, 0) + 1
@@ -129,14 +155,19 @@ class Recorder:
             status=status,
             message=message,
             data=data,
+            inputs_hash=self.inputs_hash,
         )
 
-        # It would be more efficient to keep a session open
-        # But, we prefer in this case to maintain a simpler interface
-        # If performance is unacceptable, we can revisit this design
-        async with db.session() as session:
-            session.add(result)
-            await session.commit()
+        if self.__buffer is None:
+            async with db.session() as session:
+                session.add(result)
+                await session.commit()
+            return result
+
+        # Results are written in bulk, to avoid one write transaction per result
+        self.__buffer.append(result)
+        if (len(self.__buffer) >= _FLUSH_ROWS) or ((time.monotonic() - self.__buffer_started) >= _FLUSH_SECONDS):
+            await self.flush()
         return result
 
     async def abs_path(self, rel_path: str | None = None) -> pathlib.Path | None:
@@ -187,6 +218,8 @@ class Recorder:
         return matches(str(abs_path))
 
     async def clear(self, primary_rel_path: str | None = None, member_rel_path: str | None = None) -> None:
+        # Buffered results must not outlive a clear that was requested after them
+        await self.flush()
         async with db.session() as data:
             stmt = sqlmodel.delete(sql.CheckResult).where(
                 sql.validate_instrumented_attribute(sql.CheckResult.release_name) == self.release_name,
@@ -220,6 +253,21 @@ class Recorder:
             member_rel_path=member_rel_path,
         )
 
+    async def flush(self) -> None:
+        """Write any buffered results to the database in a single transaction."""
+        if not self.__buffer:
+            return
+        buffer = self.__buffer
+        self.__buffer = []
+        start = time.perf_counter()
+        async with db.session() as session:
+            session.add_all(buffer)
+            await session.commit()
+        elapsed = time.perf_counter() - start
+        rate = len(buffer) / elapsed if (elapsed > 0) else 0
+        log.info(f"Recorded {len(buffer)} {self.checker} results in {elapsed:.3f}s ({rate:.0f} rows/s)")
+        self.__buffer_started = time.monotonic()
+
     async def success(
         self, message: str, data: Any, primary_rel_path: str | None = None, member_rel_path: str | None = None
     ) -> sql.CheckResult:
@@ -243,6 +291,19 @@ class Recorder:
         )
 
 
+@contextlib.asynccontextmanager
+async def buffered() -> AsyncGenerator[list[Recorder]]:
+    """Buffer the results of recorders created in this context, and flush them on exit."""
+    recorders: list[Recorder] = []
+    token = _BUFFERED.set(recorders)
+    try:
+        yield recorders
+    finally:
+        _BUFFERED.reset(token)
+        for recorder in recorders:
+            await recorder.flush()
+
+
 def function_key(func: Callable[..., Any]) -> str:
     return func.__module__ + "." + func.__name__
 
@@ -15,11 +15,11 @@
 # specific language governing permissions and limitations
 # under the License.
 
-import hashlib
 import secrets
 
 import aiofiles
 
+import atr.digests as digests
 import atr.log as log
 import atr.models.results as results
 import atr.tasks.checks as checks
@@ -48,13 +48,10 @@ async def check(args: checks.FunctionArguments) -> results.Results | None:
         f"Checking hash ({algorithm}) for {artifact_abs_path} against {hash_abs_path} (rel: {args.primary_rel_path})"
     )
 
-    hash_func = hashlib.sha256 if algorithm == "sha256" else hashlib.sha512
-    hash_obj = hash_func()
     try:
-        async with aiofiles.open(artifact_abs_path, mode="rb") as f:
-            while chunk := await f.read(4096):
-                hash_obj.update(chunk)
-        computed_hash = hash_obj.hexdigest()
+        # All digests are computed together, so the other hash files of the artifact do not read it again
+        artifact_digests = await digests.read(artifact_abs_path)
+        computed_hash = artifact_digests.sha256 if (algorithm == "sha256") else artifact_digests.sha512
 
         async with aiofiles.open(hash_abs_path) as f:
             expected_hash = await f.read()
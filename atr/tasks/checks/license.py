@@ -49,36 +49,47 @@ HTTP_APACHE_LICENSE_HEADER: Final[bytes] = (
 
 HTTPS_APACHE_LICENSE_HEADER: Final[bytes] = HTTP_APACHE_LICENSE_HEADER.replace(b" http ", b" https ")
 
-# Patterns for files to include in license header checks
+# Extensions, in lower case, of files to include in license header checks
 # Ordered by their popularity in the Stack Overflow Developer Survey 2024
-INCLUDED_PATTERNS: Final[list[str]] = [
-    r"\.(js|mjs|cjs|jsx)$",  # JavaScript
-    r"\.py$",  # Python
-    r"\.(sql|ddl|dml)$",  # SQL
-    r"\.(ts|tsx|mts|cts)$",  # TypeScript
-    r"\.(sh|bash|zsh|ksh)$",  # Shell
-    r"\.(java|jav)$",  # Java
-    r"\.(cs|csx)$",  # C#
-    r"\.(cpp|cxx|cc|c\+\+|hpp)$",  # C++
-    r"\.(c|h)$",  # C
-    r"\.(php|php[3-9]|phtml)$",  # PHP
-    r"\.(ps1|psm1|psd1)$",  # PowerShell
-    r"\.go$",  # Go
-    r"\.rs$",  # Rust
-    r"\.(kt|kts)$",  # Kotlin
-    r"\.(lua)$",  # Lua
-    r"\.dart$",  # Dart
-    r"\.(asm|s|S)$",  # Assembly
-    r"\.(rb|rbw)$",  # Ruby
-    r"\.swift$",  # Swift
-    r"\.(r|R)$",  # R
-    r"\.(vb|vbs)$",  # Visual Basic
-    r"\.m$",  # MATLAB
-    r"\.vba$",  # VBA
-    r"\.(groovy|gvy|gy|gsh)$",  # Groovy
-    r"\.(scala|sc)$",  # Scala
-    r"\.(pl|pm|t)$",  # Perl
-]
+INCLUDED_EXTENSIONS: Final[frozenset[str]] = frozenset(
+    {
+        *("js", "mjs", "cjs", "jsx"),  # JavaScript
+        "py",  # Python
+        *("sql", "ddl", "dml"),  # SQL
+        *("ts", "tsx", "mts", "cts"),  # TypeScript
+        *("sh", "bash", "zsh", "ksh"),  # Shell
+        *("java", "jav"),  # Java
+        *("cs", "csx"),  # C#
+        *("cpp", "cxx", "cc", "c++", "hpp"),  # C++
+        *("c", "h"),  # C
+        *("php", *(f"php{n}" for n in range(3, 10)), "phtml"),  # PHP
+        *("ps1", "psm1", "psd1"),  # PowerShell
+        "go",  # Go
+        "rs",  # Rust
+        *("kt", "kts"),  # Kotlin
+        "lua",  # Lua
+        "dart",  # Dart
+        *("asm", "s"),  # Assembly
+        *("rb", "rbw"),  # Ruby
+        "swift",  # Swift
+        "r",  # R
+        *("vb", "vbs"),  # Visual Basic
+        "m",  # MATLAB
+        "vba",  # VBA
+        *("groovy", "gvy", "gy", "gsh"),  # Groovy
+        *("scala", "sc"),  # Scala
+        *("pl", "pm", "t"),  # Perl
+    }
+)
+
+_GENERATED_BY_PATTERNS: Final[tuple[bytes, ...]] = (
+    b"Generated By:JJTree",
+    b"Generated By:JavaCC",
+)
+_HEADER_SPAN: Final = re.compile(rb"Licensed to the.*?under the License", re.MULTILINE)
+_HEADER_WHITESPACE: Final = re.compile(rb"[ \t\r\n]+")
+_HEADER_WORDS: Final = re.compile(rb"[A-Za-z0-9]+")
+_HEADERS_EXPECTED: Final = frozenset({HTTP_APACHE_LICENSE_HEADER.lower(), HTTPS_APACHE_LICENSE_HEADER.lower()})
 
 # Types
 
@@ -119,22 +130,36 @@ class MemberSkippedResult(schema.Strict):
 
 type Result = ArtifactResult | MemberResult | MemberSkippedResult
 
-# Tasks
+# Visitors
 
 
-async def files(args: checks.FunctionArguments) -> results.Results | None:
-    """Check that the LICENSE and NOTICE files exist and are valid."""
-    recorder = await args.recorder()
-    if not (artifact_abs_path := await recorder.abs_path()):
-        return None
-    if await recorder.primary_path_is_binary():
-        return None
+class FilesVisitor:
+    """Collect LICENSE, NOTICE, and DISCLAIMER findings from the top of an archive."""
 
-    log.info(f"Checking license files for {artifact_abs_path} (rel: {args.primary_rel_path})")
+    drain = False
 
-    try:
-        is_podling = args.extra_args.get("is_podling", False)
-        for result in await asyncio.to_thread(_files_check_core_logic, str(artifact_abs_path), is_podling):
+    def __init__(self, is_podling: bool) -> None:
+        self.is_podling = is_podling
+        self.error: Exception | None = None
+        self.disclaimer_found = False
+        self.license_results: dict[str, str | None] = {}
+        self.notice_results: dict[str, tuple[bool, list[str], str]] = {}
+
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        if _files_member_filename(member) in {"LICENSE", "NOTICE"}:
+            return -1
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        if self.error is not None:
+            log.error(f"Error during license file check execution: {self.error}")
+            await recorder.exception("Error during license file check execution", {"error": str(self.error)})
+            return
+        for result in self.results():
             match result:
                 case ArtifactResult():
                     await _record_artifact(recorder, result)
@@ -143,10 +168,126 @@ async def files(args: checks.FunctionArguments) -> results.Results | None:
                 case MemberSkippedResult():
                     pass
 
-    except Exception as e:
-        log.exception("Error during license file check execution:")
-        await recorder.exception("Error during license file check execution", {"error": str(e)})
+    def results(self) -> Iterator[Result]:
+        yield from _license_results(self.license_results)
+        yield from _notice_results(self.notice_results)
+        if self.is_podling and (not self.disclaimer_found):
+            yield ArtifactResult(
+                status=sql.CheckResultStatus.FAILURE,
+                message="No DISCLAIMER or DISCLAIMER-WIP file found",
+                data=None,
+            )
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        filename = _files_member_filename(member)
+        if filename == "LICENSE":
+            # TODO: Check length, should be 11,358 bytes
+            self.license_results[filename] = None if (content is None) else _files_check_core_logic_license(content)
+        elif filename == "NOTICE":
+            # TODO: Check length doesn't exceed some preset
+            self.notice_results[filename] = _files_check_core_logic_notice(content)
+        elif filename in {"DISCLAIMER", "DISCLAIMER-WIP"}:
+            self.disclaimer_found = True
+
+
+class HeadersVisitor:
+    """Verify Apache License headers in the source file members of an archive."""
+
+    drain = False
+
+    def __init__(self, artifact_path: str, ignore_lines: list[str]) -> None:
+        self.artifact_basename = os.path.basename(artifact_path)
+        self.ignore_lines = ignore_lines
+        self.matcher = util.create_path_matcher(
+            ignore_lines,
+            pathlib.Path("/" + self.artifact_basename) / ".atr" / "license-headers-ignore",
+            pathlib.Path("/"),
+        )
+        self.artifact_data = ArtifactData()
+        self.error: Exception | None = None
+        self.member_results: list[MemberResult] = []
 
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        # Allow for some extra content at the start of the file
+        # That may be shebangs, encoding declarations, etc.
+        if _headers_check_core_logic_should_check(member.name):
+            return 4096
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        try:
+            for result in self.member_results:
+                await _record_member(recorder, result)
+            if self.error is not None:
+                await recorder.exception("Error during license header check execution", {"error": str(self.error)})
+                return
+            await _record_artifact(recorder, self.summary())
+            member_failures = recorder.member_problems.get(sql.CheckResultStatus.FAILURE, 0)
+            if member_failures > 0:
+                await recorder.failure(
+                    f"Some files had invalid license headers ({member_failures} failures)",
+                    None,
+                )
+        except Exception as e:
+            await recorder.exception("Error during license header check execution", {"error": str(e)})
+
+    def summary(self) -> ArtifactResult:
+        artifact_data = self.artifact_data
+        return ArtifactResult(
+            status=sql.CheckResultStatus.SUCCESS,
+            message=f"Checked {artifact_data.files_checked} files,"
+            f" found {artifact_data.files_with_valid_headers} with valid headers,"
+            f" {artifact_data.files_with_invalid_headers} with invalid headers,"
+            f" and {artifact_data.files_skipped} skipped",
+            data=artifact_data.model_dump_json(),
+        )
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        if member.name and member.name.split("/")[-1].startswith("._"):
+            # Metadata convention
+            return
+
+        ignore_path = "/" + self.artifact_basename + "/" + member.name.lstrip("/")
+        if self.matcher(ignore_path):
+            return
+
+        match _headers_check_core_logic_process_file(member, content):
+            case MemberResult() as result:
+                self.artifact_data.files_checked += 1
+                match result.status:
+                    case sql.CheckResultStatus.SUCCESS:
+                        self.artifact_data.files_with_valid_headers += 1
+                    case sql.CheckResultStatus.FAILURE:
+                        self.artifact_data.files_with_invalid_headers += 1
+                    case sql.CheckResultStatus.WARNING:
+                        self.artifact_data.files_with_invalid_headers += 1
+                    case sql.CheckResultStatus.EXCEPTION:
+                        self.artifact_data.files_with_invalid_headers += 1
+                self.member_results.append(result)
+            case MemberSkippedResult():
+                self.artifact_data.files_skipped += 1
+
+
+# Tasks
+
+
+async def files(args: checks.FunctionArguments) -> results.Results | None:
+    """Check that the LICENSE and NOTICE files exist and are valid."""
+    recorder = await args.recorder()
+    if not (artifact_abs_path := await recorder.abs_path()):
+        return None
+    if await recorder.primary_path_is_binary():
+        return None
+
+    log.info(f"Checking license files for {artifact_abs_path} (rel: {args.primary_rel_path})")
+
+    visitor = FilesVisitor(args.extra_args.get("is_podling", False))
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
     return None
 
 
@@ -160,6 +301,14 @@ async def headers(args: checks.FunctionArguments) -> results.Results | None:
 
     log.info(f"Checking license headers for {artifact_abs_path} (rel: {args.primary_rel_path})")
 
+    visitor = HeadersVisitor(str(artifact_abs_path), await headers_ignore_lines(args))
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
+    return None
+
+
+async def headers_ignore_lines(args: checks.FunctionArguments) -> list[str]:
+    """Read the license header ignore lines from the revision, if present."""
     async with db.session() as data:
         release = await data.release(project_name=args.project_name, version=args.version_name).get()
     ignore_lines = []
@@ -169,34 +318,24 @@ async def headers(args: checks.FunctionArguments) -> results.Results | None:
         ignore_file = release_directory_revision / ".atr" / "license-headers-ignore"
         if ignore_file.exists():
             ignore_lines = ignore_file.read_text().splitlines()
-
-    return await _headers_core(recorder, str(artifact_abs_path), ignore_lines)
+    return ignore_lines
 
 
 def headers_validate(content: bytes, _filename: str) -> tuple[bool, str | None]:
     """Validate that the content contains the Apache License header."""
-    generated_by_patterns = [
-        b"Generated By:JJTree",
-        b"Generated By:JavaCC",
-    ]
-    for pattern in generated_by_patterns:
+    for pattern in _GENERATED_BY_PATTERNS:
         if pattern in content:
             return True, None
 
-    r_span = re.compile(rb"Licensed to the.*?under the License", re.MULTILINE)
-    r_words = re.compile(rb"[A-Za-z0-9]+")
-
     # Normalise the content
-    content = re.sub(rb"[ \t\r\n]+", b" ", content)
+    content = _HEADER_WHITESPACE.sub(b" ", content)
 
     # For each matching heuristic span...
-    for span in r_span.finditer(content):
+    for span in _HEADER_SPAN.finditer(content):
         # Get only the words in the span
-        words = r_words.findall(span.group(0))
+        words = _HEADER_WORDS.findall(span.group(0))
         joined = b" ".join(words).lower()
-        if joined == HTTP_APACHE_LICENSE_HEADER.lower():
-            return True, None
-        elif joined == HTTPS_APACHE_LICENSE_HEADER.lower():
+        if joined in _HEADERS_EXPECTED:
             return True, None
     return False, "Could not find Apache License header"
 
@@ -204,51 +343,8 @@ def headers_validate(content: bytes, _filename: str) -> tuple[bool, str | None]:
 # File helpers
 
 
-def _files_check_core_logic(artifact_path: str, is_podling: bool) -> Iterator[Result]:
-    """Verify that LICENSE and NOTICE files exist and are placed and formatted correctly."""
-    license_results: dict[str, str | None] = {}
-    notice_results: dict[str, tuple[bool, list[str], str]] = {}
-    disclaimer_found = False
-
-    # Check for license files in the root directory
-    with tarzip.open_archive(artifact_path) as archive:
-        for member in archive:
-            if member.name and member.name.split("/")[-1].startswith("._"):
-                # Metadata convention
-                continue
-
-            if member.name.count("/") > 1:
-                # Skip files in subdirectories
-                continue
-
-            filename = os.path.basename(member.name)
-            if filename == "LICENSE":
-                # TODO: Check length, should be 11,358 bytes
-                license_diff = _files_check_core_logic_license(archive, member)
-                license_results[filename] = license_diff
-            elif filename == "NOTICE":
-                # TODO: Check length doesn't exceed some preset
-                notice_ok, notice_issues, notice_preamble = _files_check_core_logic_notice(archive, member)
-                notice_results[filename] = (notice_ok, notice_issues, notice_preamble)
-            elif filename in {"DISCLAIMER", "DISCLAIMER-WIP"}:
-                disclaimer_found = True
-
-    yield from _license_results(license_results)
-    yield from _notice_results(notice_results)
-    if is_podling and (not disclaimer_found):
-        yield ArtifactResult(
-            status=sql.CheckResultStatus.FAILURE,
-            message="No DISCLAIMER or DISCLAIMER-WIP file found",
-            data=None,
-        )
-
-
-def _files_check_core_logic_license(archive: tarzip.Archive, member: tarzip.Member) -> str | None:
+def _files_check_core_logic_license(package_license_bytes: bytes) -> str | None:
     """Verify that the start of the LICENSE file matches the Apache 2.0 license."""
-    f = archive.extractfile(member)
-    if not f:
-        return None
-
     sha3e = hashlib.sha3_256()
     sha3e.update(constants.APACHE_LICENSE_2_0.encode("utf-8"))
     sha3_expected = sha3e.hexdigest()
@@ -256,7 +352,6 @@ def _files_check_core_logic_license(archive: tarzip.Archive, member: tarzip.Memb
     if sha3_expected != "5efa4839f385df309ffc022ca5ce9763c4bc709dab862ca77d9a894db6598456":
         log.error("SHA3 expected value is incorrect, please update the static.LICENSE constant")
 
-    package_license_bytes = f.read()
     package_license = package_license_bytes.decode("utf-8", errors="replace")
 
     # Some whitespace variations are permitted:
@@ -278,14 +373,13 @@ def _files_check_core_logic_license(archive: tarzip.Archive, member: tarzip.Memb
     return None
 
 
-def _files_check_core_logic_notice(archive: tarzip.Archive, member: tarzip.Member) -> tuple[bool, list[str], str]:
+def _files_check_core_logic_notice(notice_bytes: bytes | None) -> tuple[bool, list[str], str]:
     """Verify that the NOTICE file follows the required format."""
-    f = archive.extractfile(member)
-    if not f:
+    if notice_bytes is None:
         return False, ["the NOTICE file is missing or could not be read"], ""
 
     try:
-        content = f.read().decode("utf-8")
+        content = notice_bytes.decode("utf-8")
     except UnicodeDecodeError:
         return False, ["the NOTICE file is not valid UTF-8"], ""
     preamble = "".join(content.splitlines(keepends=True)[:3])
@@ -303,6 +397,17 @@ def _files_check_core_logic_notice(archive: tarzip.Archive, member: tarzip.Membe
     return len(issues) == 0, issues, preamble
 
 
+def _files_member_filename(member: tarzip.Member) -> str | None:
+    """Return the filename of a member at the top of the archive, or None if it should be skipped."""
+    if member.name and member.name.split("/")[-1].startswith("._"):
+        # Metadata convention
+        return None
+    if member.name.count("/") > 1:
+        # Skip files in subdirectories
+        return None
+    return os.path.basename(member.name)
+
+
 def _license_results(
     license_results: dict[str, str | None],
 ) -> Iterator[Result]:
@@ -397,70 +502,7 @@ def _get_file_extension(filename: str) -> str | None:
     return ext[1:].lower()
 
 
-def _headers_check_core_logic(artifact_path: str, ignore_lines: list[str]) -> Iterator[Result]:
-    """Verify Apache License headers in source files within an archive."""
-    # We could modify @Lucas-C/pre-commit-hooks instead for this
-    # But hopefully this will be robust enough, at least for testing
-    # First find and validate the root directory
-    artifact_data = ArtifactData()
-
-    # try:
-    #     targz.root_directory(artifact_path)
-    # except targz.RootDirectoryError as e:
-    #     # Tooling believes that this should be a warning, not an error
-    #     yield ArtifactResult(
-    #         status=models.CheckResultStatus.WARNING,
-    #         message=f"Could not determine root directory: {e!s}",
-    #         data=None,
-    #     )
-
-    artifact_basename = os.path.basename(artifact_path)
-    # log.info(f"Ignore lines: {ignore_lines}")
-
-    # Check files in the archive
-    with tarzip.open_archive(artifact_path) as archive:
-        for member in archive:
-            if member.name and member.name.split("/")[-1].startswith("._"):
-                # Metadata convention
-                continue
-
-            ignore_path = "/" + artifact_basename + "/" + member.name.lstrip("/")
-            matcher = util.create_path_matcher(ignore_lines, pathlib.Path(ignore_path), pathlib.Path("/"))
-            # log.info(f"Checking {ignore_path} with matcher {matcher}")
-            if matcher(ignore_path):
-                # log.info(f"Skipping {ignore_path} because it matches the ignore list")
-                continue
-
-            match _headers_check_core_logic_process_file(archive, member):
-                case ArtifactResult() | MemberResult() as result:
-                    artifact_data.files_checked += 1
-                    match result.status:
-                        case sql.CheckResultStatus.SUCCESS:
-                            artifact_data.files_with_valid_headers += 1
-                        case sql.CheckResultStatus.FAILURE:
-                            artifact_data.files_with_invalid_headers += 1
-                        case sql.CheckResultStatus.WARNING:
-                            artifact_data.files_with_invalid_headers += 1
-                        case sql.CheckResultStatus.EXCEPTION:
-                            artifact_data.files_with_invalid_headers += 1
-                    yield result
-                case MemberSkippedResult():
-                    artifact_data.files_skipped += 1
-
-    yield ArtifactResult(
-        status=sql.CheckResultStatus.SUCCESS,
-        message=f"Checked {artifact_data.files_checked} files,"
-        f" found {artifact_data.files_with_valid_headers} with valid headers,"
-        f" {artifact_data.files_with_invalid_headers} with invalid headers,"
-        f" and {artifact_data.files_skipped} skipped",
-        data=artifact_data.model_dump_json(),
-    )
-
-
-def _headers_check_core_logic_process_file(
-    archive: tarzip.Archive,
-    member: tarzip.Member,
-) -> Result:
+def _headers_check_core_logic_process_file(member: tarzip.Member, content: bytes | None) -> Result:
     """Process a single file in an archive for license header verification."""
     if not member.isfile():
         return MemberSkippedResult(
@@ -475,20 +517,15 @@ def _headers_check_core_logic_process_file(
             reason="Not a source file",
         )
 
-    # Extract and check the file
-    try:
-        f = archive.extractfile(member)
-        if f is None:
-            return MemberResult(
-                status=sql.CheckResultStatus.EXCEPTION,
-                path=member.name,
-                message="Could not read file",
-                data=None,
-            )
+    if content is None:
+        return MemberResult(
+            status=sql.CheckResultStatus.EXCEPTION,
+            path=member.name,
+            message="Could not read file",
+            data=None,
+        )
 
-        # Allow for some extra content at the start of the file
-        # That may be shebangs, encoding declarations, etc.
-        content = f.read(4096)
+    try:
         is_valid, error = headers_validate(content, member.name)
         if is_valid:
             return MemberResult(
@@ -518,36 +555,7 @@ def _headers_check_core_logic_should_check(filepath: str) -> bool:
     ext = _get_file_extension(filepath)
     if ext is None:
         return False
-
-    # Then check if the file matches any of our included patterns
-    for pattern in INCLUDED_PATTERNS:
-        if re.search(pattern, filepath, re.IGNORECASE):
-            return True
-
-    return False
-
-
-async def _headers_core(recorder: checks.Recorder, artifact_abs_path: str, ignore_lines: list[str]) -> None:
-    try:
-        for result in await asyncio.to_thread(_headers_check_core_logic, str(artifact_abs_path), ignore_lines):
-            match result:
-                case ArtifactResult():
-                    await _record_artifact(recorder, result)
-                case MemberResult():
-                    await _record_member(recorder, result)
-                case MemberSkippedResult():
-                    pass
-        member_failures = recorder.member_problems.get(sql.CheckResultStatus.FAILURE, 0)
-        if member_failures > 0:
-            await recorder.failure(
-                f"Some files had invalid license headers ({member_failures} failures)",
-                None,
-            )
-
-    except Exception as e:
-        await recorder.exception("Error during license header check execution", {"error": str(e)})
-
-    return None
+    return ext in INCLUDED_EXTENSIONS
 
 
 async def _record_artifact(recorder: checks.Recorder, result: ArtifactResult) -> None:
@@ -16,15 +16,22 @@
 # under the License.
 
 import asyncio
+import itertools
 import pathlib
 import re
 from typing import Final
 
 import aiofiles.os
+import sqlalchemy
+import sqlmodel
 
 import atr.analysis as analysis
+import atr.db as db
 import atr.log as log
+import atr.manifest as manifest
+import atr.models.manifest as manifest_models
 import atr.models.results as results
+import atr.models.sql as sql
 import atr.tasks.checks as checks
 import atr.user as user
 import atr.util as util
@@ -38,6 +45,9 @@ _ALLOWED_TOP_LEVEL: Final = frozenset(
     }
 )
 
+# Revisions which add or remove more files than this are checked in full
+_INCREMENTAL_MAX_CHANGED: Final = 1000
+
 
 async def check(args: checks.FunctionArguments) -> results.Results | None:
     """Check file path structure and naming conventions against ASF release policy for all files in a release."""
@@ -85,6 +95,9 @@ async def check(args: checks.FunctionArguments) -> results.Results | None:
     is_podling = args.extra_args.get("is_podling", False)
     relative_paths = [p async for p in util.paths_recursive(base_path)]
     relative_paths_set = set(str(p) for p in relative_paths)
+    checkers = [recorder_errors.checker, recorder_warnings.checker, recorder_success.checker]
+    if (affected := await _incremental(args, base_path, relative_paths_set, checkers)) is not None:
+        relative_paths = [pathlib.Path(p) for p in sorted(affected)]
     for relative_path in relative_paths:
         # Delegate processing of each path to the helper function
         await _check_path_process_single(
@@ -101,6 +114,19 @@ async def check(args: checks.FunctionArguments) -> results.Results | None:
     return None
 
 
+def _affected(revision_diff: manifest_models.Diff, relative_paths: set[str]) -> set[str]:
+    """Return the paths whose results may differ from those in the parent revision."""
+    # The results depend only on the names of files, so modified files are unaffected
+    affected: set[str] = set()
+    for changed in itertools.chain(revision_diff.added, revision_diff.removed):
+        affected.add(changed)
+        # Artifacts depend on their metadata files, and metadata files on their artifacts
+        for suffix in analysis.METADATA_SUFFIXES:
+            affected.add(f"{changed}.{suffix}")
+            affected.add(changed.removesuffix(f".{suffix}"))
+    return affected & relative_paths
+
+
 async def _check_artifact_rules(
     base_path: pathlib.Path, relative_path: pathlib.Path, relative_paths: set[str], errors: list[str], is_podling: bool
 ) -> None:
@@ -224,6 +250,42 @@ async def _check_path_process_single(
     )
 
 
+async def _incremental(
+    args: checks.FunctionArguments, base_path: pathlib.Path, relative_paths: set[str], checkers: list[str]
+) -> set[str] | None:
+    """Copy forward the unaffected results of the parent revision, and return the paths to check again."""
+    if args.inputs_hash is None:
+        return None
+    revision_diff = await manifest.diff_read(base_path)
+    if (revision_diff is None) or (revision_diff.parent is None):
+        return None
+    changed = len(revision_diff.added) + len(revision_diff.removed)
+    if changed > _INCREMENTAL_MAX_CHANGED:
+        return None
+
+    async with db.session() as data:
+        # The parent must have been checked in full by the same code with the same arguments
+        parent_tasks = await data.task(
+            task_type=sql.TaskType.PATHS_CHECK,
+            status=sql.TaskStatus.COMPLETED,
+            project_name=args.project_name,
+            version_name=args.version_name,
+            revision_number=revision_diff.parent,
+            inputs_hash=args.inputs_hash,
+        ).all()
+        if not parent_tasks:
+            return None
+        affected = _affected(revision_diff, relative_paths)
+        copied = await _results_copy(data, args, revision_diff.parent, checkers, affected.union(revision_diff.removed))
+        await data.commit()
+
+    log.info(
+        f"Copied {copied} path check results from revision {revision_diff.parent},"
+        f" checking {len(affected)} of {len(relative_paths)} paths again"
+    )
+    return affected
+
+
 async def _record(
     recorder_errors: checks.Recorder,
     recorder_warnings: checks.Recorder,
@@ -240,3 +302,30 @@ async def _record(
         await recorder_success.success(
             "Path structure and naming conventions conform to policy", {}, primary_rel_path=relative_path_str
         )
+
+
+async def _results_copy(
+    data: db.Session,
+    args: checks.FunctionArguments,
+    parent_number: str,
+    checkers: list[str],
+    excluded: set[str],
+) -> int:
+    via = sql.validate_instrumented_attribute
+    release_name = sql.release_name(args.project_name, args.version_name)
+    columns = ["checker", "primary_rel_path", "member_rel_path", "created", "status", "message", "data", "inputs_hash"]
+    rows = sqlmodel.select(
+        sqlalchemy.literal(release_name).label("release_name"),
+        sqlalchemy.literal(args.revision_number).label("revision_number"),
+        *[via(getattr(sql.CheckResult, column)) for column in columns],
+    ).where(
+        via(sql.CheckResult.release_name) == release_name,
+        via(sql.CheckResult.revision_number) == parent_number,
+        via(sql.CheckResult.checker).in_(checkers),
+        via(sql.CheckResult.primary_rel_path).not_in(excluded),
+    )
+    statement = sqlalchemy.insert(sql.CheckResult).from_select(["release_name", "revision_number", *columns], rows)
+    result = await data.execute(statement)
+    # Avoid a type error with result.rowcount
+    rowcount: int = getattr(result, "rowcount", 0)
+    return rowcount
@@ -15,11 +15,17 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from __future__ import annotations
+
 import asyncio
 import os
 import pathlib
+import select
+import shutil
 import subprocess
 import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ElementTree
 from typing import Any, Final
 
@@ -42,6 +48,74 @@ _JAVA_MEMORY_ARGS: Final[list[str]] = []
 #     "-XX:CompressedClassSpaceSize=16m"
 # ]
 _RAT_EXCLUDES_FILENAMES: Final[set[str]] = {".rat-excludes", "rat-excludes.txt"}
+_RAT_SERVER_START_SECONDS: Final = 60
+_RAT_TIMEOUT_SECONDS: Final = 300
+
+_global_java_checked: bool = False
+_global_rat_server: _RatServer | None = None
+_global_rat_server_lock: Final = threading.Lock()
+
+
+class _RatServer:
+    """A long lived JVM which runs Apache RAT reports on request, to avoid the JVM startup cost per archive."""
+
+    def __init__(self, rat_jar_path: str, server_path: str) -> None:
+        self.rat_jar_path = rat_jar_path
+        command = ["java", *_JAVA_MEMORY_ARGS, "-cp", f"{server_path}{os.pathsep}{rat_jar_path}", "RatServer"]
+        log.info(f"Starting Apache RAT server: {' '.join(command)}")
+        self.__buffer = bytearray()
+        self.__process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            status, _output = self.__response(time.monotonic() + _RAT_SERVER_START_SECONDS)
+        except Exception:
+            self.close()
+            raise
+        if status != "READY":
+            self.close()
+            raise RuntimeError(f"Unexpected Apache RAT server status: {status}")
+
+    def alive(self) -> bool:
+        return self.__process.poll() is None
+
+    def close(self) -> None:
+        self.__process.kill()
+        self.__process.wait()
+
+    def run(self, rat_args: list[str], timeout: float) -> tuple[bool, str]:
+        """Run a report with the given command line arguments, and return whether it succeeded with its output."""
+        stdin = self.__process.stdin
+        if stdin is None:
+            raise RuntimeError("Apache RAT server has no stdin")
+        stdin.write(b"".join(arg.encode("utf-8") + b"\0" for arg in rat_args) + b"\0")
+        stdin.flush()
+        status, output = self.__response(time.monotonic() + timeout)
+        return status == "OK", output
+
+    def __fill(self, deadline: float) -> None:
+        stdout = self.__process.stdout
+        if stdout is None:
+            raise RuntimeError("Apache RAT server has no stdout")
+        remaining = deadline - time.monotonic()
+        if (remaining <= 0) or (not select.select([stdout], [], [], remaining)[0]):
+            raise TimeoutError("Apache RAT server did not respond in time")
+        chunk = os.read(stdout.fileno(), 65536)
+        if not chunk:
+            raise EOFError("Apache RAT server exited unexpectedly")
+        self.__buffer.extend(chunk)
+
+    def __response(self, deadline: float) -> tuple[str, str]:
+        while b"\n" not in self.__buffer:
+            self.__fill(deadline)
+        header, _, rest = bytes(self.__buffer).partition(b"\n")
+        status, length = header.decode("utf-8").split(" ")
+        while len(rest) < int(length):
+            self.__buffer[:] = rest
+            self.__fill(deadline)
+            rest = bytes(self.__buffer)
+        self.__buffer[:] = rest[int(length) :]
+        return status, rest[: int(length)].decode("utf-8", errors="replace")
 
 
 async def check(args: checks.FunctionArguments) -> results.Results | None:
@@ -130,45 +204,16 @@ def _check_core_logic(
         return jar_error
 
     try:
-        # Create a temporary directory for extraction
-        # TODO: We could extract to somewhere in "state/" instead
-        with tempfile.TemporaryDirectory(prefix="rat_verify_") as temp_dir:
+        # The extraction is shared with other consumers, and must stay on the same filesystem as temp_dir
+        with (
+            archives.extract_cached(artifact_path, max_size=max_extract_size, chunk_size=chunk_size) as extracted,
+            tempfile.TemporaryDirectory(prefix="rat_verify_", dir=util.get_tmp_dir()) as temp_dir,
+        ):
             log.info(f"Created temporary directory: {temp_dir}")
-
-            # # Find and validate the root directory
-            # try:
-            #     root_dir = targz.root_directory(artifact_path)
-            # except targz.RootDirectoryError as e:
-            #     error_msg = str(e)
-            #     log.error(f"Archive root directory issue: {error_msg}")
-            #     return {
-            #         "valid": False,
-            #         "message": "No root directory found",
-            #         "total_files": 0,
-            #         "approved_licenses": 0,
-            #         "unapproved_licenses": 0,
-            #         "unknown_licenses": 0,
-            #         "unapproved_files": [],
-            #         "unknown_license_files": [],
-            #         "warning": error_msg or "No root directory found",
-            #         "errors": [],
-            #     }
-
-            # extract_dir = os.path.join(temp_dir, root_dir)
-
-            # Extract the archive to the temporary directory
-            log.info(f"Extracting {artifact_path} to {temp_dir}")
-            extracted_size, extracted_paths = archives.extract(
-                artifact_path,
-                temp_dir,
-                max_size=max_extract_size,
-                chunk_size=chunk_size,
-                track_files=_RAT_EXCLUDES_FILENAMES,
-            )
-            log.info(f"Extracted {extracted_size} bytes")
+            log.info(f"Using {extracted.size} bytes extracted from {artifact_path} at {extracted.path}")
 
             # Find the root directory
-            if (extract_dir := _extracted_dir(temp_dir)) is None:
+            if (extract_dir := _extracted_dir(extracted.path)) is None:
                 log.error("No root directory found in archive")
                 return {
                     "valid": False,
@@ -176,6 +221,14 @@ def _check_core_logic(
                     "errors": [],
                 }
 
+            extracted_paths = _extracted_paths_tracked(extracted.path, _RAT_EXCLUDES_FILENAMES)
+            if extracted_paths:
+                # Exclusions are applied by removing files, which must not affect the shared extraction
+                # Hard links are enough, because files are only ever removed
+                linked_dir = os.path.join(temp_dir, os.path.basename(extract_dir))
+                shutil.copytree(extract_dir, linked_dir, symlinks=True, copy_function=os.link)
+                extract_dir = linked_dir
+
             log.info(f"Using root directory: {extract_dir}")
 
             # Execute RAT and get results or error
@@ -235,11 +288,7 @@ def _check_core_logic_execute_rat(
     # TODO: From RAT 0.17, --exclude will become --input-exclude
     # TODO: Check whether --exclude NAME works on inner files
     # (Note that we presently use _rat_apply_exclusions to apply exclusions instead)
-    command = [
-        "java",
-        *_JAVA_MEMORY_ARGS,
-        "-jar",
-        rat_jar_path,
+    rat_args = [
         "--output-style",
         "xml",
         "--output-file",
@@ -251,90 +300,17 @@ def _check_core_logic_execute_rat(
         "LICENSE_NAMES:0",
         "STANDARDS:0",
         "--",
-        ".",
     ]
     if excluded_paths:
         _rat_apply_exclusions(extract_dir, excluded_paths, temp_dir)
-    log.info(f"Running Apache RAT: {' '.join(command)}")
-
-    # Change working directory to extract_dir when running the process
-    current_dir = os.getcwd()
-    os.chdir(extract_dir)
-
-    log.info(f"Executing Apache RAT from directory: {os.getcwd()}")
-
-    try:
-        # # First make sure we can run Java
-        # java_check = subprocess.run(["java", "-version"], capture_output=True, timeout=10)
-        # log.info(f"Java check completed with return code {java_check.returncode}")
-
-        # Run the actual RAT command
-        # We do check=False because we'll handle errors below
-        # The timeout is five minutes
-        process = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=300,
-        )
-
-        if process.returncode != 0:
-            log.error(f"Apache RAT failed with return code {process.returncode}")
-            log.error(f"STDOUT: {process.stdout}")
-            log.error(f"STDERR: {process.stderr}")
-            os.chdir(current_dir)
-            error_dict = {
-                "valid": False,
-                "message": f"Apache RAT process failed with code {process.returncode}",
-                "total_files": 0,
-                "approved_licenses": 0,
-                "unapproved_licenses": 0,
-                "unknown_licenses": 0,
-                "unapproved_files": [],
-                "unknown_license_files": [],
-                "errors": [
-                    f"Process error code: {process.returncode}",
-                    f"STDOUT: {process.stdout}",
-                    f"STDERR: {process.stderr}",
-                ],
-            }
-            return error_dict, None
-
-        log.info(f"Apache RAT completed successfully with return code {process.returncode}")
-        log.info(f"stdout: {process.stdout[:200]}...")
-    except subprocess.TimeoutExpired as e:
-        os.chdir(current_dir)
-        log.error(f"Apache RAT process timed out: {e}")
-        return {
-            "valid": False,
-            "message": "Apache RAT process timed out",
-            "total_files": 0,
-            "approved_licenses": 0,
-            "unapproved_licenses": 0,
-            "unknown_licenses": 0,
-            "unapproved_files": [],
-            "unknown_license_files": [],
-            "errors": [f"Timeout: {e}"],
-        }, None
-    except Exception as e:
-        # Change back to the original directory before raising
-        os.chdir(current_dir)
-        log.error(f"Exception running Apache RAT: {e}")
-        return {
-            "valid": False,
-            "message": f"Apache RAT process failed: {e}",
-            "total_files": 0,
-            "approved_licenses": 0,
-            "unapproved_licenses": 0,
-            "unknown_licenses": 0,
-            "unapproved_files": [],
-            "unknown_license_files": [],
-            "errors": [f"Process error: {e}"],
-        }, None
 
-    # Change back to the original directory
-    os.chdir(current_dir)
+    if os.path.isdir(_CONFIG.APACHE_RAT_SERVER_PATH):
+        # The server cannot change its working directory, so it is given the absolute path
+        error_result = _rat_server_execute(rat_jar_path, _CONFIG.APACHE_RAT_SERVER_PATH, [*rat_args, extract_dir])
+    else:
+        error_result = _rat_process_execute(rat_jar_path, rat_args, extract_dir)
+    if error_result is not None:
+        return error_result, None
 
     # Check that the output file exists
     if not os.path.exists(xml_output_path):
@@ -497,12 +473,16 @@ def _check_core_logic_parse_output_core(xml_file: str, base_dir: str) -> dict[st
 
 def _check_java_installed() -> dict[str, Any] | None:
     # Check that Java is installed
-    # TODO: Run this only once, when the server starts
+    # This only needs to succeed once per process
+    global _global_java_checked
+    if _global_java_checked:
+        return None
     try:
         java_version = subprocess.check_output(
             ["java", *_JAVA_MEMORY_ARGS, "-version"], stderr=subprocess.STDOUT, text=True
         )
         log.info(f"Java version: {java_version.splitlines()[0]}")
+        _global_java_checked = True
     except (subprocess.SubprocessError, FileNotFoundError) as e:
         log.error(f"Java is not properly installed or not in PATH: {e}")
 
@@ -556,6 +536,16 @@ def _extracted_dir(temp_dir: str) -> str | None:
     return extract_dir
 
 
+def _extracted_paths_tracked(extracted_dir: str, names: set[str]) -> list[str]:
+    """Return the paths, relative to the extraction, of the files with any of the given names."""
+    tracked = []
+    for root, _dirs, files in os.walk(extracted_dir):
+        for name in files:
+            if name in names:
+                tracked.append(os.path.relpath(os.path.join(root, name), extracted_dir))
+    return tracked
+
+
 def _rat_apply_exclusions(extract_dir: str, excluded_paths: list[str], temp_dir: str) -> None:
     """Apply exclusions to the extracted directory."""
     # Exclusions are difficult using the command line version of RAT
@@ -588,6 +578,135 @@ def _rat_apply_exclusions(extract_dir: str, excluded_paths: list[str], temp_dir:
                 os.remove(abs_path)
 
 
+def _rat_process_execute(rat_jar_path: str, rat_args: list[str], extract_dir: str) -> dict[str, Any] | None:
+    """Execute Apache RAT in a new JVM, returning an error result if it fails."""
+    command = ["java", *_JAVA_MEMORY_ARGS, "-jar", os.path.abspath(rat_jar_path), *rat_args, "."]
+    log.info(f"Running Apache RAT: {' '.join(command)}")
+
+    # Other tasks run concurrently in this process, so only the subprocess changes its working directory
+    log.info(f"Executing Apache RAT from directory: {extract_dir}")
+
+    try:
+        # # First make sure we can run Java
+        # java_check = subprocess.run(["java", "-version"], capture_output=True, timeout=10)
+        # log.info(f"Java check completed with return code {java_check.returncode}")
+
+        # Run the actual RAT command
+        # We do check=False because we'll handle errors below
+        # The timeout is five minutes
+        process = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=300,
+            cwd=extract_dir,
+        )
+
+        if process.returncode != 0:
+            log.error(f"Apache RAT failed with return code {process.returncode}")
+            log.error(f"STDOUT: {process.stdout}")
+            log.error(f"STDERR: {process.stderr}")
+            error_dict = {
+                "valid": False,
+                "message": f"Apache RAT process failed with code {process.returncode}",
+                "total_files": 0,
+                "approved_licenses": 0,
+                "unapproved_licenses": 0,
+                "unknown_licenses": 0,
+                "unapproved_files": [],
+                "unknown_license_files": [],
+                "errors": [
+                    f"Process error code: {process.returncode}",
+                    f"STDOUT: {process.stdout}",
+                    f"STDERR: {process.stderr}",
+                ],
+            }
+            return error_dict
+
+        log.info(f"Apache RAT completed successfully with return code {process.returncode}")
+        log.info(f"stdout: {process.stdout[:200]}...")
+    except subprocess.TimeoutExpired as e:
+        log.error(f"Apache RAT process timed out: {e}")
+        return {
+            "valid": False,
+            "message": "Apache RAT process timed out",
+            "total_files": 0,
+            "approved_licenses": 0,
+            "unapproved_licenses": 0,
+            "unknown_licenses": 0,
+            "unapproved_files": [],
+            "unknown_license_files": [],
+            "errors": [f"Timeout: {e}"],
+        }
+    except Exception as e:
+        log.error(f"Exception running Apache RAT: {e}")
+        return {
+            "valid": False,
+            "message": f"Apache RAT process failed: {e}",
+            "total_files": 0,
+            "approved_licenses": 0,
+            "unapproved_licenses": 0,
+            "unknown_licenses": 0,
+            "unapproved_files": [],
+            "unknown_license_files": [],
+            "errors": [f"Process error: {e}"],
+        }
+
+    return None
+
+
+def _rat_server_execute(rat_jar_path: str, server_path: str, rat_args: list[str]) -> dict[str, Any] | None:
+    """Execute Apache RAT in the persistent server, returning an error result if it fails."""
+    global _global_rat_server
+    with _global_rat_server_lock:
+        try:
+            server = _global_rat_server
+            if (server is None) or (not server.alive()) or (server.rat_jar_path != rat_jar_path):
+                if server is not None:
+                    server.close()
+                server = _RatServer(rat_jar_path, server_path)
+                _global_rat_server = server
+            log.info(f"Running Apache RAT in server: {' '.join(rat_args)}")
+            succeeded, output = server.run(rat_args, _RAT_TIMEOUT_SECONDS)
+        except Exception as e:
+            # The server may be in an unknown state, so it is replaced on the next request
+            log.error(f"Exception running Apache RAT server: {e}")
+            if _global_rat_server is not None:
+                _global_rat_server.close()
+                _global_rat_server = None
+            message = (
+                "Apache RAT process timed out" if isinstance(e, TimeoutError) else f"Apache RAT process failed: {e}"
+            )
+            return {
+                "valid": False,
+                "message": message,
+                "total_files": 0,
+                "approved_licenses": 0,
+                "unapproved_licenses": 0,
+                "unknown_licenses": 0,
+                "unapproved_files": [],
+                "unknown_license_files": [],
+                "errors": [f"Process error: {e}"],
+            }
+
+    if not succeeded:
+        log.error(f"Apache RAT failed in server: {output}")
+        return {
+            "valid": False,
+            "message": "Apache RAT process failed",
+            "total_files": 0,
+            "approved_licenses": 0,
+            "unapproved_licenses": 0,
+            "unknown_licenses": 0,
+            "unapproved_files": [],
+            "unknown_license_files": [],
+            "errors": [f"OUTPUT: {output}"],
+        }
+    log.info(f"Apache RAT completed successfully in server: {output[:200]}...")
+    return None
+
+
 def _summary_message(valid: bool, unapproved_licenses: int, unknown_licenses: int) -> str:
     message = "All files have approved licenses"
     if not valid:
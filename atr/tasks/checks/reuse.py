@@ -0,0 +1,187 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Reuse of check results across revisions whose check inputs are unchanged."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Final
+
+import aiofiles.os
+import sqlalchemy
+import sqlmodel
+
+import atr.models.sql as sql
+
+if TYPE_CHECKING:
+    import pathlib
+
+    import atr.db as db
+
+_LICENSE_HEADERS_IGNORE: Final = ".atr/license-headers-ignore"
+
+# The results of these check types are updated from those of the previous revision by the check itself
+_INCREMENTAL: Final = frozenset({sql.TaskType.PATHS_CHECK})
+
+# Only the results of these check types are eligible for reuse
+_REUSABLE: Final = frozenset(
+    {
+        sql.TaskType.ARCHIVE_SCAN,
+        sql.TaskType.HASHING_CHECK,
+        sql.TaskType.LICENSE_FILES,
+        sql.TaskType.LICENSE_HEADERS,
+        sql.TaskType.RAT_CHECK,
+        sql.TaskType.SIGNATURE_CHECK,
+        sql.TaskType.TARGZ_INTEGRITY,
+        sql.TaskType.TARGZ_STRUCTURE,
+        sql.TaskType.ZIPFORMAT_INTEGRITY,
+        sql.TaskType.ZIPFORMAT_STRUCTURE,
+    }
+)
+
+
+class Inputs:
+    """Compute the input hashes of the check tasks for a single revision."""
+
+    def __init__(self, data: db.Session, release: sql.Release, revision_path: pathlib.Path) -> None:
+        self.__data = data
+        self.__release = release
+        self.__revision_path = revision_path
+        self.__keys: list[tuple[str, str | None, str | None]] | None = None
+        self.__policy: dict[str, list[str]] | None = None
+
+    async def hash(self, task: sql.Task) -> str | None:
+        """Return the hash of everything that the results of a task depend on, or None if not reusable."""
+        # Importing this module runs git, so we only do so when it's needed
+        import atr.metadata as metadata
+
+        inputs: dict[str, Any] = {
+            "atr_commit": metadata.commit,
+            "release_name": self.__release.name,
+            "task_type": task.task_type.value,
+            "task_args": task.task_args,
+        }
+        if task.task_type in _INCREMENTAL:
+            # The files are compared by the check itself, using the diff from the previous revision
+            return _digest(inputs)
+        if (task.task_type not in _REUSABLE) or (task.primary_rel_path is None):
+            return None
+
+        inputs["primary_rel_path"] = task.primary_rel_path
+        inputs["files"] = [await self.__identity(task.primary_rel_path)]
+        inputs["policy"] = await self.__policy_inputs()
+        for dependency in _dependencies(task.task_type, task.primary_rel_path):
+            inputs["files"].append(await self.__identity(dependency))
+        if task.task_type == sql.TaskType.SIGNATURE_CHECK:
+            inputs["keys"] = await self.__keys_inputs()
+
+        return _digest(inputs)
+
+    async def __identity(self, rel_path: str) -> list[Any]:
+        # Hard linked files share an inode, so an unchanged file keeps its identity across revisions
+        try:
+            stat = await aiofiles.os.stat(self.__revision_path / rel_path)
+        except FileNotFoundError:
+            return [rel_path, None]
+        return [rel_path, stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    async def __keys_inputs(self) -> list[tuple[str, str | None, str | None]]:
+        if self.__keys is not None:
+            return self.__keys
+        committee_name = self.__release.committee.name if self.__release.committee else None
+        statement = (
+            sqlmodel.select(
+                sql.validate_instrumented_attribute(sql.PublicSigningKey.fingerprint),
+                sql.validate_instrumented_attribute(sql.PublicSigningKey.apache_uid),
+                sql.validate_instrumented_attribute(sql.PublicSigningKey.primary_declared_uid),
+            )
+            .join(sql.KeyLink)
+            .where(sql.validate_instrumented_attribute(sql.KeyLink.committee_name) == committee_name)
+        )
+        result = await self.__data.execute(statement)
+        self.__keys = sorted((row[0], row[1], row[2]) for row in result.all())
+        return self.__keys
+
+    async def __policy_inputs(self) -> dict[str, list[str]]:
+        if self.__policy is not None:
+            return self.__policy
+        project = await self.__data.project(name=self.__release.project_name, _release_policy=True).get()
+        self.__policy = {
+            "binary_artifact_paths": project.policy_binary_artifact_paths if project else [],
+            "source_artifact_paths": project.policy_source_artifact_paths if project else [],
+        }
+        return self.__policy
+
+
+async def results_copy(data: db.Session, task: sql.Task) -> int:
+    """Copy the check results of a completed task with the same inputs to the revision of this task."""
+    if (task.inputs_hash is None) or (task.revision_number is None):
+        return 0
+
+    via = sql.validate_instrumented_attribute
+    source_query = (
+        sqlmodel.select(sql.Task.project_name, sql.Task.version_name, sql.Task.revision_number)
+        .where(
+            via(sql.Task.inputs_hash) == task.inputs_hash,
+            via(sql.Task.status) == sql.TaskStatus.COMPLETED,
+        )
+        .order_by(via(sql.Task.id).desc())
+        .limit(1)
+    )
+    source = (await data.execute(source_query)).first()
+    if source is None:
+        return 0
+    source_project_name, source_version_name, source_revision_number = source
+    if (source_project_name is None) or (source_version_name is None):
+        return 0
+    if source_revision_number == task.revision_number:
+        return 0
+
+    # Copy the rows in a single statement, so that no result data passes through Python
+    columns = ["checker", "primary_rel_path", "member_rel_path", "created", "status", "message", "data", "inputs_hash"]
+    rows = sqlmodel.select(
+        sqlalchemy.literal(sql.release_name(source_project_name, source_version_name)).label("release_name"),
+        sqlalchemy.literal(task.revision_number).label("revision_number"),
+        *[via(getattr(sql.CheckResult, column)) for column in columns],
+    ).where(
+        via(sql.CheckResult.release_name) == sql.release_name(source_project_name, source_version_name),
+        via(sql.CheckResult.revision_number) == source_revision_number,
+        via(sql.CheckResult.inputs_hash) == task.inputs_hash,
+    )
+    statement = sqlalchemy.insert(sql.CheckResult).from_select(["release_name", "revision_number", *columns], rows)
+    result = await data.execute(statement)
+    # Avoid a type error with result.rowcount
+    rowcount: int = getattr(result, "rowcount", 0)
+    return rowcount
+
+
+def _dependencies(task_type: sql.TaskType, primary_rel_path: str) -> list[str]:
+    """Return the paths of the files, other than the primary path, on which the results of a check depend."""
+    match task_type:
+        case sql.TaskType.HASHING_CHECK | sql.TaskType.SIGNATURE_CHECK:
+            # The artifact covered by the checksum or signature file
+            return [primary_rel_path.rsplit(".", 1)[0]]
+        case sql.TaskType.ARCHIVE_SCAN | sql.TaskType.LICENSE_HEADERS:
+            return [_LICENSE_HEADERS_IGNORE]
+    return []
+
+
+def _digest(inputs: dict[str, Any]) -> str:
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,92 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import os.path
+from collections.abc import Callable
+from typing import Any, Protocol
+
+import atr.log as log
+import atr.models.results as results
+import atr.tarzip as tarzip
+import atr.tasks.checks as checks
+import atr.tasks.checks.license as license
+import atr.tasks.checks.targz as targz
+import atr.tasks.checks.zipformat as zipformat
+
+
+class Visitor(tarzip.MemberVisitor, Protocol):
+    async def record(self, recorder: checks.Recorder) -> None: ...
+
+
+async def archive(args: checks.FunctionArguments) -> results.Results | None:
+    """Run all of the per archive checks in a single pass over the archive members."""
+    if args.primary_rel_path is None:
+        return None
+
+    is_tar = args.primary_rel_path.endswith((".tar.gz", ".tgz"))
+    integrity = targz.integrity if is_tar else zipformat.integrity
+    recorder = await _recorder(args, integrity)
+    if not (artifact_abs_path := await recorder.abs_path()):
+        return None
+
+    # Each visitor records under the checker key of its standalone task
+    # Integrity is checked for all archives, but the others skip binary artifacts
+    visitors: list[tuple[Visitor, checks.Recorder]] = [(_integrity_visitor(is_tar), recorder)]
+    if not await recorder.primary_path_is_binary():
+        visitors.extend(await _source_visitors(args, str(artifact_abs_path), is_tar))
+
+    log.info(f"Scanning {artifact_abs_path} with {len(visitors)} visitors (rel: {args.primary_rel_path})")
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor for visitor, _recorder in visitors])
+    for visitor, visitor_recorder in visitors:
+        await visitor.record(visitor_recorder)
+    return None
+
+
+def _integrity_visitor(is_tar: bool) -> Visitor:
+    if is_tar:
+        return targz.IntegrityVisitor()
+    return zipformat.IntegrityVisitor()
+
+
+async def _recorder(args: checks.FunctionArguments, checker: Callable[..., Any]) -> checks.Recorder:
+    return await checks.Recorder.create(
+        checker=checker,
+        project_name=args.project_name,
+        version_name=args.version_name,
+        revision_number=args.revision_number,
+        primary_rel_path=args.primary_rel_path,
+        afresh=True,
+        inputs_hash=args.inputs_hash,
+    )
+
+
+async def _source_visitors(
+    args: checks.FunctionArguments, artifact_abs_path: str, is_tar: bool
+) -> list[tuple[Visitor, checks.Recorder]]:
+    is_podling = args.extra_args.get("is_podling", False)
+    ignore_lines = await license.headers_ignore_lines(args)
+    structure: Visitor
+    if is_tar:
+        structure = targz.StructureVisitor(os.path.basename(artifact_abs_path))
+    else:
+        structure = zipformat.StructureVisitor(artifact_abs_path)
+    return [
+        (license.FilesVisitor(is_podling), await _recorder(args, license.files)),
+        (license.HeadersVisitor(artifact_abs_path, ignore_lines), await _recorder(args, license.headers)),
+        (structure, await _recorder(args, targz.structure if is_tar else zipformat.structure)),
+    ]
@@ -16,6 +16,11 @@
 # under the License.
 
 import asyncio
+import fcntl
+import hashlib
+import os
+import pathlib
+import shutil
 import tempfile
 import time
 from typing import Any, Final
@@ -30,6 +35,9 @@ import atr.models.sql as sql
 import atr.tasks.checks as checks
 import atr.util as util
 
+# Superseded keyrings are kept for this long, because other workers may still be verifying against them
+_KEYRING_GRACE_SECONDS: Final = 60 * 60
+
 
 async def check(args: checks.FunctionArguments) -> results.Results | None:
     """Check a signature file."""
@@ -113,31 +121,24 @@ async def _check_core_logic(committee_name: str, artifact_path: str, signature_p
         _check_core_logic_verify_signature,
         signature_path=signature_path,
         artifact_path=artifact_path,
+        committee_name=committee_name,
         ascii_armored_keys=public_keys,
         apache_uid_map=apache_uid_map,
     )
 
 
 def _check_core_logic_verify_signature(
-    signature_path: str, artifact_path: str, ascii_armored_keys: list[str], apache_uid_map: dict[str, bool]
+    signature_path: str,
+    artifact_path: str,
+    committee_name: str,
+    ascii_armored_keys: list[str],
+    apache_uid_map: dict[str, bool],
 ) -> dict[str, Any]:
     """Verify an OpenPGP signature for a file."""
-    with tempfile.TemporaryDirectory(prefix="gpg-") as gpg_dir, open(signature_path, "rb") as sig_file:
-        gpg: Final[gnupg.GPG] = gnupg.GPG(gnupghome=gpg_dir)
-
-        # Import all PMC public signing keys
-        start = time.perf_counter_ns()
-        # for key in ascii_armored_keys:
-        #     import_result = gpg.import_keys(key)
-        #     if not import_result.fingerprints:
-        #         # TODO: Log warning about invalid key?
-        #         continue
-        # TODO: Will this fail if one key doesn't work?
-        import_result = gpg.import_keys("\n\n".join(ascii_armored_keys))
-        if not import_result.fingerprints:
-            log.warning("No fingerprints found after importing keys")
-        end = time.perf_counter_ns()
-        log.info(f"Import {len(ascii_armored_keys)} keys took {(end - start) / 1000000} ms")
+    keyring_dir = _keyring(committee_name, ascii_armored_keys)
+    with open(signature_path, "rb") as sig_file:
+        # The keyring is shared, so verification must not try to update its trust database
+        gpg: Final[gnupg.GPG] = gnupg.GPG(gnupghome=str(keyring_dir), options=["--no-auto-check-trustdb"])
         verified = gpg.verify_file(sig_file, str(artifact_path))
 
     key_fp = verified.pubkey_fingerprint.lower() if verified.pubkey_fingerprint else None
@@ -180,3 +181,83 @@ def _check_core_logic_verify_signature(
         "status": "Valid signature",
         "debug_info": debug_info,
     }
+
+
+def _keyring(committee_name: str, ascii_armored_keys: list[str]) -> pathlib.Path:
+    """Return the GnuPG home of the committee keyring, building it if the keys have changed."""
+    # Keys can gain subkeys without changing their fingerprint, so we digest the key material too
+    digest = hashlib.sha256()
+    for key in sorted(ascii_armored_keys):
+        digest.update(hashlib.sha256(key.encode("utf-8")).digest())
+    keyrings_dir = util.get_cache_dir() / "keyrings"
+    committee_dir = keyrings_dir / committee_name
+    keyring_dir = committee_dir / digest.hexdigest()
+    if keyring_dir.is_dir() and (not _keyring_superseded_path(keyring_dir).exists()):
+        return keyring_dir
+
+    committee_dir.mkdir(parents=True, exist_ok=True)
+    # The lock file serialises builds and pruning between all of the threads of all of the workers
+    with open(keyrings_dir / f"{committee_name}.lock", "ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # A keyring which was superseded may be current again, so it must not be pruned
+        _keyring_superseded_path(keyring_dir).unlink(missing_ok=True)
+        # Another worker may have built the keyring while we waited for the lock
+        if keyring_dir.is_dir():
+            return keyring_dir
+        build_dir = pathlib.Path(tempfile.mkdtemp(prefix="tmp-", dir=committee_dir))
+        try:
+            _keyring_build(build_dir, ascii_armored_keys)
+            # Publish atomically, so that workers which do not take the lock never see a partial keyring
+            os.rename(build_dir, keyring_dir)
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        _keyring_prune(committee_dir, keyring_dir)
+    return keyring_dir
+
+
+def _keyring_build(gpg_dir: pathlib.Path, ascii_armored_keys: list[str]) -> None:
+    gpg: Final[gnupg.GPG] = gnupg.GPG(gnupghome=str(gpg_dir))
+
+    # Import all PMC public signing keys
+    start = time.perf_counter_ns()
+    import_result = gpg.import_keys("\n\n".join(ascii_armored_keys))
+    # An empty keyring must never be published, because it would be used until the keys change
+    # Whereas keys which gpg rejects, such as those with unsupported algorithms, would be rejected again
+    if ascii_armored_keys and (not import_result.fingerprints):
+        raise RuntimeError(f"Imported none of {len(ascii_armored_keys)} keys into {gpg_dir}: {import_result.stderr}")
+    if len(import_result.fingerprints) < len(ascii_armored_keys):
+        log.warning(
+            f"Imported {len(import_result.fingerprints)} of {len(ascii_armored_keys)} keys into {gpg_dir},"
+            f" skipping those which were rejected: {import_result.stderr}"
+        )
+    end = time.perf_counter_ns()
+    log.info(f"Import {len(ascii_armored_keys)} keys into {gpg_dir} took {(end - start) / 1000000} ms")
+
+
+def _keyring_prune(committee_dir: pathlib.Path, keyring_dir: pathlib.Path) -> None:
+    """Remove the keyrings of a committee which were superseded more than the grace period ago.
+
+    The caller must hold the lock of the committee.
+    """
+    for entry in committee_dir.iterdir():
+        if entry.name.startswith("tmp-"):
+            # Builds only happen under the lock, so this is left over from a worker which failed
+            shutil.rmtree(entry, ignore_errors=True)
+            continue
+        if (entry == keyring_dir) or (not entry.is_dir()):
+            continue
+        superseded_path = _keyring_superseded_path(entry)
+        try:
+            superseded = superseded_path.stat().st_mtime
+        except FileNotFoundError:
+            # Record when the keyring was superseded, and remove it after the grace period
+            superseded_path.touch()
+            continue
+        if (time.time() - superseded) > _KEYRING_GRACE_SECONDS:
+            shutil.rmtree(entry, ignore_errors=True)
+            superseded_path.unlink(missing_ok=True)
+
+
+def _keyring_superseded_path(keyring_dir: pathlib.Path) -> pathlib.Path:
+    return keyring_dir.with_name(f"{keyring_dir.name}.superseded")
@@ -17,11 +17,10 @@
 
 import asyncio
 import tarfile
-from typing import Final
 
-import atr.archives as archives
 import atr.log as log
 import atr.models.results as results
+import atr.tarzip as tarzip
 import atr.tasks.checks as checks
 
 
@@ -31,6 +30,78 @@ class RootDirectoryError(Exception):
     ...
 
 
+class IntegrityVisitor:
+    """Read every member of a .tar.gz file to the end, summing member sizes."""
+
+    drain = True
+
+    def __init__(self) -> None:
+        self.error: Exception | None = None
+        self.size = 0
+
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        if self.error is not None:
+            await recorder.failure(
+                "Unable to read all entries of the archive using tarfile", {"error": str(self.error)}
+            )
+            return
+        await recorder.success("Able to read all entries of the archive using tarfile", {"size": self.size})
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        self.size += member.size
+
+
+class StructureVisitor:
+    """Find the root directory of a .tar.gz file and compare it to the artifact name."""
+
+    drain = False
+
+    def __init__(self, filename: str) -> None:
+        self.expected_root = (
+            filename.removesuffix(".tar.gz") if filename.endswith(".tar.gz") else filename.removesuffix(".tgz")
+        )
+        self.error: Exception | None = None
+        self.root: str | None = None
+
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        if (self.error is None) and (not self.root):
+            self.error = RootDirectoryError("No root directory found in archive")
+        if isinstance(self.error, RootDirectoryError):
+            await recorder.warning("Could not get the root directory of the archive", {"error": str(self.error)})
+            return
+        if self.error is not None:
+            await recorder.failure("Unable to verify archive structure", {"error": str(self.error)})
+            return
+
+        if self.root == self.expected_root:
+            await recorder.success(
+                "Archive contains exactly one root directory matching the expected name",
+                {"root": self.root, "expected": self.expected_root},
+            )
+        else:
+            await recorder.warning(
+                f"Root directory '{self.root}' does not match expected name '{self.expected_root}'",
+                {"root": self.root, "expected": self.expected_root},
+            )
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        self.root = _root_update(self.root, member.name)
+
+
 async def integrity(args: checks.FunctionArguments) -> results.Results | None:
     """Check the integrity of a .tar.gz file."""
     recorder = await args.recorder()
@@ -39,12 +110,9 @@ async def integrity(args: checks.FunctionArguments) -> results.Results | None:
 
     log.info(f"Checking integrity for {artifact_abs_path} (rel: {args.primary_rel_path})")
 
-    chunk_size = 4096
-    try:
-        size = await asyncio.to_thread(archives.total_size, str(artifact_abs_path), chunk_size)
-        await recorder.success("Able to read all entries of the archive using tarfile", {"size": size})
-    except Exception as e:
-        await recorder.failure("Unable to read all entries of the archive using tarfile", {"error": str(e)})
+    visitor = IntegrityVisitor()
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
     return None
 
 
@@ -54,16 +122,7 @@ def root_directory(tgz_path: str) -> str:
 
     with tarfile.open(tgz_path, mode="r|gz") as tf:
         for member in tf:
-            if member.name and member.name.split("/")[-1].startswith("._"):
-                # Metadata convention
-                continue
-
-            parts = member.name.split("/", 1)
-            if len(parts) >= 1:
-                if not root:
-                    root = parts[0]
-                elif parts[0] != root:
-                    raise RootDirectoryError(f"Multiple root directories found: {root}, {parts[0]}")
+            root = _root_update(root, member.name)
 
     if not root:
         raise RootDirectoryError("No root directory found in archive")
@@ -79,28 +138,26 @@ async def structure(args: checks.FunctionArguments) -> results.Results | None:
     if await recorder.primary_path_is_binary():
         return None
 
-    filename = artifact_abs_path.name
-    expected_root: Final[str] = (
-        filename.removesuffix(".tar.gz") if filename.endswith(".tar.gz") else filename.removesuffix(".tgz")
-    )
+    visitor = StructureVisitor(artifact_abs_path.name)
     log.info(
-        f"Checking structure for {artifact_abs_path} (expected root: {expected_root}) (rel: {args.primary_rel_path})"
+        f"Checking structure for {artifact_abs_path} (expected root: {visitor.expected_root})"
+        f" (rel: {args.primary_rel_path})"
     )
 
-    try:
-        root = await asyncio.to_thread(root_directory, str(artifact_abs_path))
-        if root == expected_root:
-            await recorder.success(
-                "Archive contains exactly one root directory matching the expected name",
-                {"root": root, "expected": expected_root},
-            )
-        else:
-            await recorder.warning(
-                f"Root directory '{root}' does not match expected name '{expected_root}'",
-                {"root": root, "expected": expected_root},
-            )
-    except RootDirectoryError as e:
-        await recorder.warning("Could not get the root directory of the archive", {"error": str(e)})
-    except Exception as e:
-        await recorder.failure("Unable to verify archive structure", {"error": str(e)})
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
     return None
+
+
+def _root_update(root: str | None, member_name: str) -> str | None:
+    """Update the root directory found so far with another member name."""
+    if member_name and member_name.split("/")[-1].startswith("._"):
+        # Metadata convention
+        return root
+
+    parts = member_name.split("/", 1)
+    if not root:
+        return parts[0]
+    if parts[0] != root:
+        raise RootDirectoryError(f"Multiple root directories found: {root}, {parts[0]}")
+    return root
@@ -22,9 +22,102 @@ from typing import Any
 
 import atr.log as log
 import atr.models.results as results
+import atr.tarzip as tarzip
 import atr.tasks.checks as checks
 
 
+class IntegrityVisitor:
+    """Verify that a zip file can be opened and its members listed."""
+
+    drain = False
+
+    def __init__(self) -> None:
+        self.error: Exception | None = None
+        self.member_count = 0
+
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        # This is a simple check using list members
+        # We could read every member for CRC checks if needed, though this will be slower
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        if self.error is not None:
+            result_data = _error_data(self.error)
+            await recorder.failure(result_data["error"], result_data)
+            return
+        result_data = {"member_count": self.member_count}
+        await recorder.success(f"Zip archive integrity OK ({self.member_count} members)", result_data)
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        self.member_count += 1
+
+
+class StructureVisitor:
+    """Verify that a zip file has a single root directory matching the artifact name."""
+
+    drain = False
+
+    def __init__(self, artifact_path: str) -> None:
+        base_name = os.path.basename(artifact_path)
+        name_part = base_name.removesuffix(".zip")
+        # # TODO: Airavata has e.g. "-source-release"
+        # # It would be useful if there were a function in analysis.py for stripping these
+        # # But the root directory should probably always match the name of the file sans suffix
+        # # (This would also be easier to implement)
+        # if name_part.endswith(("-src", "-bin", "-dist")):
+        #     name_part = "-".join(name_part.split("-")[:-1])
+        self.expected_root = name_part
+        self.error: Exception | None = None
+        self.members: list[str] = []
+        self.non_rooted_files: list[str] = []
+        self.root_dirs: set[str] = set()
+
+    def fail(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def prefix(self, member: tarzip.Member) -> int:
+        return 0
+
+    async def record(self, recorder: checks.Recorder) -> None:
+        result_data = self.result_data()
+        if result_data.get("warning"):
+            await recorder.warning(result_data["warning"], result_data)
+        elif result_data.get("error"):
+            await recorder.failure(result_data["error"], result_data)
+        else:
+            await recorder.success(f"Zip structure OK (root: {result_data['root_dir']})", result_data)
+
+    def result_data(self) -> dict[str, Any]:
+        if self.error is not None:
+            return _error_data(self.error)
+        if not self.members:
+            return {"error": "Archive is empty"}
+
+        actual_root, error_msg = _structure_check_core_logic_validate_root(
+            self.members, self.root_dirs, self.non_rooted_files, self.expected_root
+        )
+        if error_msg:
+            if error_msg.startswith("Root directory mismatch"):
+                return {"warning": error_msg}
+            else:
+                return {"error": error_msg}
+        if actual_root:
+            return {"root_dir": actual_root}
+        return {"error": "Unknown structure validation error"}
+
+    def visit(self, member: tarzip.Member, content: bytes | None) -> None:
+        self.members.append(member.name)
+        if "/" in member.name:
+            self.root_dirs.add(member.name.split("/", 1)[0])
+        elif not member.isdir():
+            self.non_rooted_files.append(member.name)
+
+
 async def integrity(args: checks.FunctionArguments) -> results.Results | None:
     """Check that the zip archive is not corrupted and can be opened."""
     recorder = await args.recorder()
@@ -33,15 +126,9 @@ async def integrity(args: checks.FunctionArguments) -> results.Results | None:
 
     log.info(f"Checking zip integrity for {artifact_abs_path} (rel: {args.primary_rel_path})")
 
-    try:
-        result_data = await asyncio.to_thread(_integrity_check_core_logic, str(artifact_abs_path))
-        if result_data.get("error"):
-            await recorder.failure(result_data["error"], result_data)
-        else:
-            await recorder.success(f"Zip archive integrity OK ({result_data['member_count']} members)", result_data)
-    except Exception as e:
-        await recorder.failure("Error checking zip integrity", {"error": str(e)})
-
+    visitor = IntegrityVisitor()
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
     return None
 
 
@@ -55,87 +142,20 @@ async def structure(args: checks.FunctionArguments) -> results.Results | None:
 
     log.info(f"Checking zip structure for {artifact_abs_path} (rel: {args.primary_rel_path})")
 
-    try:
-        result_data = await asyncio.to_thread(_structure_check_core_logic, str(artifact_abs_path))
-
-        if result_data.get("warning"):
-            await recorder.warning(result_data["warning"], result_data)
-        elif result_data.get("error"):
-            await recorder.failure(result_data["error"], result_data)
-        else:
-            await recorder.success(f"Zip structure OK (root: {result_data['root_dir']})", result_data)
-    except Exception as e:
-        await recorder.failure("Error checking zip structure", {"error": str(e)})
-
+    visitor = StructureVisitor(str(artifact_abs_path))
+    await asyncio.to_thread(tarzip.scan, str(artifact_abs_path), [visitor])
+    await visitor.record(recorder)
     return None
 
 
-def _integrity_check_core_logic(artifact_path: str) -> dict[str, Any]:
-    """Verify that a zip file can be opened and its members listed."""
-    try:
-        with zipfile.ZipFile(artifact_path, "r") as zf:
-            # This is a simple check using list members
-            # We can use zf.testzip() for CRC checks if needed, though this will be slower
-            member_list = zf.namelist()
-            return {"member_count": len(member_list)}
-    except zipfile.BadZipFile as e:
-        return {"error": f"Bad zip file: {e}"}
-    except FileNotFoundError:
-        return {"error": "File not found"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {e}"}
-
-
-def _structure_check_core_logic(artifact_path: str) -> dict[str, Any]:
-    """Verify the internal structure of the zip archive."""
-    try:
-        with zipfile.ZipFile(artifact_path, "r") as zf:
-            members = zf.namelist()
-            if not members:
-                return {"error": "Archive is empty"}
-
-            base_name = os.path.basename(artifact_path)
-            name_part = base_name.removesuffix(".zip")
-            # # TODO: Airavata has e.g. "-source-release"
-            # # It would be useful if there were a function in analysis.py for stripping these
-            # # But the root directory should probably always match the name of the file sans suffix
-            # # (This would also be easier to implement)
-            # if name_part.endswith(("-src", "-bin", "-dist")):
-            #     name_part = "-".join(name_part.split("-")[:-1])
-            expected_root = name_part
-
-            root_dirs, non_rooted_files = _structure_check_core_logic_find_roots(zf, members)
-            actual_root, error_msg = _structure_check_core_logic_validate_root(
-                members, root_dirs, non_rooted_files, expected_root
-            )
-
-            if error_msg:
-                if error_msg.startswith("Root directory mismatch"):
-                    return {"warning": error_msg}
-                else:
-                    return {"error": error_msg}
-            if actual_root:
-                return {"root_dir": actual_root}
-            return {"error": "Unknown structure validation error"}
-
-    except zipfile.BadZipFile as e:
-        return {"error": f"Bad zip file: {e}"}
-    except FileNotFoundError:
-        return {"error": "File not found"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {e}"}
-
-
-def _structure_check_core_logic_find_roots(zf: zipfile.ZipFile, members: list[str]) -> tuple[set[str], list[str]]:
-    """Identify root directories and non-rooted files in a zip archive."""
-    root_dirs: set[str] = set()
-    non_rooted_files: list[str] = []
-    for member in members:
-        if "/" in member:
-            root_dirs.add(member.split("/", 1)[0])
-        elif not zipfile.Path(zf, member).is_dir():
-            non_rooted_files.append(member)
-    return root_dirs, non_rooted_files
+def _error_data(error: Exception) -> dict[str, Any]:
+    match error:
+        case zipfile.BadZipFile():
+            return {"error": f"Bad zip file: {error}"}
+        case FileNotFoundError():
+            return {"error": "File not found"}
+        case _:
+            return {"error": f"Unexpected error: {error}"}
 
 
 def _structure_check_core_logic_validate_root(
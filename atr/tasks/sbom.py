@@ -27,6 +27,7 @@ import yyjson
 
 import atr.archives as archives
 import atr.config as config
+import atr.fetch as fetch
 import atr.log as log
 import atr.models.results as results
 import atr.models.schema as schema
@@ -86,7 +87,7 @@ async def augment(args: FileArgs) -> results.Results | None:
         raise SBOMScoringError("SBOM file does not exist", {"file_path": args.file_path})
     # Read from the old revision
     bundle = sbom.utilities.path_to_bundle(pathlib.Path(full_path))
-    patch_ops = await sbom.utilities.bundle_to_patch(bundle)
+    patch_ops = await sbom.utilities.bundle_to_patch(bundle, fetch.session())
     new_full_path: str | None = None
     if patch_ops:
         patch_data = sbom.utilities.patch_to_data(patch_ops)
@@ -140,7 +141,7 @@ async def osv_scan(args: FileArgs) -> results.Results | None:
     if not (full_path.endswith(".cdx.json") and os.path.isfile(full_path)):
         raise SBOMScanningError("SBOM file does not exist", {"file_path": args.file_path})
     bundle = sbom.utilities.path_to_bundle(pathlib.Path(full_path))
-    vulnerabilities, ignored_count = await sbom.osv.scan_bundle(bundle)
+    vulnerabilities, ignored_count = await sbom.osv.scan_bundle(bundle, fetch.session())
     components = [results.OSVComponent(purl=v.purl, vulnerabilities=v.vulnerabilities) for v in vulnerabilities]
     return results.SBOMOSVScan(
         kind="sbom_osv_scan",
@@ -218,8 +219,16 @@ async def _generate_cyclonedx_core(artifact_path: str, output_path: str) -> dict
     log.info(f"Generating CycloneDX SBOM for {artifact_path} -> {output_path}")
 
     # TODO: Should create a new revision here rather than in the caller
-    async with util.async_temporary_directory(prefix="cyclonedx_sbom_") as temp_dir:
-        log.info(f"Created temporary directory: {temp_dir}")
+    # The extraction is shared with other consumers such as RAT, so syft must not modify it
+    log.info(f"Extracting {artifact_path}")
+    extracted = await asyncio.to_thread(
+        archives.extract_cached,
+        artifact_path,
+        max_size=_CONFIG.MAX_EXTRACT_SIZE,
+        chunk_size=_CONFIG.EXTRACT_CHUNK_SIZE,
+    )
+    with extracted:
+        log.info(f"Using {extracted.size} bytes extracted at {extracted.path}")
 
         # Find and validate the root directory
         try:
@@ -231,19 +240,7 @@ async def _generate_cyclonedx_core(artifact_path: str, output_path: str) -> dict
                 f"Failed to determine archive root directory: {e}", {"artifact_path": artifact_path}
             ) from e
 
-        extract_dir = os.path.join(temp_dir, root_dir)
-
-        # Extract the archive to the temporary directory
-        # TODO: Ideally we'd have task dependencies or archive caching
-        log.info(f"Extracting {artifact_path} to {temp_dir}")
-        extracted_size, _extracted_paths = await asyncio.to_thread(
-            archives.extract,
-            artifact_path,
-            str(temp_dir),
-            max_size=_CONFIG.MAX_EXTRACT_SIZE,
-            chunk_size=_CONFIG.EXTRACT_CHUNK_SIZE,
-        )
-        log.info(f"Extracted {extracted_size} bytes into {extract_dir}")
+        extract_dir = os.path.join(extracted.path, root_dir)
 
         # Run syft to generate the CycloneDX SBOM
         syft_command = ["syft", extract_dir, "-o", "cyclonedx-json"]
@@ -0,0 +1,378 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Resumable uploads of release files, which are staged on disk and hashed as they are written."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import os
+import pathlib
+import re
+import secrets
+import shutil
+import time
+from typing import IO, TYPE_CHECKING, Final
+
+import pydantic
+
+import atr.digests as digests
+import atr.log as log
+import atr.models.uploads as models
+import atr.util as util
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Mapping
+
+# Chunks of a request body are written and hashed in batches of this size
+_BATCH_SIZE: Final = 1024 * 1024
+_CONTENT: Final = "content"
+# Uploads which have not been written to for this long are abandoned
+_EXPIRY_SECONDS: Final = 24 * 60 * 60
+_METADATA: Final = "upload.json"
+_IDENTIFIER: Final = re.compile(r"^[0-9a-f]{32}$")
+
+# The digests of the uploads which this process has been writing, up to their current offsets
+_global_hashers: dict[str, digests.Hasher] = {}
+
+
+class UploadError(RuntimeError):
+    """An upload request which cannot be fulfilled."""
+
+
+class OffsetError(UploadError):
+    """A chunk which does not start at the current end of its upload."""
+
+    def __init__(self, offset: int) -> None:
+        super().__init__(f"The upload is at offset {offset}")
+        self.offset = offset
+
+
+async def append(upload: models.Upload, offset: int, chunks: AsyncIterable[bytes]) -> int:
+    """Append chunks to an upload at the given offset, and return the new offset of the upload."""
+    f = await asyncio.to_thread(_content_open, upload.upload_id, offset)
+    try:
+        hasher = _global_hashers.pop(upload.upload_id, None)
+        if (hasher is None) or (hasher.size != offset):
+            # Another process wrote the start of this upload, or this process was restarted
+            hasher = await asyncio.to_thread(_hash_prefix, f, offset)
+        batch = bytearray()
+        writing: asyncio.Future[None] | None = None
+        try:
+            async for chunk in chunks:
+                batch.extend(chunk)
+                if len(batch) >= _BATCH_SIZE:
+                    # Swap in a new batch first, so that bytes which were submitted are never written again below
+                    submitted, batch = bytes(batch), bytearray()
+                    writing = asyncio.ensure_future(asyncio.to_thread(_write, f, hasher, submitted))
+                    # A cancelled request cannot stop the thread, so the write is shielded and awaited below
+                    await asyncio.shield(writing)
+        finally:
+            if (writing is not None) and (not writing.done()):
+                await asyncio.wait([writing])
+            # Keep whatever was received before an interruption, so that the client can resume after it
+            if (writing is None) or (writing.exception() is None):
+                await asyncio.to_thread(_write, f, hasher, bytes(batch))
+            _global_hashers[upload.upload_id] = hasher
+        return hasher.size
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def create(
+    asf_uid: str, project_name: str, version_name: str, rel_path: str, session: models.Session | None = None
+) -> models.Upload:
+    """Start a new upload of a file to a release, optionally as part of a session."""
+    await asyncio.to_thread(_prune)
+    upload = models.Upload(
+        upload_id=secrets.token_hex(16),
+        asf_uid=asf_uid,
+        project_name=project_name,
+        version_name=version_name,
+        rel_path=rel_path_validate(rel_path),
+        created=int(time.time()),
+        session_id=None if (session is None) else session.session_id,
+    )
+    if session is not None:
+        if any((other.rel_path == upload.rel_path) for other in await session_uploads(session)):
+            raise UploadError(f"{upload.rel_path} is already being uploaded in this session")
+        await asyncio.to_thread(_session_add, session, upload)
+    await asyncio.to_thread(_create, upload)
+    log.info(f"Started upload {upload.upload_id} of {upload.rel_path} to {project_name} {version_name}")
+    return upload
+
+
+async def discard(upload: models.Upload) -> None:
+    """Delete an upload and everything written to it."""
+    _global_hashers.pop(upload.upload_id, None)
+    await asyncio.to_thread(shutil.rmtree, _directory(upload.upload_id), True)
+    if upload.session_id is not None:
+        await asyncio.to_thread((_session_directory(upload.session_id) / upload.upload_id).unlink, True)
+
+
+async def finish(upload: models.Upload, interim_path: pathlib.Path, sha256: str | None = None) -> None:
+    """Move a complete upload into an interim revision directory, recording its digests."""
+    if upload.session_id is not None:
+        raise UploadError("The upload is part of a session, which must be committed instead")
+    await _finish([upload], interim_path, {upload.rel_path: sha256} if sha256 else {})
+
+
+async def offset(upload: models.Upload) -> int:
+    """Return the number of bytes written to an upload, which is where the next chunk must start."""
+    st = await asyncio.to_thread(os.stat, _directory(upload.upload_id) / _CONTENT)
+    return st.st_size
+
+
+async def read(upload_id: str, asf_uid: str) -> models.Upload:
+    """Return an upload started by the given user."""
+    upload = await _metadata_read(_directory(upload_id), upload_id, models.Upload, "Upload not found")
+    # Other users can not tell whether an upload exists
+    if upload.asf_uid != asf_uid:
+        raise UploadError("Upload not found")
+    return upload
+
+
+async def session_commit(
+    session: models.Session, interim_path: pathlib.Path, sha256s: Mapping[str, str] | None = None
+) -> list[str]:
+    """Move every upload of a session into an interim revision directory, and return their paths."""
+    session_uploads_list = await session_uploads(session)
+    if not session_uploads_list:
+        raise UploadError("The session has no uploads")
+    sha256s = sha256s or {}
+    if unknown := (sha256s.keys() - {upload.rel_path for upload in session_uploads_list}):
+        raise UploadError(f"Digests given for files which are not in the session: {', '.join(sorted(unknown))}")
+    await _finish(session_uploads_list, interim_path, sha256s)
+    await session_discard(session)
+    return sorted(upload.rel_path for upload in session_uploads_list)
+
+
+async def session_create(asf_uid: str, project_name: str, version_name: str) -> models.Session:
+    """Start a new session of uploads to a release."""
+    await asyncio.to_thread(_prune)
+    session = models.Session(
+        session_id=secrets.token_hex(16),
+        asf_uid=asf_uid,
+        project_name=project_name,
+        version_name=version_name,
+        created=int(time.time()),
+    )
+    await asyncio.to_thread(_session_create, session)
+    log.info(f"Started upload session {session.session_id} for {project_name} {version_name}")
+    return session
+
+
+async def session_discard(session: models.Session) -> None:
+    """Delete a session and all of its uploads."""
+    for upload in await session_uploads(session):
+        await discard(upload)
+    await asyncio.to_thread(shutil.rmtree, _session_directory(session.session_id), True)
+
+
+async def session_read(session_id: str, asf_uid: str) -> models.Session:
+    """Return a session started by the given user."""
+    session = await _metadata_read(_session_directory(session_id), session_id, models.Session, "Session not found")
+    if session.asf_uid != asf_uid:
+        raise UploadError("Session not found")
+    return session
+
+
+async def session_uploads(session: models.Session) -> list[models.Upload]:
+    """Return the uploads of a session, in the order in which they were started."""
+    upload_ids = await asyncio.to_thread(_session_upload_ids, session)
+    session_uploads_list = []
+    for upload_id in upload_ids:
+        try:
+            session_uploads_list.append(await read(upload_id, session.asf_uid))
+        except UploadError:
+            raise UploadError(f"An upload of the session has expired: {upload_id}")
+    return session_uploads_list
+
+
+def rel_path_validate(rel_path: str) -> str:
+    """Return the normalised form of the path of an uploaded file, or raise UploadError if it is not allowed."""
+    path = pathlib.PurePosixPath(rel_path.lstrip("/"))
+    if (not path.parts) or any((part == "..") for part in path.parts):
+        raise UploadError(f"Invalid upload path: {rel_path}")
+    return str(path)
+
+
+def _content_lock(content_path: pathlib.Path, mode: str) -> IO[bytes]:
+    f = open(content_path, mode)
+    # Writing to or finishing the same upload concurrently would corrupt it
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise UploadError("The upload is already being written")
+    return f
+
+
+def _content_open(upload_id: str, offset: int) -> IO[bytes]:
+    f = _content_lock(_directory(upload_id) / _CONTENT, "r+b")
+    current = os.fstat(f.fileno()).st_size
+    if offset != current:
+        f.close()
+        raise OffsetError(current)
+    f.seek(current)
+    return f
+
+
+def _create(upload: models.Upload) -> None:
+    upload_dir = _directory(upload.upload_id)
+    upload_dir.mkdir(parents=True)
+    (upload_dir / _CONTENT).touch()
+    (upload_dir / _METADATA).write_text(upload.model_dump_json(), encoding="utf-8")
+
+
+def _directory(upload_id: str) -> pathlib.Path:
+    # The staging directory is on the same filesystem as revisions, so uploads can be renamed into them
+    return util.get_tmp_dir() / "uploads" / upload_id
+
+
+async def _finish(finishing: list[models.Upload], interim_path: pathlib.Path, sha256s: Mapping[str, str]) -> None:
+    hashers = await asyncio.to_thread(_move, finishing, interim_path, sha256s)
+    for upload, hasher in zip(finishing, hashers, strict=True):
+        _global_hashers.pop(upload.upload_id, None)
+        await asyncio.to_thread(digests.record, interim_path / upload.rel_path, hasher)
+        await discard(upload)
+        log.info(f"Finished upload {upload.upload_id} of {upload.rel_path} ({hasher.size} bytes)")
+
+
+def _hash_prefix(f: IO[bytes], offset: int) -> digests.Hasher:
+    hasher = digests.Hasher()
+    f.seek(0)
+    while hasher.size < offset:
+        chunk = f.read(min(_BATCH_SIZE, offset - hasher.size))
+        if not chunk:
+            break
+        hasher.update(chunk)
+    f.seek(offset)
+    return hasher
+
+
+async def _metadata_read[M: (models.Session, models.Upload)](
+    directory: pathlib.Path, identifier: str, model: type[M], not_found: str
+) -> M:
+    if not _IDENTIFIER.match(identifier):
+        raise UploadError(not_found)
+    try:
+        metadata = await asyncio.to_thread((directory / _METADATA).read_bytes)
+        return model.model_validate_json(metadata)
+    except (FileNotFoundError, pydantic.ValidationError):
+        raise UploadError(not_found)
+
+
+def _move(
+    finishing: list[models.Upload], interim_path: pathlib.Path, sha256s: Mapping[str, str]
+) -> list[digests.Hasher]:
+    # Verify every upload while holding all of their locks, so that either all of them are moved or none are
+    with contextlib.ExitStack() as stack:
+        hashers = []
+        for upload in finishing:
+            f = stack.enter_context(_content_lock(_directory(upload.upload_id) / _CONTENT, "rb"))
+            hashers.append(_verify(f, upload, interim_path / upload.rel_path, sha256s.get(upload.rel_path)))
+        moved: list[tuple[pathlib.Path, pathlib.Path]] = []
+        try:
+            for upload in finishing:
+                content_path = _directory(upload.upload_id) / _CONTENT
+                target_path = interim_path / upload.rel_path
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(content_path, target_path)
+                moved.append((content_path, target_path))
+        except BaseException:
+            # The interim directory is removed on failure, so the uploads already moved must be put back
+            _move_back(moved)
+            raise
+    return hashers
+
+
+def _move_back(moved: list[tuple[pathlib.Path, pathlib.Path]]) -> None:
+    for content_path, target_path in reversed(moved):
+        try:
+            os.rename(target_path, content_path)
+        except OSError as e:
+            log.error(f"Failed to return {target_path} to {content_path}: {e}")
+
+
+def _prune() -> None:
+    for parent in (util.get_tmp_dir() / "uploads", util.get_tmp_dir() / "upload-sessions"):
+        if not parent.is_dir():
+            continue
+        for directory in parent.iterdir():
+            try:
+                modified = max([directory.stat().st_mtime, *(entry.stat().st_mtime for entry in directory.iterdir())])
+            except OSError:
+                continue
+            if (time.time() - modified) > _EXPIRY_SECONDS:
+                log.info(f"Removing abandoned {parent.name} {directory.name}")
+                shutil.rmtree(directory, ignore_errors=True)
+    # Forget the digests of uploads which were removed, whether by this process or by another
+    for upload_id in list(_global_hashers):
+        if not _directory(upload_id).is_dir():
+            _global_hashers.pop(upload_id, None)
+    digests.prune()
+
+
+def _session_add(session: models.Session, upload: models.Upload) -> None:
+    session_dir = _session_directory(session.session_id)
+    if not session_dir.is_dir():
+        raise UploadError("Session not found")
+    # The session records its uploads by name, which also keeps it from expiring while they are started
+    (session_dir / upload.upload_id).touch()
+
+
+def _session_create(session: models.Session) -> None:
+    session_dir = _session_directory(session.session_id)
+    session_dir.mkdir(parents=True)
+    (session_dir / _METADATA).write_text(session.model_dump_json(), encoding="utf-8")
+
+
+def _session_directory(session_id: str) -> pathlib.Path:
+    return util.get_tmp_dir() / "upload-sessions" / session_id
+
+
+def _session_upload_ids(session: models.Session) -> list[str]:
+    try:
+        entries = list(_session_directory(session.session_id).iterdir())
+    except FileNotFoundError:
+        raise UploadError("Session not found")
+    entries = [entry for entry in entries if _IDENTIFIER.match(entry.name)]
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    return [entry.name for entry in entries]
+
+
+def _verify(f: IO[bytes], upload: models.Upload, target_path: pathlib.Path, sha256: str | None) -> digests.Hasher:
+    st = os.fstat(f.fileno())
+    hasher = _global_hashers.get(upload.upload_id)
+    if (hasher is None) or (hasher.size != st.st_size):
+        hasher = _hash_prefix(f, st.st_size)
+    if (sha256 is not None) and (hasher.digests(st).sha256 != sha256.lower()):
+        raise UploadError(f"The SHA-256 digest of {upload.rel_path} does not match")
+    if target_path.exists():
+        raise UploadError(f"File already exists: {upload.rel_path}")
+    return hasher
+
+
+def _write(f: IO[bytes], hasher: digests.Hasher, batch: bytes) -> None:
+    if not batch:
+        return
+    f.write(batch)
+    f.flush()
+    hasher.update(batch)
@@ -21,6 +21,7 @@ import binascii
 import contextlib
 import dataclasses
 import datetime
+import functools
 import hashlib
 import json
 import os
@@ -34,7 +35,6 @@ from collections.abc import AsyncGenerator, Callable, Iterable, Sequence
 from typing import Any, Final, TypeVar
 
 import aiofiles.os
-import aiohttp
 import aioshutil
 import asfquart
 import asfquart.base as base
@@ -47,9 +47,13 @@ import wtforms
 # NOTE: The atr.db module imports this module
 # Therefore, this module must not import atr.db
 import atr.config as config
+import atr.digests as digests
+import atr.fetch as fetch
 import atr.forms as forms
 import atr.ldap as ldap
 import atr.log as log
+import atr.manifest as manifest
+import atr.messages as messages
 import atr.models.sql as sql
 import atr.registry as registry
 import atr.user as user
@@ -79,6 +83,39 @@ class FetchError(RuntimeError):
         self.url = url
 
 
+class PathMatcher:
+    """Match paths against gitignore style lines, with each rule compiled once."""
+
+    def __init__(self, lines: Iterable[str], base_dir: pathlib.Path) -> None:
+        self.base_dir = base_dir
+        self.rules: list[tuple[re.Pattern[str], bool]] = []
+        for line in lines:
+            rule = gitignore_parser.rule_from_pattern(line.rstrip("\n"), base_path=base_dir)
+            if rule:
+                self.rules.append((re.compile(rule.regex), rule.negation))
+        self.negation = any(negation for _regex, negation in self.rules)
+        # Without negations, a path is matched if any rule matches it
+        self.combined = None
+        if self.rules and (not self.negation):
+            self.combined = re.compile("|".join(f"(?:{regex.pattern})" for regex, _negation in self.rules))
+
+    def __call__(self, file_path: str) -> bool:
+        if not self.rules:
+            return False
+        # This computes the relative path once, in the same way as IgnoreRule.match does for every rule
+        rel_path = pathlib.Path(os.path.abspath(file_path)).relative_to(self.base_dir).as_posix()
+        if rel_path.startswith("./"):
+            rel_path = rel_path[2:]
+        if self.combined is not None:
+            return self.combined.search(rel_path) is not None
+        for regex, negation in reversed(self.rules):
+            # Negations preserve a trailing slash, which is used by directory only rules
+            path = (rel_path + "/") if (negation and file_path.endswith("/")) else rel_path
+            if regex.search(path):
+                return not negation
+        return False
+
+
 async def archive_listing(file_path: pathlib.Path) -> list[str] | None:
     """Attempt to list contents of supported archive files."""
     if not await aiofiles.os.path.isfile(file_path):
@@ -191,11 +228,7 @@ def compute_sha3_256(file_data: bytes) -> str:
 
 async def compute_sha512(file_path: pathlib.Path) -> str:
     """Compute SHA-512 hash of a file."""
-    sha512 = hashlib.sha512()
-    async with aiofiles.open(file_path, "rb") as f:
-        while chunk := await f.read(4096):
-            sha512.update(chunk)
-    return sha512.hexdigest()
+    return (await digests.read(file_path)).sha512
 
 
 async def content_list(
@@ -208,6 +241,17 @@ async def content_list(
             raise ValueError("A revision name is required for release candidate draft or preview content listing")
     if revision_name:
         base_path = base_path / revision_name
+    if (revision_manifest := await manifest.read(base_path)) is not None:
+        for entry in revision_manifest.files:
+            yield FileStat(
+                path=entry.path,
+                modified=entry.mtime_ns // 1_000_000_000,
+                size=entry.size,
+                permissions=entry.mode,
+                is_file=True,
+                is_dir=False,
+            )
+        return
     async for path in paths_recursive(base_path):
         stat = await aiofiles.os.stat(base_path / path)
         yield FileStat(
@@ -220,56 +264,10 @@ async def content_list(
         )
 
 
-async def create_hard_link_clone(
-    source_dir: pathlib.Path,
-    dest_dir: pathlib.Path,
-    do_not_create_dest_dir: bool = False,
-    exist_ok: bool = False,
-    dry_run: bool = False,
-) -> None:
-    """Recursively create a clone of source_dir in dest_dir using hard links for files."""
-    await _create_hard_link_clone_checks(source_dir, dest_dir, do_not_create_dest_dir, exist_ok, dry_run)
-
-    async def _clone_recursive(current_source: pathlib.Path, current_dest: pathlib.Path) -> None:
-        for entry in await aiofiles.os.scandir(current_source):
-            source_entry_path = current_source / entry.name
-            dest_entry_path = current_dest / entry.name
-
-            try:
-                if entry.is_dir():
-                    await aiofiles.os.makedirs(dest_entry_path, exist_ok=True)
-                    await _clone_recursive(source_entry_path, dest_entry_path)
-                elif entry.is_file():
-                    if not dry_run:
-                        try:
-                            await aiofiles.os.link(source_entry_path, dest_entry_path)
-                        except FileExistsError:
-                            if not exist_ok:
-                                raise
-                            await aiofiles.os.remove(dest_entry_path)
-                            await aiofiles.os.link(source_entry_path, dest_entry_path)
-                    elif dry_run and (await aiofiles.os.path.exists(dest_entry_path)):
-                        raise ValueError(f"Destination path exists: {dest_entry_path}")
-                # Ignore other types like symlinks for now
-            except OSError as e:
-                log.error(f"Error cloning {source_entry_path} to {dest_entry_path}: {e}")
-                raise
-
-    await _clone_recursive(source_dir, dest_dir)
-
-
-def create_path_matcher(lines: Iterable[str], full_path: pathlib.Path, base_dir: pathlib.Path) -> Callable[[str], bool]:
-    rules = []
-    negation = False
-    for line_no, line in enumerate(lines, start=1):
-        rule = gitignore_parser.rule_from_pattern(line.rstrip("\n"), base_path=base_dir, source=(full_path, line_no))
-        if rule:
-            rules.append(rule)
-            if rule.negation:
-                negation = True
-    if not negation:
-        return lambda file_path: any(r.match(file_path) for r in rules)
-    return lambda file_path: gitignore_parser.handle_negation(file_path, rules)
+def create_path_matcher(lines: Iterable[str], full_path: pathlib.Path, base_dir: pathlib.Path) -> PathMatcher:
+    """Return a matcher for gitignore style lines, which is cached for each set of lines and base directory."""
+    # The full path of the ignore file would only label the rules in error messages, which we do not use
+    return _path_matcher_cached(tuple(lines), base_dir)
 
 
 def is_dev_environment() -> bool:
@@ -303,48 +301,9 @@ async def email_mid_from_thread_id(thread_id: str) -> tuple[str, str]:
     raise RuntimeError(f"Cannot find any messages in {thread_id}")
 
 
-async def email_to_uid_map() -> dict[str, str]:
-    def values(entry: dict, prop: str) -> list[str]:
-        raw_values = entry.get(prop, [])
-        if isinstance(raw_values, list):
-            return [v for v in raw_values if v]
-        if raw_values:
-            return [raw_values]
-        return []
-
-    # Get all email addresses in LDAP
-    conf = config.AppConfig()
-    bind_dn = conf.LDAP_BIND_DN
-    bind_password = conf.LDAP_BIND_PASSWORD
-    ldap_params = ldap.SearchParameters(
-        uid_query="*",
-        bind_dn_from_config=bind_dn,
-        bind_password_from_config=bind_password,
-        email_only=True,
-    )
-    await asyncio.to_thread(ldap.search, ldap_params)
-
-    # Map the LDAP addresses to Apache UIDs
-    email_to_uid = {}
-    for entry in ldap_params.results_list:
-        uid = entry.get("uid", [""])[0]
-        uid_lower = uid.lower()
-        for mail in values(entry, "mail"):
-            email_to_uid[mail.lower()] = uid_lower
-        for alt_email in values(entry, "asf-altEmail"):
-            email_to_uid[alt_email.lower()] = uid_lower
-        for committer_email in values(entry, "asf-committer-email"):
-            email_to_uid[committer_email.lower()] = uid_lower
-    return email_to_uid
-
-
 async def file_sha3(path: str) -> str:
     """Compute SHA3-256 hash of a file."""
-    sha3 = hashlib.sha3_256()
-    async with aiofiles.open(path, "rb") as f:
-        while chunk := await f.read(4096):
-            sha3.update(chunk)
-    return sha3.hexdigest()
+    return (await digests.read(path)).sha3_256
 
 
 def format_datetime(dt_obj: datetime.datetime | int) -> str:
@@ -431,6 +390,10 @@ async def get_asf_id_or_die() -> str:
     return web_session.uid
 
 
+def get_cache_dir() -> pathlib.Path:
+    return pathlib.Path(config.get().STATE_DIR) / "cache"
+
+
 def get_downloads_dir() -> pathlib.Path:
     return pathlib.Path(config.get().DOWNLOADS_STORAGE_DIR)
 
@@ -442,6 +405,9 @@ def get_finished_dir() -> pathlib.Path:
 async def get_release_stats(release: sql.Release) -> tuple[int, int, str]:
     """Calculate file count, total byte size, and formatted size for a release."""
     base_dir = release_directory(release)
+    if (revision_manifest := await manifest.read(base_dir)) is not None:
+        total_bytes = sum(entry.size for entry in revision_manifest.files)
+        return len(revision_manifest.files), total_bytes, format_file_size(total_bytes)
     count = 0
     total_bytes = 0
     try:
@@ -472,30 +438,16 @@ def get_unfinished_dir() -> pathlib.Path:
 
 async def get_urls_as_completed(urls: Sequence[str]) -> AsyncGenerator[tuple[str, int | str | None, bytes]]:
     """GET a list of URLs in parallel and yield (url, status, content_bytes) as they become available."""
-    async with aiohttp.ClientSession() as session:
-
-        async def _fetch(one_url: str) -> tuple[str, int | str | None, bytes]:
-            try:
-                async with session.get(one_url) as resp:
-                    try:
-                        resp.raise_for_status()
-                        return (str(resp.url), resp.status, await resp.read())
-                    except aiohttp.ClientResponseError as e:
-                        url = str(e.request_info.real_url)
-                        if e.status == 200:
-                            return (url, str(e), b"")
-                        return (url, e.status, b"")
-            except Exception as exc:
-                return ("", str(exc), b"")
-
-        tasks = [asyncio.create_task(_fetch(u)) for u in urls]
-        for future in asyncio.as_completed(tasks):
-            yield await future
+    tasks = [asyncio.create_task(_get_url(u)) for u in urls]
+    for future in asyncio.as_completed(tasks):
+        yield await future
 
 
 async def has_files(release: sql.Release) -> bool:
     """Check if a release has any files."""
     base_dir = release_directory(release)
+    if (revision_manifest := await manifest.read(base_dir)) is not None:
+        return bool(revision_manifest.files)
     try:
         async for rel_path in paths_recursive(base_dir):
             full_path = base_dir / rel_path
@@ -619,6 +571,10 @@ def parse_key_blocks_bytes(keys_data: bytes) -> list[str]:
 
 async def paths_recursive(base_path: pathlib.Path) -> AsyncGenerator[pathlib.Path]:
     """Yield all file paths recursively within a base path, relative to the base path."""
+    if (revision_manifest := await manifest.read(base_path)) is not None:
+        for entry in revision_manifest.files:
+            yield pathlib.Path(entry.path)
+        return
     if (resolved_base_path := await is_dir_resolve(base_path)) is None:
         return
     async for rel_path in paths_recursive_all(base_path):
@@ -630,6 +586,12 @@ async def paths_recursive(base_path: pathlib.Path) -> AsyncGenerator[pathlib.Pat
 
 async def paths_recursive_all(base_path: pathlib.Path) -> AsyncGenerator[pathlib.Path]:
     """Yield all file and directory paths recursively within a base path, relative to the base path."""
+    if (revision_manifest := await manifest.read(base_path)) is not None:
+        for directory in revision_manifest.directories:
+            yield pathlib.Path(directory)
+        for entry in revision_manifest.files:
+            yield pathlib.Path(entry.path)
+        return
     if (resolved_base_path := await is_dir_resolve(base_path)) is None:
         return
     queue: list[pathlib.Path] = [resolved_base_path]
@@ -838,11 +800,9 @@ async def task_archive_url(task_mid: str, recipient: str | None = None) -> str |
     lid = recipient_address.replace("@", ".")
     url = f"https://lists.apache.org/api/email.json?id=%3C{task_mid}%3E&listid=%3C{lid}%3E"
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                # TODO: Check whether this blocks from network
-                email_data = await response.json()
+        response = await fetch.get(url)
+        response.raise_for_status()
+        email_data = response.json()
         mid = email_data["mid"]
         if not isinstance(mid, str):
             return None
@@ -852,18 +812,14 @@ async def task_archive_url(task_mid: str, recipient: str | None = None) -> str |
         return None
 
 
-async def thread_messages(
-    thread_id: str,
-) -> AsyncGenerator[tuple[str, dict[str, Any]]]:
-    """Iterate over mailing list thread messages in chronological order."""
-
+async def thread_message_ids(thread_id: str) -> list[str]:
+    """Return the archive identifiers of the messages in a mailing list thread, in sorted order."""
     thread_url = f"https://lists.apache.org/api/thread.json?id={thread_id}"
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thread_url) as resp:
-                resp.raise_for_status()
-                thread_data: Any = await resp.json(content_type=None)
+        response = await fetch.get(thread_url)
+        response.raise_for_status()
+        thread_data: Any = response.json()
     except Exception as exc:
         raise FetchError(f"Failed fetching thread metadata for {thread_id}: {exc}", url=thread_url) from exc
 
@@ -874,13 +830,26 @@ async def thread_messages(
             if isinstance(email_entry, dict) and (mid := email_entry.get("id")):
                 message_ids.add(str(mid))
         _thread_messages_walk(thread_data.get("thread"), message_ids)
+    return sorted(message_ids)
+
 
+async def thread_messages(
+    thread_id: str, message_ids: list[str] | None = None, missed: list[str] | None = None
+) -> AsyncGenerator[tuple[str, dict[str, Any]]]:
+    """Iterate over mailing list thread messages in chronological order.
+
+    Archived messages never change, so only messages which have not been fetched before are fetched.
+    Any given message_ids which could not be fetched are added to missed before the first message is yielded.
+    """
+    if message_ids is None:
+        message_ids = await thread_message_ids(thread_id)
     if not message_ids:
         return
 
-    email_urls = [f"https://lists.apache.org/api/email.json?id={mid}" for mid in message_ids]
-
-    messages: list[dict[str, Any]] = []
+    stored = await asyncio.to_thread(messages.load, message_ids)
+    email_urls = [f"https://lists.apache.org/api/email.json?id={mid}" for mid in message_ids if mid not in stored]
+    if email_urls:
+        log.info(f"Fetching {len(email_urls)} of {len(message_ids)} messages in thread {thread_id}")
 
     async for url, status, content in get_urls_as_completed(email_urls):
         if status != 200 or not content:
@@ -888,14 +857,17 @@ async def thread_messages(
             continue
         try:
             msg_json = json.loads(content.decode())
-            messages.append(msg_json)
         except Exception as exc:
             log.warning(f"Failed to parse email JSON from {url}: {exc}")
-
-    messages.sort(key=lambda m: m.get("epoch", 0))
-
-    for msg_json in messages:
+            continue
         msg_id = str(msg_json.get("id", ""))
+        if msg_id in message_ids:
+            await asyncio.to_thread(messages.store, msg_id, msg_json)
+        stored[msg_id] = msg_json
+    if missed is not None:
+        missed.extend(mid for mid in message_ids if mid not in stored)
+
+    for msg_id, msg_json in sorted(stored.items(), key=lambda item: item[1].get("epoch", 0)):
         yield msg_id, msg_json
 
 
@@ -1005,35 +977,6 @@ def version_name_error(version_name: str) -> str | None:
     return None
 
 
-async def _create_hard_link_clone_checks(
-    source_dir: pathlib.Path,
-    dest_dir: pathlib.Path,
-    do_not_create_dest_dir: bool = False,
-    exist_ok: bool = False,
-    dry_run: bool = False,
-) -> None:
-    if dry_run and ((not do_not_create_dest_dir) or (not exist_ok)):
-        raise ValueError("Cannot dry run and create destination directory or exist ok")
-
-    # Ensure source exists and is a directory
-    if (not dry_run) and (not await aiofiles.os.path.isdir(source_dir)):
-        raise ValueError(f"Source path is not a directory or does not exist: {source_dir}")
-
-    # Create destination directory
-    if do_not_create_dest_dir is False:
-        try:
-            await aiofiles.os.makedirs(dest_dir, exist_ok=exist_ok)
-        except FileExistsError:
-            log.error(
-                f"Arguments to __create_hard_link_clone_checks: "
-                f"source_dir={source_dir}, "
-                f"dest_dir={dest_dir}, "
-                f"do_not_create_dest_dir={do_not_create_dest_dir}, "
-                f"exist_ok={exist_ok}"
-            )
-            raise
-
-
 def _generate_hexdump(data: bytes) -> str:
     """Generate a formatted hexdump string from bytes."""
     hex_lines = []
@@ -1048,6 +991,21 @@ def _generate_hexdump(data: bytes) -> str:
     return "\n".join(hex_lines)
 
 
+async def _get_url(url: str) -> tuple[str, int | str | None, bytes]:
+    try:
+        response = await fetch.get(url)
+    except Exception as exc:
+        return ("", str(exc), b"")
+    if response.status >= 400:
+        return (response.url, response.status, b"")
+    return (response.url, response.status, response.content)
+
+
+@functools.lru_cache(maxsize=256)
+def _path_matcher_cached(lines: tuple[str, ...], base_dir: pathlib.Path) -> PathMatcher:
+    return PathMatcher(lines, base_dir)
+
+
 def _thread_messages_walk(node: dict[str, Any] | None, message_ids: set[str]) -> None:
     if not isinstance(node, dict):
         return
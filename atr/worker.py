@@ -31,10 +31,15 @@ import signal
 import traceback
 from typing import Any, Final
 
+import sqlalchemy
+import sqlalchemy.dialects.sqlite as sqlite
+import sqlalchemy.orm as orm
 import sqlmodel
 
 import atr.db as db
+import atr.fetch as fetch
 import atr.log as log
+import atr.manager as manager
 import atr.models.results as results
 import atr.models.sql as sql
 import atr.tasks as tasks
@@ -45,10 +50,44 @@ import atr.tasks.task as task
 # _CPU_LIMIT_SECONDS: Final = 300
 _MEMORY_LIMIT_BYTES: Final = 1024 * 1024 * 1024
 
+# Idle workers are woken by the manager when tasks are queued, and otherwise poll at this interval
+_POLL_FALLBACK_SECONDS: Final = 5.0
+
 # # Create tables if they don't exist
 # SQLModel.metadata.create_all(engine)
 
 
+class _Runner:
+    """The tasks running concurrently in this worker."""
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self.running: dict[asyncio.Task, sql.TaskType] = {}
+
+    def excluded(self) -> frozenset[sql.TaskType]:
+        # CPU bound tasks would only contend with each other, so we run at most one of them
+        if any((task_type in tasks.CPU_BOUND) for task_type in self.running.values()):
+            return tasks.CPU_BOUND
+        return frozenset()
+
+    def full(self) -> bool:
+        return len(self.running) >= self.concurrency
+
+    def start(self, task_id: int, task_type: str, task_args: list[str] | dict[str, Any]) -> None:
+        running_task = asyncio.create_task(_task_process(task_id, task_type, task_args))
+        self.running[running_task] = sql.TaskType(task_type)
+        running_task.add_done_callback(self.running.pop)
+
+    async def wait(self, wake: asyncio.Event) -> None:
+        wake_task = asyncio.create_task(wake.wait())
+        try:
+            await asyncio.wait(
+                [wake_task, *self.running], timeout=_POLL_FALLBACK_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            wake_task.cancel()
+
+
 def main() -> None:
     """Main entry point."""
     import atr.config as config
@@ -66,6 +105,7 @@ def main() -> None:
         log.info(f"Received signal {signum}, shutting down...")
 
         await db.shutdown_database()
+        await fetch.close()
 
         for t in tasks:
             t.cancel()
@@ -83,6 +123,7 @@ def main() -> None:
         await asyncio.create_task(db.init_database_for_worker())
         tasks.append(asyncio.create_task(_worker_loop_run()))
         await asyncio.gather(*tasks)
+        await fetch.close()
 
     asyncio.run(_start())
 
@@ -104,33 +145,31 @@ def _setup_logging() -> None:
 # Task functions
 
 
-async def _task_next_claim() -> tuple[int, str, list[str] | dict[str, Any]] | None:
+async def _task_next_claim(
+    excluded: frozenset[sql.TaskType] = frozenset(),
+) -> tuple[int, str, list[str] | dict[str, Any]] | None:
     """
-    Attempt to claim the oldest unclaimed task.
+    Attempt to claim the next unclaimed task, other than those of excluded types.
     Returns (task_id, task_type, task_args) if successful.
     Returns None if no tasks are available.
     """
     async with db.session() as data:
         async with data.begin():
-            # Get the ID of the oldest queued task
-            oldest_queued_task = (
-                sqlmodel.select(sql.Task.id)
-                .where(sql.Task.status == task.QUEUED)
-                .order_by(sql.validate_instrumented_attribute(sql.Task.added).asc())
-                .limit(1)
-            )
+            # Get the ID of the next queued task, by priority, then the project which waited longest, then age
+            next_queued_task = _task_next_query(excluded)
 
             # Use an UPDATE with a WHERE clause to atomically claim the task
             # This ensures that only one worker can claim a specific task
             now = datetime.datetime.now(datetime.UTC)
             update_stmt = (
                 sqlmodel.update(sql.Task)
-                .where(sqlmodel.and_(sql.Task.id == oldest_queued_task, sql.Task.status == task.QUEUED))
+                .where(sqlmodel.and_(sql.Task.id == next_queued_task, sql.Task.status == task.QUEUED))
                 .values(status=task.ACTIVE, started=now, pid=os.getpid())
                 .returning(
                     sql.validate_instrumented_attribute(sql.Task.id),
                     sql.validate_instrumented_attribute(sql.Task.task_type),
                     sql.validate_instrumented_attribute(sql.Task.task_args),
+                    sql.validate_instrumented_attribute(sql.Task.project_name),
                 )
             )
 
@@ -138,13 +177,49 @@ async def _task_next_claim() -> tuple[int, str, list[str] | dict[str, Any]] | No
             claimed_task = result.first()
 
             if claimed_task:
-                task_id, task_type, task_args = claimed_task
+                task_id, task_type, task_args, project_name = claimed_task
+                # The project goes to the back of the queue, behind projects which have waited longer
+                await data.execute(
+                    sqlite.insert(sql.TaskClaim)
+                    .values(project_name=project_name or "", claimed=now)
+                    .on_conflict_do_update(index_elements=["project_name"], set_={"claimed": now})
+                )
                 log.info(f"Claimed task {task_id} ({task_type}) with args {task_args}")
                 return task_id, task_type, task_args
 
             return None
 
 
+def _task_gate_failed(recorders: list[checks.Recorder]) -> bool:
+    """Return whether a gating check recorded a failure, so that the dependent tasks cannot pass."""
+    return any((recorder.checker in tasks.GATING_CHECKERS) and recorder.failed for recorder in recorders)
+
+
+def _task_next_query(excluded: frozenset[sql.TaskType]) -> sqlalchemy.ScalarSelect[int]:
+    """Select the ID of the next task to claim."""
+    via = sql.validate_instrumented_attribute
+    queued = orm.aliased(sql.Task)
+    # Projects take turns, so that one large release cannot hold up the others
+    # Projects which have never had a task claimed go first
+    claim_join = via(sql.TaskClaim.project_name) == sqlalchemy.func.coalesce(via(queued.project_name), "")
+    # Tasks may only be claimed once the task on which they depend has completed
+    parent = orm.aliased(sql.Task)
+    parent_pending = (
+        sqlmodel.select(via(parent.id))
+        .where(via(parent.id) == via(queued.depends_on_id), via(parent.status) != task.COMPLETED)
+        .correlate(queued)
+        .exists()
+    )
+    return (
+        sqlmodel.select(via(queued.id))
+        .outerjoin(sql.TaskClaim, claim_join)
+        .where(via(queued.status) == task.QUEUED, via(queued.task_type).notin_(excluded), ~parent_pending)
+        .order_by(via(queued.priority).desc(), via(sql.TaskClaim.claimed).asc().nulls_first(), via(queued.added).asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
 async def _task_process(task_id: int, task_type: str, task_args: list[str] | dict[str, Any]) -> None:
     """Process a claimed task."""
     log.info(f"Processing task {task_id} ({task_type}) with raw args {task_args}")
@@ -156,6 +231,7 @@ async def _task_process(task_id: int, task_type: str, task_args: list[str] | dic
         return
 
     task_results: results.Results | None
+    gate_failed = False
     try:
         handler = tasks.resolve(task_type_member)
         sig = inspect.signature(handler)
@@ -190,6 +266,7 @@ async def _task_process(task_id: int, task_type: str, task_args: list[str] | dic
                     version_name=task_obj.version_name or "",
                     revision_number=task_obj.revision_number or "",
                     primary_rel_path=task_obj.primary_rel_path,
+                    inputs_hash=task_obj.inputs_hash,
                 )
 
             function_arguments = checks.FunctionArguments(
@@ -200,9 +277,13 @@ async def _task_process(task_id: int, task_type: str, task_args: list[str] | dic
                 revision_number=task_obj.revision_number,
                 primary_rel_path=task_obj.primary_rel_path,
                 extra_args=task_args,
+                inputs_hash=task_obj.inputs_hash,
             )
             log.debug(f"Calling {handler.__name__} with structured arguments: {function_arguments}")
-            handler_result = await handler(function_arguments)
+            # Check results are written in batches, and any remainder when the handler exits
+            async with checks.buffered() as recorders:
+                handler_result = await handler(function_arguments)
+            gate_failed = _task_gate_failed(recorders)
         else:
             # Otherwise, it's not a check handler
             handler_result = await handler(task_args)
@@ -216,15 +297,22 @@ async def _task_process(task_id: int, task_type: str, task_args: list[str] | dic
         error_details = traceback.format_exc()
         log.error(f"Task {task_id} failed processing: {error_details}")
         error = str(e)
-    await _task_result_process(task_id, task_results, status, error)
+    await _task_result_process(task_id, task_results, status, error, gate_failed)
 
 
 async def _task_result_process(
-    task_id: int, task_results: results.Results | None, status: sql.TaskStatus, error: str | None = None
+    task_id: int,
+    task_results: results.Results | None,
+    status: sql.TaskStatus,
+    error: str | None = None,
+    gate_failed: bool = False,
 ) -> None:
     """Process and store task results in the database."""
     async with db.session() as data:
         async with data.begin():
+            if (status == task.FAILED) or gate_failed:
+                await manager.task_dependents_cancel(data, task_id)
+
             # Find the task by ID
             task_obj = await data.task(id=task_id).get()
             if task_obj:
@@ -242,27 +330,35 @@ async def _task_result_process(
 
 async def _worker_loop_run() -> None:
     """Main worker loop."""
+    import atr.config as config
+
     processed = 0
     max_to_process = 10
-    while True:
-        try:
-            task = await _task_next_claim()
-            if task:
-                task_id, task_type, task_args = task
-                await _task_process(task_id, task_type, task_args)
-                processed += 1
-                # Only process max_to_process tasks and then exit
-                # This prevents memory leaks from accumulating
-                # Another worker will be started automatically when one exits
-                if processed >= max_to_process:
-                    break
-            else:
-                # No tasks available, wait 100ms before checking again
-                await asyncio.sleep(0.1)
-        except Exception:
-            # TODO: Should probably be more robust about this
-            log.exception("Worker loop error")
-            await asyncio.sleep(1)
+    runner = _Runner(config.get().WORKER_CONCURRENCY)
+    wake = asyncio.Event()
+    listener = asyncio.create_task(_worker_wake_listen(wake))
+    try:
+        # Only process max_to_process tasks and then exit
+        # This prevents memory leaks from accumulating
+        # Another worker will be started automatically when one exits
+        while (processed < max_to_process) or runner.running:
+            try:
+                # Clear before claiming, so that a notification sent during the claim is not lost
+                wake.clear()
+                if (processed < max_to_process) and (not runner.full()):
+                    claimed = await _task_next_claim(runner.excluded())
+                    if claimed:
+                        runner.start(*claimed)
+                        processed += 1
+                        continue
+                # Wait until a task finishes, the manager wakes us, or the fallback interval passes
+                await runner.wait(wake)
+            except Exception:
+                # TODO: Should probably be more robust about this
+                log.exception("Worker loop error")
+                await asyncio.sleep(1)
+    finally:
+        listener.cancel()
 
 
 def _worker_resources_limit_set() -> None:
@@ -282,6 +378,23 @@ def _worker_resources_limit_set() -> None:
         log.warning(f"Could not set memory limit: {e}")
 
 
+async def _worker_wake_listen(wake: asyncio.Event) -> None:
+    """Set the wake event whenever the manager reports that tasks have been queued."""
+    while True:
+        try:
+            reader, writer = await asyncio.open_unix_connection(manager.notify_socket_path())
+            writer.write(manager.NOTIFY_SUBSCRIBE)
+            await writer.drain()
+            while await reader.readline():
+                wake.set()
+            writer.close()
+        except OSError as e:
+            log.warning(f"Worker notification socket unavailable: {e}")
+        # The manager may have restarted, so poll once and then reconnect
+        wake.set()
+        await asyncio.sleep(_POLL_FALLBACK_SECONDS)
+
+
 if __name__ == "__main__":
     log.info("Starting ATR worker...")
     try:
@@ -0,0 +1,37 @@
+"""Add input hashes to tasks and check results
+
+Revision ID: 0030_2026.10.17_fb3794c3
+Revises: 0029_2025.11.28_6486ff5e
+Create Date: 2026-10-17 09:12:41.318205+00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0030_2026.10.17_fb3794c3"
+down_revision: str | None = "0029_2025.11.28_6486ff5e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("checkresult", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("inputs_hash", sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f("ix_checkresult_inputs_hash"), ["inputs_hash"], unique=False)
+
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("inputs_hash", sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f("ix_task_inputs_hash"), ["inputs_hash"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_task_inputs_hash"))
+        batch_op.drop_column("inputs_hash")
+
+    with op.batch_alter_table("checkresult", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_checkresult_inputs_hash"))
+        batch_op.drop_column("inputs_hash")
@@ -0,0 +1,31 @@
+"""Add priorities to tasks
+
+Revision ID: 0031_2026.10.17_728688c6
+Revises: 0030_2026.10.17_fb3794c3
+Create Date: 2026-10-17 10:04:18.520913+00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0031_2026.10.17_728688c6"
+down_revision: str | None = "0030_2026.10.17_fb3794c3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("priority", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.create_index("ix_task_status_priority_added", ["status", "priority", "added"], unique=False)
+        batch_op.create_index("ix_task_status_project_name", ["status", "project_name"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.drop_index("ix_task_status_project_name")
+        batch_op.drop_index("ix_task_status_priority_added")
+        batch_op.drop_column("priority")
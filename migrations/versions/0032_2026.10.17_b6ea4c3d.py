@@ -0,0 +1,31 @@
+"""Add dependencies between tasks
+
+Revision ID: 0032_2026.10.17_b6ea4c3d
+Revises: 0031_2026.10.17_728688c6
+Create Date: 2026-10-17 11:26:53.104772+00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0032_2026.10.17_b6ea4c3d"
+down_revision: str | None = "0031_2026.10.17_728688c6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("depends_on_id", sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f("ix_task_depends_on_id"), ["depends_on_id"], unique=False)
+        batch_op.create_foreign_key(batch_op.f("fk_task_depends_on_id_task"), "task", ["depends_on_id"], ["id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f("fk_task_depends_on_id_task"), type_="foreignkey")
+        batch_op.drop_index(batch_op.f("ix_task_depends_on_id"))
+        batch_op.drop_column("depends_on_id")
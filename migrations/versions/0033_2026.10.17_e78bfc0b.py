@@ -0,0 +1,45 @@
+"""Add an index of release files by name and digest
+
+Revision ID: 0033_2026.10.17_e78bfc0b
+Revises: 0032_2026.10.17_b6ea4c3d
+Create Date: 2026-10-17 07:09:32.694442+00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers, used by Alembic
+revision: str = "0033_2026.10.17_e78bfc0b"
+down_revision: str | None = "0032_2026.10.17_b6ea4c3d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "releasefile",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("release_name", sa.String(), nullable=False),
+        sa.Column("rel_path", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("sha3_256", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["release_name"],
+            ["release.name"],
+            name=op.f("fk_releasefile_release_name_release"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_releasefile")),
+        sa.UniqueConstraint("release_name", "rel_path", name="unique_release_file_rel_path"),
+    )
+    with op.batch_alter_table("releasefile", schema=None) as batch_op:
+        batch_op.create_index("ix_releasefile_name_sha3_256", ["name", "sha3_256"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("releasefile", schema=None) as batch_op:
+        batch_op.drop_index("ix_releasefile_name_sha3_256")
+
+    op.drop_table("releasefile")
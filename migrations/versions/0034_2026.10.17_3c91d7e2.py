@@ -0,0 +1,37 @@
+"""Record when tasks of each project were last claimed
+
+Revision ID: 0034_2026.10.17_3c91d7e2
+Revises: 0033_2026.10.17_e78bfc0b
+Create Date: 2026-10-17 15:42:07.318254+00:00
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+import atr.models.sql as sql
+
+# Revision identifiers, used by Alembic
+revision: str = "0034_2026.10.17_3c91d7e2"
+down_revision: str | None = "0033_2026.10.17_e78bfc0b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "taskclaim",
+        sa.Column("project_name", sa.String(), nullable=False),
+        sa.Column("claimed", sql.UTCDateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("project_name", name=op.f("pk_taskclaim")),
+    )
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.drop_index("ix_task_status_project_name")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task", schema=None) as batch_op:
+        batch_op.create_index("ix_task_status_project_name", ["status", "project_name"], unique=False)
+
+    op.drop_table("taskclaim")
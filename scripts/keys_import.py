@@ -32,6 +32,7 @@ sys.path.append(".")
 
 import atr.config as config
 import atr.db as db
+import atr.people as people
 import atr.storage as storage
 import atr.storage.outcome as outcome
 import atr.storage.types as types
@@ -146,9 +147,9 @@ async def keys_import(conf: config.AppConfig, asf_uid: str) -> None:
     # Get all email addresses in LDAP
     # We'll discard them when we're finished
     start = time.perf_counter_ns()
-    email_to_uid = await util.email_to_uid_map()
+    email_to_uid = await people.email_to_uid_map()
     end = time.perf_counter_ns()
-    print_and_flush(f"LDAP search took {(end - start) / 1000000} ms")
+    print_and_flush(f"LDAP snapshot lookup took {(end - start) / 1000000} ms")
     print_and_flush(f"Email addresses from LDAP: {len(email_to_uid)}")
 
     # Get the KEYS file of each committee
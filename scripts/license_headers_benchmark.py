@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import importlib.util
+import sys
+import tarfile
+import time
+
+if not importlib.util.find_spec("atr"):
+    sys.path.append(".")
+
+import atr.tarzip as tarzip
+import atr.tasks.checks.license as license
+
+_EXTENSIONS = ("java", "py", "md", "txt", "xml", "js", "c", "h", "json", "properties")
+_IGNORE_LINES = ["*.json", "docs/**", "!docs/keep.md", "generated/"]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if (len(sys.argv) > 1) else 100_000
+    members = []
+    for i in range(count):
+        info = tarfile.TarInfo(f"project-1.0/module{i % 50}/src/file{i}.{_EXTENSIONS[i % len(_EXTENSIONS)]}")
+        info.size = len(license.HTTP_APACHE_LICENSE_HEADER)
+        members.append(tarzip.TarMember(info))
+    content = b"/*\n" + license.HTTP_APACHE_LICENSE_HEADER + b"\n*/\n"
+
+    visitor = license.HeadersVisitor("project-1.0-src.tar.gz", _IGNORE_LINES)
+    start = time.perf_counter()
+    for member in members:
+        wanted = visitor.prefix(member)
+        visitor.visit(member, content if wanted else None)
+    elapsed = time.perf_counter() - start
+
+    print(f"{count} members in {elapsed:.3f}s, {elapsed / count * 1_000_000:.2f}us per member")
+    print(visitor.summary().message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+/*
+ * Licensed to the Apache Software Foundation (ASF) under one
+ * or more contributor license agreements.  See the NOTICE file
+ * distributed with this work for additional information
+ * regarding copyright ownership.  The ASF licenses this file
+ * to you under the Apache License, Version 2.0 (the
+ * "License"); you may not use this file except in compliance
+ * with the License.  You may obtain a copy of the License at
+ *
+ *   http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing,
+ * software distributed under the License is distributed on an
+ * "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ * KIND, either express or implied.  See the License for the
+ * specific language governing permissions and limitations
+ * under the License.
+ */
+
+import java.io.BufferedInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Run Apache RAT reports on request in a single long lived JVM.
+ *
+ * Each request is a list of command line arguments for RAT, each terminated
+ * by a NUL byte, and the request is terminated by an empty argument. Each
+ * response is a line containing OK or ERROR and the length in bytes of the
+ * output that RAT wrote during the request, followed by that output. The
+ * report itself is written to the file named in the arguments.
+ */
+public final class RatServer {
+    private RatServer() {
+    }
+
+    /** Forward writes to an output stream which can be replaced between requests. */
+    private static final class Switch extends OutputStream {
+        private volatile OutputStream target = new ByteArrayOutputStream();
+
+        @Override
+        public void write(final int b) throws IOException {
+            target.write(b);
+        }
+
+        @Override
+        public void write(final byte[] b, final int off, final int len) throws IOException {
+            target.write(b, off, len);
+        }
+    }
+
+    public static void main(final String[] args) throws Exception {
+        final OutputStream protocol = new FileOutputStream(FileDescriptor.out);
+        final InputStream requests = new BufferedInputStream(System.in);
+
+        // RAT may keep references to the standard streams, so they are replaced before it loads
+        final Switch output = new Switch();
+        final PrintStream captured = new PrintStream(output, true, "UTF-8");
+        System.setOut(captured);
+        System.setErr(captured);
+        final Method report = Class.forName("org.apache.rat.Report").getMethod("main", String[].class);
+        respond(protocol, "READY", new byte[0]);
+
+        List<String> arguments;
+        while ((arguments = read(requests)) != null) {
+            final ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+            output.target = buffer;
+            String status = "OK";
+            try {
+                report.invoke(null, (Object) arguments.toArray(new String[0]));
+            } catch (final InvocationTargetException e) {
+                status = "ERROR";
+                e.getCause().printStackTrace(captured);
+            } catch (final Exception e) {
+                status = "ERROR";
+                e.printStackTrace(captured);
+            }
+            captured.flush();
+            output.target = new ByteArrayOutputStream();
+            respond(protocol, status, buffer.toByteArray());
+        }
+    }
+
+    private static List<String> read(final InputStream requests) throws IOException {
+        final List<String> arguments = new ArrayList<String>();
+        final ByteArrayOutputStream argument = new ByteArrayOutputStream();
+        int b;
+        while ((b = requests.read()) != -1) {
+            if (b != 0) {
+                argument.write(b);
+            } else if (argument.size() == 0) {
+                return arguments;
+            } else {
+                arguments.add(new String(argument.toByteArray(), StandardCharsets.UTF_8));
+                argument.reset();
+            }
+        }
+        // The client has gone away
+        return null;
+    }
+
+    private static void respond(final OutputStream protocol, final String status, final byte[] body)
+            throws IOException {
+        final String header = status + " " + body.length + "\n";
+        protocol.write(header.getBytes(StandardCharsets.UTF_8));
+        protocol.write(body);
+        protocol.flush();
+    }
+}
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import importlib.util
+import sys
+
+if not importlib.util.find_spec("atr"):
+    sys.path.append(".")
+
+import atr.db as db
+import atr.provenance as provenance
+import atr.util as util
+
+
+async def amain() -> None:
+    await db.init_database_for_worker()
+    async with db.session() as data:
+        releases = await data.release(_project=True).all()
+        for release in releases:
+            release_dir = util.release_directory(release)
+            rel_paths = [str(rel_path) async for rel_path in util.paths_recursive(release_dir)]
+            update = await provenance.prepare(release_dir, rel_paths)
+            await provenance.apply(data, release.name, update)
+            await data.commit()
+            print(release.name, len(rel_paths), "files")
+        print(len(releases), "releases indexed")
+
+
+def main() -> None:
+    asyncio.run(amain())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+import pathlib
+import tarfile
+import zipfile
+
+import atr.constants as constants
+import atr.tarzip as tarzip
+import atr.tasks.checks.license as license
+import atr.tasks.checks.targz as targz
+import atr.tasks.checks.zipformat as zipformat
+
+_HEADER = b"""# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+
+_MEMBERS = {
+    "apache-example-1.0/LICENSE": constants.APACHE_LICENSE_2_0.encode("utf-8"),
+    "apache-example-1.0/NOTICE": b"Apache Example\nCopyright 2025 The Apache Software Foundation\n\n"
+    b"This product includes software developed at\nThe Apache Software Foundation (http://www.apache.org/).\n",
+    "apache-example-1.0/good.py": _HEADER + b"print('ok')\n",
+    "apache-example-1.0/bad.py": b"print('missing header')\n",
+    "apache-example-1.0/data.bin": b"\x00" * 10000,
+}
+
+
+def _write_tar(path: pathlib.Path) -> None:
+    with tarfile.open(path, "w:gz") as tf:
+        for name, content in _MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tf.addfile(info, io.BytesIO(content))
+
+
+def _write_zip(path: pathlib.Path) -> None:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, content in _MEMBERS.items():
+            zf.writestr(name, content)
+
+
+def test_scan_tar_single_pass(tmp_path: pathlib.Path):
+    artifact = tmp_path / "apache-example-1.0.tar.gz"
+    _write_tar(artifact)
+
+    files = license.FilesVisitor(is_podling=True)
+    headers = license.HeadersVisitor(str(artifact), [])
+    integrity = targz.IntegrityVisitor()
+    structure = targz.StructureVisitor(artifact.name)
+    tarzip.scan(str(artifact), [files, headers, integrity, structure])
+
+    assert files.error is None
+    messages = [result.message for result in files.results()]
+    assert messages == ["LICENSE is valid", "NOTICE is valid", "No DISCLAIMER or DISCLAIMER-WIP file found"]
+
+    assert headers.error is None
+    assert headers.artifact_data.files_with_valid_headers == 1
+    assert headers.artifact_data.files_with_invalid_headers == 1
+    assert sorted(result.path for result in headers.member_results) == [
+        "apache-example-1.0/bad.py",
+        "apache-example-1.0/good.py",
+    ]
+
+    assert integrity.error is None
+    assert integrity.size == sum(len(content) for content in _MEMBERS.values())
+
+    assert structure.error is None
+    assert structure.root == structure.expected_root == "apache-example-1.0"
+
+
+def test_scan_tar_truncated(tmp_path: pathlib.Path):
+    artifact = tmp_path / "apache-example-1.0.tar.gz"
+    _write_tar(artifact)
+    artifact.write_bytes(artifact.read_bytes()[:-200])
+
+    integrity = targz.IntegrityVisitor()
+    structure = targz.StructureVisitor(artifact.name)
+    tarzip.scan(str(artifact), [integrity, structure])
+
+    assert integrity.error is not None
+    assert structure.error is not None
+
+
+def test_scan_zip_single_pass(tmp_path: pathlib.Path):
+    artifact = tmp_path / "apache-example-1.0.zip"
+    _write_zip(artifact)
+
+    files = license.FilesVisitor(is_podling=False)
+    integrity = zipformat.IntegrityVisitor()
+    structure = zipformat.StructureVisitor(str(artifact))
+    tarzip.scan(str(artifact), [files, integrity, structure])
+
+    assert [result.message for result in files.results()] == ["LICENSE is valid", "NOTICE is valid"]
+    assert integrity.member_count == len(_MEMBERS)
+    assert structure.result_data() == {"root_dir": "apache-example-1.0"}